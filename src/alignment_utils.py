@@ -0,0 +1,145 @@
+# 偏移检测工具（FFT互相关，先降采样粗搜再全分辨率细化）
+import numpy as np
+from .bin_utils import iter_chunk_ranges, handle_invalid_values
+from .config import Config
+from .stream_metrics import StreamCancelled
+
+def block_mean_decimate(data, factor, chunk_size=None, cancel_check=None):
+    """按factor个元素一组求均值降采样（分块读取memmap，非法值按0处理；每块前检查cancel_check）"""
+    factor = max(1, int(factor))
+    n_blocks = len(data) // factor
+    if n_blocks == 0:
+        return np.empty(0, dtype=np.float64)
+
+    # 每块包含整数个分组
+    chunk_size = chunk_size or Config.STREAM_CHUNK_ELEMENTS
+    blocks_per_chunk = max(1, chunk_size // factor)
+    out = np.empty(n_blocks, dtype=np.float64)
+    for b0, b1 in iter_chunk_ranges(n_blocks, blocks_per_chunk):
+        if cancel_check and cancel_check():
+            raise StreamCancelled()
+        chunk = np.array(data[b0 * factor:b1 * factor], dtype=np.float64)
+        chunk = handle_invalid_values(chunk, copy=False)
+        out[b0:b1] = chunk.reshape(-1, factor).mean(axis=1)
+    return out
+
+def _next_fast_len(n):
+    """不小于n的2的幂（numpy的FFT对2的幂最快）"""
+    return 1 << int(np.ceil(np.log2(max(1, n))))
+
+def cross_correlation(a, b, lag_min, lag_max):
+    """
+    用FFT计算互相关 corr[lag] = sum_i a[i] * b[i + lag]，lag取[lag_min, lag_max]
+    要求b已按lag_min对齐：b[0]对应a[0]在lag_min处的位置，即调用方传入b[lag_min:]的片段
+    :return: 长度为lag_max - lag_min + 1的数组
+    """
+    n_lags = lag_max - lag_min + 1
+    nfft = _next_fast_len(len(a) + len(b))
+    fa = np.fft.rfft(a, nfft)
+    fb = np.fft.rfft(b, nfft)
+    corr = np.fft.irfft(np.conj(fa) * fb, nfft)
+    return corr[:n_lags]
+
+def _normalized_search(seg1, seg2, lag_min, lag_max):
+    """
+    固定窗口搜索：seg2[k:k+len(seg1)]对应lag = lag_min + k，返回(最佳lag, 归一化相关系数)
+    适用于lag范围较小的细化阶段
+    """
+    w = len(seg1)
+    seg1 = seg1 - seg1.mean()
+    seg2 = seg2 - seg2.mean()
+    corr = cross_correlation(seg1, seg2, lag_min, lag_max)
+
+    # 每个lag下seg2对应窗口的能量（前缀和，O(n)）
+    cumsum = np.concatenate(([0.0], np.cumsum(seg2 * seg2)))
+    n_lags = lag_max - lag_min + 1
+    energy2 = cumsum[w:w + n_lags] - cumsum[:n_lags]
+    denom = np.sqrt(np.maximum(energy2, 0.0) * np.dot(seg1, seg1)) + 1e-12
+    score = corr / denom
+
+    best = int(np.argmax(score))
+    return lag_min + best, float(score[best])
+
+def _overlap_normalized_search(c1, c2, lag_min, lag_max):
+    """
+    全序列搜索：对每个lag只在重叠区域内做归一化，返回(最佳lag, 归一化相关系数)
+    corr[lag] = sum_i c1[i] * c2[i + lag]，负lag通过FFT的循环索引取得
+    """
+    n1, n2 = len(c1), len(c2)
+    c1 = c1 - c1.mean()
+    c2 = c2 - c2.mean()
+    nfft = _next_fast_len(n1 + n2)
+    full = np.fft.irfft(np.conj(np.fft.rfft(c1, nfft)) * np.fft.rfft(c2, nfft), nfft)
+
+    lags = np.arange(lag_min, lag_max + 1)
+    corr = full[lags % nfft]
+
+    # 重叠区间 i ∈ [i_start, i_end)，对应c2区间 [i_start + lag, i_end + lag)
+    cs1 = np.concatenate(([0.0], np.cumsum(c1 * c1)))
+    cs2 = np.concatenate(([0.0], np.cumsum(c2 * c2)))
+    i_start = np.maximum(0, -lags)
+    i_end = np.minimum(n1, n2 - lags)
+    energy1 = cs1[i_end] - cs1[i_start]
+    energy2 = cs2[i_end + lags] - cs2[i_start + lags]
+    score = corr / (np.sqrt(np.maximum(energy1 * energy2, 0.0)) + 1e-12)
+
+    best = int(np.argmax(score))
+    return int(lags[best]), float(score[best])
+
+def estimate_shift(data1, data2, max_shift=None, coarse_points=1 << 20, refine_length=1 << 20,
+                   cancel_check=None):
+    """
+    估计data2相对data1的整数偏移：data2[i + shift] ≈ data1[i]
+    （shift > 0 表示data2前面多了shift个元素，例如多出的文件头/padding）
+    1. 两个序列按块均值降采样到约coarse_points个点，FFT互相关粗搜
+    2. 在粗搜结果附近±2个降采样块内，用全分辨率窗口做FFT互相关细化
+    :param max_shift: 最大搜索偏移，默认为较短序列长度的一半（保证足够的重叠区域）
+    :param cancel_check: 返回True时中止并抛出StreamCancelled（读取数据的各块之间检查）
+    :return: {'shift', 'score', 'coarse_factor'}
+    """
+    len1, len2 = len(data1), len(data2)
+    min_len = min(len1, len2)
+    if min_len < 2:
+        raise ValueError("数据长度不足，无法检测偏移")
+    if max_shift is None:
+        max_shift = min_len // 2
+    max_shift = int(max_shift)
+
+    # 1. 粗搜（降采样后的全序列互相关）
+    factor = max(1, -(-max(len1, len2) // coarse_points))
+    coarse1 = block_mean_decimate(data1, factor, cancel_check=cancel_check)
+    coarse2 = block_mean_decimate(data2, factor, cancel_check=cancel_check)
+    coarse_max = max_shift // factor
+    lo = max(-coarse_max, -(len(coarse1) - 1))
+    hi = min(coarse_max, len(coarse2) - 1)
+    coarse_lag, score = _overlap_normalized_search(coarse1, coarse2, lo, hi)
+    shift = coarse_lag * factor
+    if factor == 1:
+        return {"shift": shift, "score": score, "coarse_factor": factor}
+
+    # 2. 全分辨率细化：只读取粗搜结果附近的一个窗口
+    lag_min = max(-max_shift, shift - 2 * factor)
+    lag_max = min(max_shift, shift + 2 * factor)
+    start = max(0, -lag_min)
+    w = min(refine_length, len1 - start, len2 - (start + lag_max))
+    if w < 2:
+        return {"shift": shift, "score": score, "coarse_factor": factor}
+    if cancel_check and cancel_check():
+        raise StreamCancelled()
+
+    seg1 = handle_invalid_values(np.array(data1[start:start + w], dtype=np.float64), copy=False)
+    seg2 = handle_invalid_values(np.array(data2[start + lag_min:start + lag_max + w], dtype=np.float64), copy=False)
+    shift, score = _normalized_search(seg1, seg2, lag_min, lag_max)
+    return {"shift": shift, "score": score, "coarse_factor": factor}
+
+def apply_shift(data1, data2, shift):
+    """
+    按偏移返回对齐后的零拷贝视图（截取重叠部分）：ndarray/memmap为切片视图，
+    PermutedView的切片也只记录起止位置，不会读出数据
+    """
+    if shift >= 0:
+        view1, view2 = data1, data2[shift:]
+    else:
+        view1, view2 = data1[-shift:], data2
+    overlap = min(len(view1), len(view2))
+    return view1[:overlap], view2[:overlap]
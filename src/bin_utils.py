@@ -73,15 +73,48 @@ def read_bin_file(file_path, dtype=np.float32):
     except Exception as e:
         raise IOError(f"读取文件失败：{file_path}，错误：{str(e)}")
 
-def handle_invalid_values(data):
-    """处理非法值（NaN/inf），替换为0.0"""
-    return np.nan_to_num(data, nan=0.0, posinf=0.0, neginf=0.0)
+def open_bin_memmap(file_path, dtype=np.float32):
+    """以只读memmap方式打开bin文件（不读入内存，按需分页），尾部不足一个元素的字节被忽略"""
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"文件不存在：{file_path}")
+    if not os.path.isfile(file_path):
+        raise IsADirectoryError(f"路径不是文件：{file_path}")
+
+    dtype = np.dtype(dtype)
+    length = os.path.getsize(file_path) // dtype.itemsize
+    if length == 0:
+        raise ValueError(f"文件解析后为空（可能类型不匹配）：{file_path}（指定类型：{dtype}）")
+    return np.memmap(file_path, dtype=dtype, mode='r', shape=(length,))
+
+def read_bin_range(file_path, dtype, start, count):
+    """按元素偏移读取bin文件的一段（用于多线程并行读取，读取期间释放GIL）"""
+    dtype = np.dtype(dtype)
+    with open(file_path, 'rb') as f:
+        f.seek(int(start) * dtype.itemsize)
+        return np.fromfile(f, dtype=dtype, count=int(count))
+
+def iter_chunk_ranges(length, chunk_size):
+    """把[0, length)按chunk_size切分，依次返回(start, stop)"""
+    chunk_size = max(1, int(chunk_size))
+    for start in range(0, length, chunk_size):
+        yield start, min(start + chunk_size, length)
+
+def handle_invalid_values(data, copy=True):
+    """
+    处理非法值（NaN/inf），替换为0.0。
+    整数类型不可能有非法值、浮点数据中没有非法值时原样返回（不复制）；
+    copy=False 且数组可写时原地替换（用于调用方自己刚读出的数组）
+    """
+    data = np.asarray(data)
+    if data.dtype.kind not in 'fc' or np.isfinite(data).all():
+        return data
+    return np.nan_to_num(data, copy=copy or not data.flags.writeable, nan=0.0, posinf=0.0, neginf=0.0)
 
 def compare_bin_distributions(file1_path, file2_path, ax=None, dtype1=np.float32, dtype2=np.float32):
     """对比两个bin文件（支持不同数据类型），确保完全解析后再比较"""
     # 1. 完全解析两个文件（无论类型，先完整读取）
-    data1 = handle_invalid_values(read_bin_file(file1_path, dtype=dtype1))
-    data2 = handle_invalid_values(read_bin_file(file2_path, dtype=dtype2))
+    data1 = handle_invalid_values(read_bin_file(file1_path, dtype=dtype1), copy=False)
+    data2 = handle_invalid_values(read_bin_file(file2_path, dtype=dtype2), copy=False)
     
     # 2. 解析后明确打印原始长度（方便调试类型差异导致的长度问题）
     len1, len2 = len(data1), len(data2)
@@ -9,10 +9,11 @@ from PyQt5.QtGui import QKeyEvent, QDragEnterEvent, QDropEvent, QFont
 from .comparison_window import ComparisonWindow
 from .plot_window import PlotWindow
 from .tensor_concat_window import TensorConcatWindow
+from .multi_compare_window import MultiComparisonWindow
 from .config import Config
 from .style_manager import StyleManager
 from .file_handler import FileHandler
-from .window_manager import WindowManager
+from .window_manager import WindowManager, format_bytes
 from .language_manager import language_manager, get_text
 from .theme_manager import theme_manager
 from PyQt5.QtGui import QIcon
@@ -233,6 +234,15 @@ class BinViewer(QMainWindow):
         self.status_label.setStyleSheet(f"color: #666; font-size: {get_scaled_font_size(10, self.screen_dpi)}px; margin-top: 5px;")
         self.main_layout.addWidget(self.status_label)
         
+        # 内存占用（常驻在状态栏中，定时检查各窗口是否超出内存预算）
+        self.memory_label = QLabel("")
+        self.memory_label.setStyleSheet(f"color: #666; font-size: {get_scaled_font_size(10, self.screen_dpi)}px;")
+        self.statusBar().addPermanentWidget(self.memory_label)
+        self.memory_timer = QTimer(self)
+        self.memory_timer.setInterval(Config.MEMORY_CHECK_INTERVAL_MS)
+        self.memory_timer.timeout.connect(self.update_memory_status)
+        self.memory_timer.start()
+        
         # 更新所有文本
         self.update_ui_text()
         
@@ -279,7 +289,9 @@ class BinViewer(QMainWindow):
             comparison_window = ComparisonWindow(valid_files[0], valid_files[1], parent=None)
             comparison_window.show()
         elif len(valid_files) > 2:
-            QMessageBox.information(self, "提示", "不支持3个及以上文件对比")
+            # 第一个文件作为参考，其余作为候选
+            multi_window = MultiComparisonWindow(valid_files, parent=None, screen_dpi=self.screen_dpi)
+            multi_window.show()
             
         event.acceptProposedAction()
     
@@ -353,6 +365,7 @@ class BinViewer(QMainWindow):
         self.compare_btn.setText(get_text('compare_files'))
         self.tensor_concat_btn.setText(get_text('tensor_concat'))
         self.info_label.setText(get_text('tips'))
+        self.update_memory_status()
         
     def update_drop_label_text(self):
         """更新拖放区域文本"""
@@ -363,6 +376,16 @@ class BinViewer(QMainWindow):
         self.status_label.setText(message)
         QTimer.singleShot(3000, lambda: self.status_label.setText(""))
         
+    def update_memory_status(self):
+        """检查内存预算（超出时由WindowManager降级后台窗口），并在状态栏显示当前占用"""
+        usage = self.window_manager.enforce_budget()
+        self.memory_label.setText(
+            get_text('memory_usage').format(format_bytes(usage['total']), format_bytes(usage['budget']))
+        )
+        self.memory_label.setToolTip(get_text('memory_usage_detail').format(
+            format_bytes(usage['cache']), format_bytes(usage['arrays']), format_bytes(usage['figures'])
+        ))
+        
     def keyPressEvent(self, event: QKeyEvent):
         if event.key() == Qt.Key_Escape:
             self.close()
@@ -0,0 +1,190 @@
+# 进程级数组缓存（所有窗口共享：memmap、降采样数据、统计/频谱结果、热力图瓦片，按字节预算LRU淘汰）
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, wait
+import numpy as np
+from .bin_utils import open_bin_memmap, handle_invalid_values
+from .config import Config
+
+def estimate_nbytes(value):
+    """
+    缓存项占用的内存字节数：memmap按需分页、由系统页缓存承担，计为0；
+    元组/列表逐项累加；其他对象取其nbytes属性（没有时计为0）
+    """
+    if isinstance(value, np.memmap):
+        return 0
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, (tuple, list)):
+        return sum(estimate_nbytes(v) for v in value)
+    return int(getattr(value, 'nbytes', 0) or 0)
+
+class ArrayCache:
+    """
+    线程安全的LRU缓存，按字节预算（及条目数上限）淘汰最久未用的项。
+    键约定为元组，第一个元素是类别（'memmap'、'decimated'、'summary'、'spectrum'、'tile'…），
+    便于按类别清除；同一键正在计算时，其他线程等待该结果而不是重复计算
+    """
+    def __init__(self, budget=None, max_entries=None):
+        self._entries = OrderedDict()   # 键 -> (值, 字节数)
+        self._pending = {}              # 键 -> Future
+        self._lock = threading.Lock()
+        self._budget = int(budget or Config.ARRAY_CACHE_BYTES)
+        self.max_entries = max_entries or Config.ARRAY_CACHE_MAX_ENTRIES
+        self.nbytes = 0
+
+    @property
+    def budget(self):
+        return self._budget
+
+    @budget.setter
+    def budget(self, value):
+        with self._lock:
+            self._budget = max(0, int(value))
+            self._evict()
+
+    def get(self, key):
+        """命中时返回值并标记为最近使用，未命中返回None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key, value, nbytes=None):
+        """存入一项（单项超过整个预算时不缓存），返回value"""
+        nbytes = estimate_nbytes(value) if nbytes is None else int(nbytes)
+        with self._lock:
+            self._put_locked(key, value, nbytes)
+        return value
+
+    def _put_locked(self, key, value, nbytes):
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.nbytes -= old[1]
+        if nbytes > self._budget:
+            return
+        self._entries[key] = (value, nbytes)
+        self.nbytes += nbytes
+        self._evict()
+
+    def _evict(self):
+        while self._entries and (self.nbytes > self._budget or len(self._entries) > self.max_entries):
+            _, (_, nbytes) = self._entries.popitem(last=False)
+            self.nbytes -= nbytes
+
+    def get_or_compute(self, key, compute, cancel_check=None, cancel_error=None):
+        """
+        返回缓存值，未命中时调用compute()计算并缓存。
+        另一线程正在计算同一键时等待其结果；等待期间cancel_check()为真则抛出cancel_error()，
+        对方因cancel_error被取消时由本线程重新计算
+        """
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._entries.move_to_end(key)
+                    return entry[0]
+                pending = self._pending.get(key)
+                owner = pending is None
+                if owner:
+                    pending = self._pending[key] = Future()
+            if owner:
+                break
+            while not pending.done():
+                if cancel_check and cancel_check():
+                    raise cancel_error()
+                wait([pending], timeout=0.1)
+            error = pending.exception()
+            if cancel_error is not None and isinstance(error, cancel_error):
+                continue
+            if error is not None:
+                raise error
+            return pending.result()
+
+        try:
+            value = compute()
+        except BaseException as e:
+            with self._lock:
+                self._pending.pop(key, None)
+            pending.set_exception(e)
+            raise
+        nbytes = estimate_nbytes(value)
+        with self._lock:
+            self._put_locked(key, value, nbytes)
+            self._pending.pop(key, None)
+        pending.set_result(value)
+        return value
+
+    def trim(self, nbytes):
+        """按最近最少使用淘汰，直到占用不超过nbytes（不改变预算）"""
+        with self._lock:
+            while self._entries and self.nbytes > nbytes:
+                _, (_, size) = self._entries.popitem(last=False)
+                self.nbytes -= size
+
+    def value_ids(self):
+        """缓存中各数组值的id（统计各窗口内存时用来排除与缓存共享的数组）"""
+        with self._lock:
+            return {id(value) for value, _ in self._entries.values() if isinstance(value, np.ndarray)}
+
+    def discard(self, predicate):
+        """删除所有键满足predicate(key)的项"""
+        with self._lock:
+            for key in [k for k in self._entries if predicate(k)]:
+                self.nbytes -= self._entries.pop(key)[1]
+
+    def clear(self, kind=None):
+        """清空缓存；给出kind时只清除该类别"""
+        if kind is None:
+            with self._lock:
+                self._entries.clear()
+                self.nbytes = 0
+        else:
+            self.discard(lambda key: key[0] == kind)
+
+    def usage(self):
+        """(已用字节数, 条目数)"""
+        with self._lock:
+            return self.nbytes, len(self._entries)
+
+_cache = ArrayCache()
+
+def get_cache():
+    """进程内共享的缓存实例"""
+    return _cache
+
+def file_key(kind, file_path, dtype, *extra):
+    """文件相关缓存项的键：(类别, 绝对路径, 修改时间, 文件大小, 数据类型, *extra)，文件改变后自然失效"""
+    stat = os.stat(file_path)
+    return (kind, os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size, np.dtype(dtype).str) + extra
+
+def open_memmap(file_path, dtype=np.float32):
+    """共享的只读memmap（同一文件、同一数据类型在各窗口中只打开一次）"""
+    return _cache.get_or_compute(
+        file_key('memmap', file_path, dtype),
+        lambda: open_bin_memmap(file_path, dtype=np.dtype(dtype)),
+    )
+
+def decimation_step(length, max_points):
+    """长度为length的数据降采样到不超过max_points个点的步长（向上取整）"""
+    return max(1, -(-int(length) // int(max_points)))
+
+def display_dtype(dtype):
+    """显示用数据的存储类型：保持原生的紧凑类型（int8/int16/float16…），超过4字节的浮点数降为float32"""
+    dtype = np.dtype(dtype)
+    return np.dtype(np.float32) if dtype.kind == 'f' and dtype.itemsize > 4 else dtype
+
+def decimated(file_path, dtype, step):
+    """
+    文件按步长step跨步读出的显示用数据（display_dtype类型，非法值已替换为0，只读），
+    同一文件、数据类型和步长的降采样结果在各窗口间共享
+    """
+    def load():
+        source = open_memmap(file_path, dtype)
+        data = handle_invalid_values(np.array(source[::step], dtype=display_dtype(source.dtype)), copy=False)
+        data.flags.writeable = False
+        return data
+    return _cache.get_or_compute(file_key('decimated', file_path, dtype, int(step)), load)
@@ -5,14 +5,29 @@ import numpy as np
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                              QPushButton, QFileDialog, QLabel, QComboBox, 
                              QHBoxLayout, QFrame, QMessageBox, QSplitter, 
-                             QMenu, QAction)
-from PyQt5.QtCore import Qt, QTimer, pyqtSignal, QEvent, QTime
+                             QMenu, QAction, QSpinBox, QCheckBox, QDialog,
+                             QFormLayout, QLineEdit, QDialogButtonBox)
+from PyQt5.QtCore import Qt, QTimer, pyqtSignal, QEvent, QTime, QThread
 from PyQt5.QtGui import QKeyEvent, QDragEnterEvent, QDropEvent, QFont, QIcon
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
 import src.bin_utils as bin_utils # 你的自定义工具类
 from matplotlib.backends.backend_qt5 import NavigationToolbar2QT as NavigationToolbar
 from .language_manager import get_text
+from .spectrum_panel import SpectrumPanel
+from .stats_panel import StatsPanel
+from .alignment_utils import estimate_shift, apply_shift
+from .stream_metrics import stream_compare, stream_scaled_mae, StreamCancelled
+from . import cache_manager, io_manager
+from .config import Config
+from .layout_utils import PermutedView, parse_permutation, permuted_shape, detect_permutation
+from .heatmap_view import HeatmapView
+from .plot_manager import plot_visible, follow_canvas_size
+from .window_manager import WindowManager
+from .tile_pyramid import AGGREGATES, DIFF_MODES, DifferenceView
+
+# 保持运行中线程的引用，直到线程真正结束
+_running_workers = set()
 
 # 设置文件大小限制（单位：MB）
 MAX_FILE_SIZE_MB = 50  # 限制为50MB
@@ -113,6 +128,184 @@ QSplitter::handle:vertical {{
 }}
 """
 
+class AlignWorker(QThread):
+    """后台估计两个文件之间的偏移（FFT互相关），可被requestInterruption中止"""
+    result_ready = pyqtSignal(object)
+    failed = pyqtSignal(str)
+    
+    def __init__(self, data1, data2, parent=None):
+        super().__init__(parent)
+        self.data1 = data1
+        self.data2 = data2
+    
+    def run(self):
+        try:
+            result = estimate_shift(self.data1, self.data2, cancel_check=self.isInterruptionRequested)
+        except StreamCancelled:
+            return
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+        self.result_ready.emit(result)
+
+class MetricsWorker(QThread):
+    """
+    后台对全量数据计算对比指标：第一遍流式累加（MetricAccumulator），
+    第二遍同时算出不带/带偏置两种拟合下缩放后的MAE。
+    结果为 (MetricAccumulator, {(scale, bias): MAE})
+    """
+    progress = pyqtSignal(int)
+    result_ready = pyqtSignal(object, object)
+    failed = pyqtSignal(str)
+    
+    def __init__(self, data1, data2, parent=None):
+        super().__init__(parent)
+        self.data1 = data1
+        self.data2 = data2
+    
+    def run(self):
+        try:
+            acc = stream_compare(
+                self.data1, self.data2,
+                progress_callback=lambda p: self.progress.emit(p // 2),
+                cancel_check=self.isInterruptionRequested
+            )
+            fits = [acc.fit_scale(with_bias=False), acc.fit_scale(with_bias=True)]
+            maes = stream_scaled_mae(
+                self.data1, self.data2, fits,
+                progress_callback=lambda p: self.progress.emit(50 + p // 2),
+                cancel_check=self.isInterruptionRequested
+            )
+        except StreamCancelled:
+            return
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+        self.result_ready.emit(acc, dict(zip(fits, maes)))
+
+class LayoutDetectWorker(QThread):
+    """后台检测file2相对file1的维度置换（采样排序 + 全量确认）"""
+    progress = pyqtSignal(int)
+    result_ready = pyqtSignal(object)
+    failed = pyqtSignal(str)
+    
+    def __init__(self, reference, candidate, shape, parent=None):
+        super().__init__(parent)
+        self.reference = reference
+        self.candidate = candidate
+        self.shape = shape
+    
+    def run(self):
+        try:
+            result = detect_permutation(
+                self.reference, self.candidate, self.shape,
+                progress_callback=self.progress.emit,
+                cancel_check=self.isInterruptionRequested
+            )
+        except StreamCancelled:
+            return
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+        self.result_ready.emit(result)
+
+class LayoutDialog(QDialog):
+    """为file2指定原始形状和维度置换，对比时按置换后的顺序惰性读取"""
+    def __init__(self, reference, candidate, layout=None, parent=None):
+        super().__init__(parent)
+        self.reference = reference
+        self.candidate = candidate
+        self.element_count = len(candidate)
+        self.layout_result = layout
+        self.detect_worker = None
+        self.setWindowTitle(get_text('layout_dialog_title'))
+        
+        form = QFormLayout(self)
+        self.shape_input = QLineEdit(','.join(map(str, layout[0])) if layout else '')
+        self.shape_input.setPlaceholderText(get_text('shape_placeholder'))
+        form.addRow(get_text('layout_shape'), self.shape_input)
+        self.perm_input = QLineEdit(','.join(map(str, layout[1])) if layout else '')
+        self.perm_input.setPlaceholderText(get_text('permutation_placeholder'))
+        self.perm_input.setToolTip(get_text('permutation_tooltip'))
+        form.addRow(get_text('permutation'), self.perm_input)
+        
+        # 自动检测：以file1为参考，找出余弦相似度最高的置换
+        self.detect_btn = QPushButton(get_text('detect_layout'))
+        self.detect_btn.setToolTip(get_text('detect_layout_tooltip'))
+        self.detect_btn.clicked.connect(self.start_detect)
+        self.detect_label = QLabel()
+        self.detect_label.setWordWrap(True)
+        form.addRow(self.detect_btn, self.detect_label)
+        
+        buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        clear_btn = buttons.addButton(get_text('layout_clear'), QDialogButtonBox.ResetRole)
+        clear_btn.clicked.connect(self.clear_layout)
+        buttons.accepted.connect(self.accept_layout)
+        buttons.rejected.connect(self.reject)
+        form.addRow(buttons)
+        
+    def parse_layout_shape(self):
+        shape = tuple(int(d) for d in self.shape_input.text().replace(' ', '').split(',') if d)
+        if not shape or int(np.prod(shape)) != self.element_count:
+            raise ValueError(f"{shape} != {self.element_count}")
+        return shape
+        
+    def start_detect(self):
+        if self.detect_worker is not None:
+            return
+        try:
+            shape = self.parse_layout_shape()
+            if len(self.reference) != self.element_count:
+                raise ValueError(get_text('detect_layout_length').format(len(self.reference), self.element_count))
+        except ValueError as e:
+            QMessageBox.warning(self, get_text('error'), get_text('layout_error').format(str(e)))
+            return
+        self.detect_btn.setEnabled(False)
+        self.detect_worker = LayoutDetectWorker(self.reference, self.candidate, shape)
+        self.detect_worker.progress.connect(
+            lambda p: self.detect_label.setText(get_text('detect_layout_progress').format(p))
+        )
+        self.detect_worker.result_ready.connect(self.on_detect_finished)
+        self.detect_worker.failed.connect(self.on_detect_failed)
+        self.detect_worker.start()
+        
+    def stop_detect(self):
+        if self.detect_worker is not None:
+            self.detect_worker.requestInterruption()
+            self.detect_worker.wait()
+            self.detect_worker = None
+        self.detect_btn.setEnabled(True)
+        
+    def on_detect_finished(self, result):
+        self.stop_detect()
+        self.perm_input.setText(','.join(map(str, result['perm'])))
+        ranking = "  ".join(
+            f"({','.join(map(str, perm))}) {cosine:.4f}" for perm, cosine in result['ranking'][:3]
+        )
+        self.detect_label.setText(get_text('detect_layout_result').format(result['cosine'], ranking))
+        
+    def on_detect_failed(self, message):
+        self.stop_detect()
+        self.detect_label.setText(get_text('layout_error').format(message))
+        
+    def done(self, result):
+        self.stop_detect()
+        super().done(result)
+        
+    def clear_layout(self):
+        self.layout_result = None
+        self.accept()
+        
+    def accept_layout(self):
+        try:
+            shape = self.parse_layout_shape()
+            perm = parse_permutation(self.perm_input.text(), len(shape))
+        except ValueError as e:
+            QMessageBox.warning(self, get_text('error'), get_text('layout_error').format(str(e)))
+            return
+        self.layout_result = (shape, perm)
+        self.accept()
+
 class ComparisonWindow(QMainWindow):
     """独立的文件对比窗口，支持图片保存和DPI适配"""
     def __init__(self, file1_path, file2_path, dtype1="float32", dtype2="float32", parent=None, screen_dpi=None):
@@ -125,6 +318,15 @@ class ComparisonWindow(QMainWindow):
         self.file2_path = file2_path
         self.dtype1 = dtype1
         self.dtype2 = dtype2
+        self.shift = 0  # file2相对file1的偏移（元素数）
+        self.align_worker = None
+        self.metric_acc = None  # 全量数据的流式指标累加结果（长度不一致或尚未算完时为None）
+        self.scaled_mae = {}  # (scale, bias) -> 缩放后的MAE，切换是否拟合偏置时不必重新扫描
+        self.metrics_worker = None
+        self.metrics_status = None  # 后台计算指标时的标题（进度/出错信息）
+        self.layout2 = None  # file2的(原始形状, 维度置换)，为None时按原顺序对比
+        self.memory_level = 0  # 内存预算降级级别（0为完整显示，见 WindowManager.enforce_budget）
+        self.window_manager = WindowManager()
         
         # 固定窗口创建时的DPI，不随显示器变化
         self.screen_dpi = screen_dpi or QApplication.desktop().logicalDpiX()
@@ -134,7 +336,7 @@ class ComparisonWindow(QMainWindow):
         self.base_window_width = 1000
         self.base_window_height = 800
         self.base_frame_min_height = 200
-        self.base_splitter_sizes = [250, 250, 300]
+        self.base_splitter_sizes = [250, 250, 300, 300, 200, 200]
         self.base_figure_size = (8, 3)
         
         # 计算缩放后的尺寸
@@ -182,6 +384,7 @@ class ComparisonWindow(QMainWindow):
         self.init_control_bar(main_layout)
         self.init_plot_area(main_layout)
         self.load_and_plot_data()
+        self.window_manager.register_window(self)
         
         # 安装事件过滤器，优化重绘
         self.installEventFilter(self)
@@ -410,8 +613,59 @@ class ComparisonWindow(QMainWindow):
         self.dtype2_combo.setMinimumWidth(get_scaled_value(90, self.initial_dpi))
         self.dtype2_combo.currentTextChanged.connect(self.on_dtype2_changed)
         file2_layout.addWidget(self.dtype2_combo)
+        
+        self.layout2_btn = QPushButton(get_text('file2_layout'))
+        self.layout2_btn.setCheckable(True)
+        self.layout2_btn.setToolTip(get_text('file2_layout_tooltip'))
+        self.layout2_btn.clicked.connect(self.edit_layout2)
+        file2_layout.addWidget(self.layout2_btn)
         layout.addLayout(file2_layout)
         
+        # 偏移对齐
+        shift_label = QLabel(get_text('shift'))
+        shift_label.setFont(QFont(
+            shift_label.font().family(),
+            get_scaled_font_size(10, self.initial_dpi)
+        ))
+        layout.addWidget(shift_label)
+        
+        self.shift_spinbox = QSpinBox()
+        self.shift_spinbox.setRange(-2**31 + 1, 2**31 - 1)
+        self.shift_spinbox.setValue(0)
+        self.shift_spinbox.setKeyboardTracking(False)
+        self.shift_spinbox.setToolTip(get_text('shift_tooltip'))
+        self.shift_spinbox.valueChanged.connect(self.on_shift_changed)
+        layout.addWidget(self.shift_spinbox)
+        
+        self.align_btn = QPushButton(get_text('auto_align'))
+        self.align_btn.clicked.connect(self.start_auto_align)
+        layout.addWidget(self.align_btn)
+        
+        # 缩放拟合是否带偏置
+        self.fit_bias_check = QCheckBox(get_text('fit_bias'))
+        self.fit_bias_check.setToolTip(get_text('fit_bias_tooltip'))
+        self.fit_bias_check.toggled.connect(lambda _: self.refresh_comparison_title())
+        layout.addWidget(self.fit_bias_check)
+        
+        # 频谱面板开关
+        self.spectrum_btn = QPushButton(get_text('spectrum'))
+        self.spectrum_btn.setCheckable(True)
+        self.spectrum_btn.toggled.connect(self.on_spectrum_toggled)
+        layout.addWidget(self.spectrum_btn)
+        
+        # 统计面板开关（与单文件窗口共享统计缓存）
+        self.stats_btn = QPushButton(get_text('stats'))
+        self.stats_btn.setCheckable(True)
+        self.stats_btn.toggled.connect(self.on_stats_toggled)
+        layout.addWidget(self.stats_btn)
+        
+        # 差异热力图面板开关
+        self.diff_btn = QPushButton(get_text('diff_heatmap'))
+        self.diff_btn.setCheckable(True)
+        self.diff_btn.setToolTip(get_text('diff_heatmap_tooltip'))
+        self.diff_btn.toggled.connect(self.on_diff_toggled)
+        layout.addWidget(self.diff_btn)
+        
         layout.addStretch(1)
         parent_layout.addWidget(control_bar)
         
@@ -549,11 +803,37 @@ class ComparisonWindow(QMainWindow):
         self.compare_canvas.mpl_connect('button_press_event', lambda event: self.on_mouse_press(event, "compare"))
         self.compare_canvas.mpl_connect('motion_notify_event', lambda event: self.on_mouse_move(event, "compare"))
         self.compare_canvas.mpl_connect('button_release_event', lambda event: self.on_mouse_release(event, "compare"))
+        # 折线只包含可见范围的顶点，数量随画布宽度变化
+        follow_canvas_size(self.file1_canvas, self.file1_ax)
+        follow_canvas_size(self.file2_canvas, self.file2_ax)
+        follow_canvas_size(self.compare_canvas, self.compare_ax)
+        
+        # ---------------------- 5. 差异热力图（默认隐藏，按最大值聚合使个别异常点在任何缩放级别都可见） ----------------------
+        self.diff_view = HeatmapView(self, self.initial_dpi)
+        self.diff_view.aggregate_combo.setCurrentIndex(AGGREGATES.index('max'))
+        self.diff_mode_combo = QComboBox()
+        for mode in DIFF_MODES:
+            self.diff_mode_combo.addItem(get_text(f'diff_{mode}'), mode)
+        self.diff_mode_combo.currentIndexChanged.connect(lambda _: self.update_diff_heatmap())
+        self.diff_view.controls_layout.insertWidget(0, QLabel(get_text('diff_mode')))
+        self.diff_view.controls_layout.insertWidget(1, self.diff_mode_combo)
+        self.diff_view.setVisible(False)
+        
+        # ---------------------- 6. 频谱面板（默认隐藏） ----------------------
+        self.spectrum_panel = SpectrumPanel(self, self.initial_dpi)
+        self.spectrum_panel.setVisible(False)
+        
+        # ---------------------- 7. 统计面板（默认隐藏） ----------------------
+        self.stats_panel = StatsPanel(self, self.initial_dpi)
+        self.stats_panel.setVisible(False)
         
         # 添加到splitter（原有逻辑不变）
         main_splitter.addWidget(self.file1_frame)
         main_splitter.addWidget(self.file2_frame)
         main_splitter.addWidget(self.compare_frame)
+        main_splitter.addWidget(self.diff_view)
+        main_splitter.addWidget(self.spectrum_panel)
+        main_splitter.addWidget(self.stats_panel)
         main_splitter.setSizes(self.scaled_splitter_sizes)
         parent_layout.addWidget(main_splitter, 1)
     # ---------------------- 功能实现 ----------------------
@@ -610,21 +890,135 @@ class ComparisonWindow(QMainWindow):
         return data[::step]
     def load_and_plot_data(self):
         """加载并绘制所有数据"""
-        # 读取文件数据
-        self.data1 = self.downsample_data(  # 👇 加降采样
-            bin_utils.handle_invalid_values(
-                bin_utils.read_bin_file(self.file1_path, dtype=np.dtype(self.dtype1))
-            )
-        )
-        self.data2 = self.downsample_data(  # 👇 加降采样
-            bin_utils.handle_invalid_values(
-                bin_utils.read_bin_file(self.file2_path, dtype=np.dtype(self.dtype2))
-            )
-        )
+        # 以memmap打开文件，偏移通过零拷贝切片实现；两个文件在共享I/O线程池中并行打开
+        future1 = io_manager.submit(self.file1_path, cache_manager.open_memmap, self.file1_path, self.dtype1)
+        self.open_file2()
+        self.raw1 = future1.result()
+        self.update_aligned_data()
         # 绘制图形（不变）
         self.plot_file1()
         self.plot_file2()
         self.plot_comparison()
+    def update_aligned_data(self):
+        """按当前偏移取对齐后的视图并降采样，全量数据的对比指标在后台线程中计算"""
+        if self.shift:
+            view1, view2 = apply_shift(self.raw1, self.raw2, self.shift)
+        else:
+            view1, view2 = self.raw1, self.raw2
+        self.view1, self.view2 = view1, view2
+        self.load_previews()
+        self.start_metrics()
+        if self.diff_btn.isChecked():
+            self.update_diff_heatmap()
+    def start_metrics(self):
+        """在后台线程中重新计算全量对比指标（长度不一致时不计算），完成后更新对比图标题"""
+        self.stop_metrics()
+        self.metric_acc = None
+        self.scaled_mae = {}
+        self.metrics_status = None
+        if len(self.view1) != len(self.view2):
+            return
+        self.metrics_status = get_text('metrics_computing').format(0)
+        worker = MetricsWorker(self.view1, self.view2)
+        worker.progress.connect(self._on_metrics_progress)
+        worker.result_ready.connect(self._on_metrics_ready)
+        worker.failed.connect(self._on_metrics_failed)
+        worker.finished.connect(lambda: _running_workers.discard(worker))
+        _running_workers.add(worker)
+        self.metrics_worker = worker
+        worker.start()
+    def stop_metrics(self):
+        if self.metrics_worker is not None:
+            self.metrics_worker.requestInterruption()
+            self.metrics_worker.progress.disconnect()
+            self.metrics_worker.result_ready.disconnect()
+            self.metrics_worker.failed.disconnect()
+            self.metrics_worker = None
+    def _on_metrics_progress(self, percent):
+        self.metrics_status = get_text('metrics_computing').format(percent)
+        self.refresh_comparison_title()
+    def _on_metrics_ready(self, acc, scaled_mae):
+        self.metrics_worker = None
+        self.metric_acc = acc
+        self.scaled_mae = scaled_mae
+        self.metrics_status = None
+        self.refresh_comparison_title()
+    def _on_metrics_failed(self, message):
+        self.metrics_worker = None
+        self.metrics_status = get_text('calc_error').format(message)
+        self.refresh_comparison_title()
+    def load_previews(self):
+        """
+        降采样读出两个视图的预览（后台降级时按级别用更少的点）。
+        先降采样再处理非法值：只读取被采样到的元素（置换视图也不必整体读出），
+        在读出的副本上原地替换；两个文件的降采样读取并行进行。
+        未偏移、未置换的文件与其他窗口共享同一份降采样数据
+        """
+        max_points = max(1, Config.MAX_DOWNSAMPLE_POINTS // Config.MEMORY_COARSE_FACTOR ** self.memory_level)
+        def load_preview(file_path, dtype, raw, view):
+            if view is raw and isinstance(raw, np.memmap):
+                step = cache_manager.decimation_step(len(raw), max_points)
+                return cache_manager.decimated(file_path, dtype, step)
+            preview = np.asarray(self.downsample_data(view, max_points))
+            preview = np.array(preview, dtype=cache_manager.display_dtype(preview.dtype))
+            return bin_utils.handle_invalid_values(preview, copy=False)
+        future1 = io_manager.submit(self.file1_path, load_preview, self.file1_path, self.dtype1, self.raw1, self.view1)
+        self.data2 = load_preview(self.file2_path, self.dtype2, self.raw2, self.view2)
+        self.data1 = future1.result()
+    def memory_arrays(self):
+        """本窗口常驻内存的数组（供 WindowManager 统计内存占用）"""
+        yield self.data1
+        yield self.data2
+        yield from self.diff_view.memory_arrays()
+    def reduce_memory(self, level):
+        """
+        转入后台且总内存超出预算时降级：1 = 预览改用更粗的降采样，
+        2 = 只保留memmap和最粗的预览，释放差异热力图的其余切片；重新激活时恢复
+        """
+        self.memory_level = level
+        if level >= 2:
+            self.diff_view.release_slices()
+        self.redraw_previews()
+    def redraw_previews(self):
+        """按当前降级级别重新读出预览并重绘（全量指标不变）"""
+        self.load_previews()
+        self.plot_file1()
+        self.plot_file2()
+        self.plot_comparison()
+    def changeEvent(self, event):
+        """激活时更新窗口的最近使用顺序，之前被降级的恢复完整显示"""
+        if event.type() == QEvent.ActivationChange and self.isActiveWindow():
+            self.window_manager.touch_window(self)
+            if self.memory_level:
+                self.memory_level = 0
+                self.redraw_previews()
+        super().changeEvent(event)
+    def comparison_title(self):
+        """对比图标题：长度不一致、后台计算中（或出错）时给出提示，否则为相似度指标"""
+        if len(self.view1) != len(self.view2):
+            return get_text('file_length_mismatch').format(len(self.view1), len(self.view2))
+        if self.metric_acc is None:
+            return self.metrics_status or ""
+        try:
+            return self.similarity_title()
+        except Exception as e:
+            return get_text('calc_error').format(str(e))
+    def refresh_comparison_title(self):
+        """只更新对比图标题，不重绘曲线"""
+        self.compare_ax.set_title(self.comparison_title(), fontsize=get_scaled_font_size(10, self.initial_dpi))
+        self.compare_canvas.draw_idle()
+    def similarity_title(self):
+        """对比图标题：原始指标 + 最小二乘缩放（可选偏置）后的指标"""
+        acc = self.metric_acc
+        title = get_text('similarity').format(acc.cosine_similarity(), acc.mse(), acc.mae())
+        if acc.skipped:
+            title += get_text('nonfinite_skipped').format(acc.skipped)
+        scale, bias = acc.fit_scale(with_bias=self.fit_bias_check.isChecked())
+        # 缩放后的MSE由累加量直接得到；MAE由后台第二遍扫描按(scale, bias)缓存
+        scaled_mae = self.scaled_mae[(scale, bias)]
+        return title + "\n" + get_text('similarity_scaled').format(
+            scale, bias, acc.scaled_mse(scale, bias), scaled_mae
+        )
     def should_show_data_points(self, ax, data_len):
         x_start, x_end = ax.get_xlim()
         visible_points = int(x_end - x_start) + 1  # 当前视图的点数
@@ -632,8 +1026,8 @@ class ComparisonWindow(QMainWindow):
     def plot_file1(self):
         """绘制文件1的图形（带DPI适配）"""
         self.file1_ax.clear()
-        self.file1_ax.plot(
-            self.data1, 
+        plot_visible(
+            self.file1_ax, self.data1,
             color="#4285f4", 
             linewidth=get_scaled_value(1.0, self.initial_dpi)
         )
@@ -676,8 +1070,8 @@ class ComparisonWindow(QMainWindow):
     def plot_file2(self):
         """绘制文件2的图形（带DPI适配）"""
         self.file2_ax.clear()
-        self.file2_ax.plot(
-            self.data2, 
+        plot_visible(
+            self.file2_ax, self.data2,
             color="#ea4335", 
             linewidth=get_scaled_value(1.0, self.initial_dpi)
         )
@@ -825,15 +1219,15 @@ class ComparisonWindow(QMainWindow):
         min_len = min(len1, len2)  # 取较短数据的长度，避免索引超出
         
         # 1. 绘制两条数据线（原有逻辑不变）
-        self.compare_ax.plot(
-            self.data1, 
+        plot_visible(
+            self.compare_ax, self.data1,
             color="#4285f4", 
             linewidth=get_scaled_value(1.0, self.initial_dpi),
             alpha=0.7,
             label=f"file1 ({self.dtype1})"
         )
-        self.compare_ax.plot(
-            self.data2, 
+        plot_visible(
+            self.compare_ax, self.data2,
             color="#ea4335", 
             linewidth=get_scaled_value(1.0, self.initial_dpi),
             alpha=0.7,
@@ -867,25 +1261,7 @@ class ComparisonWindow(QMainWindow):
             )
         
         # 3. 原有标题、指标计算、坐标轴设置（不变）
-        if len1 != len2:
-            self.compare_ax.set_title(
-                get_text('file_length_mismatch').format(len1, len2), 
-                fontsize=get_scaled_font_size(10, self.initial_dpi)
-            )
-        else:
-            try:
-                cos_sim = bin_utils.cosine_similarity([self.data1], [self.data2])[0][0]
-                mse = bin_utils.mean_squared_error(self.data1, self.data2)
-                mae = bin_utils.mean_absolute_error(self.data1, self.data2)
-                self.compare_ax.set_title(
-                    get_text('similarity').format(cos_sim, mse, mae), 
-                    fontsize=get_scaled_font_size(10, self.initial_dpi)
-                )
-            except Exception as e:
-                self.compare_ax.set_title(
-                    get_text('calc_error').format(str(e)), 
-                    fontsize=get_scaled_font_size(10, self.initial_dpi)
-                )
+        self.compare_ax.set_title(self.comparison_title(), fontsize=get_scaled_font_size(10, self.initial_dpi))
         
         self.compare_ax.set_xlabel(
             get_text('index'), 
@@ -904,11 +1280,9 @@ class ComparisonWindow(QMainWindow):
         self.compare_canvas.draw()    
     def on_dtype1_changed(self, dtype):
         self.dtype1 = dtype
-        self.data1 = self.downsample_data(  # 记得之前加的降采样
-            bin_utils.handle_invalid_values(
-                bin_utils.read_bin_file(self.file1_path, dtype=np.dtype(self.dtype1))
-            )
-        )
+        self.raw1 = cache_manager.open_memmap(self.file1_path, self.dtype1)
+        self.reset_shift()
+        self.update_aligned_data()
         # 清理file1和compare区的提示框
         for key in ["file1", "compare"]:
             if self.tooltip[key]:
@@ -918,14 +1292,16 @@ class ComparisonWindow(QMainWindow):
         # 重绘
         self.plot_file1()
         self.plot_comparison()
+        if self.spectrum_btn.isChecked():
+            self.update_spectrum()
+        if self.stats_btn.isChecked():
+            self.update_stats()
         
     def on_dtype2_changed(self, dtype):
         self.dtype2 = dtype
-        self.data2 = self.downsample_data(
-            bin_utils.handle_invalid_values(
-                bin_utils.read_bin_file(self.file2_path, dtype=np.dtype(self.dtype2))
-            )
-        )
+        self.open_file2()
+        self.reset_shift()
+        self.update_aligned_data()
         # 清理file2和compare区的提示框
         for key in ["file2", "compare"]:
             if self.tooltip[key]:
@@ -935,7 +1311,134 @@ class ComparisonWindow(QMainWindow):
         # 重绘
         self.plot_file2()
         self.plot_comparison()
+        if self.spectrum_btn.isChecked():
+            self.update_spectrum()
+        if self.stats_btn.isChecked():
+            self.update_stats()
+    def open_file2(self):
+        """以memmap打开file2；设置了布局时包装为置换视图（元素数不再匹配时清除布局）"""
+        raw2 = cache_manager.open_memmap(self.file2_path, self.dtype2)
+        if self.layout2 is not None and int(np.prod(self.layout2[0])) != len(raw2):
+            self.layout2 = None
+        if self.layout2 is not None:
+            shape, perm = self.layout2
+            raw2 = PermutedView(raw2, shape, perm)
+            self.layout2_btn.setToolTip(
+                f"{shape} -> {permuted_shape(shape, perm)}\n{get_text('file2_layout_tooltip')}"
+            )
+        else:
+            self.layout2_btn.setToolTip(get_text('file2_layout_tooltip'))
+        self.layout2_btn.setChecked(self.layout2 is not None)
+        self.raw2 = raw2
+    def edit_layout2(self):
+        """设置file2的布局转换，之后按置换后的元素顺序与file1对比"""
+        candidate = cache_manager.open_memmap(self.file2_path, self.dtype2)
+        dialog = LayoutDialog(self.raw1, candidate, self.layout2, self)
+        if dialog.exec_() == QDialog.Accepted:
+            self.layout2 = dialog.layout_result
+            self.on_dtype2_changed(self.dtype2)
+        else:
+            self.layout2_btn.setChecked(self.layout2 is not None)
+    def reset_shift(self):
+        """数据类型变化后原偏移（按元素计）不再有意义，清零"""
+        self.shift = 0
+        self.shift_spinbox.blockSignals(True)
+        self.shift_spinbox.setValue(0)
+        self.shift_spinbox.blockSignals(False)
+    def on_shift_changed(self, value):
+        """应用新的偏移并重绘所有图形"""
+        self.shift = value
+        self.update_aligned_data()
+        for key in ["file1", "file2", "compare"]:
+            if self.tooltip[key]:
+                self.tooltip[key].remove()
+                self.tooltip[key] = None
+                self.last_annotated_index[key] = -1
+        self.plot_file1()
+        self.plot_file2()
+        self.plot_comparison()
+    def start_auto_align(self):
+        """在后台估计最佳偏移，完成后自动应用"""
+        if self.align_worker is not None:
+            return
+        self.align_btn.setEnabled(False)
+        self.align_btn.setText(get_text('aligning'))
+        worker = AlignWorker(self.raw1, self.raw2)
+        worker.result_ready.connect(self.on_align_finished)
+        worker.failed.connect(self.on_align_failed)
+        worker.finished.connect(lambda: _running_workers.discard(worker))
+        _running_workers.add(worker)
+        self.align_worker = worker
+        worker.start()
+    def _finish_align(self):
+        self.align_worker.wait()
+        self.align_worker = None
+        self.align_btn.setEnabled(True)
+        self.align_btn.setText(get_text('auto_align'))
+    def on_align_finished(self, result):
+        self._finish_align()
+        self.shift_spinbox.setToolTip(
+            get_text('align_result').format(result['shift'], result['score'])
+        )
+        self.shift_spinbox.setValue(result['shift'])
+    def on_align_failed(self, message):
+        self._finish_align()
+        QMessageBox.warning(self, get_text('error'), get_text('align_failed').format(message))
+    def on_spectrum_toggled(self, checked):
+        """显示/隐藏频谱面板"""
+        self.spectrum_panel.setVisible(checked)
+        if checked:
+            self.update_spectrum()
+        else:
+            self.spectrum_panel.stop()
+    def update_spectrum(self):
+        """在后台重新计算两个文件的频谱（叠加显示）"""
+        self.spectrum_panel.set_sources([
+            (self.file1_path, self.dtype1, f"file1 ({self.dtype1})", "#4285f4"),
+            (self.file2_path, self.dtype2, f"file2 ({self.dtype2})", "#ea4335"),
+        ])
+    def on_stats_toggled(self, checked):
+        """显示/隐藏统计面板"""
+        self.stats_panel.setVisible(checked)
+        if checked:
+            self.update_stats()
+        else:
+            self.stats_panel.stop()
+    def update_stats(self):
+        """统计两个文件（单文件窗口中已统计过的文件直接取缓存）"""
+        self.stats_panel.set_sources([
+            (self.file1_path, self.dtype1, f"file1 ({self.dtype1})"),
+            (self.file2_path, self.dtype2, f"file2 ({self.dtype2})"),
+        ])
+    def on_diff_toggled(self, checked):
+        """显示/隐藏差异热力图面板"""
+        self.diff_view.setVisible(checked)
+        if checked:
+            self.update_diff_heatmap()
+        else:
+            self.diff_view.stop()
+    def update_diff_heatmap(self):
+        """
+        按当前对齐结果建立差异视图：只建立惰性视图，显示瓦片时才从两个文件读取同一区域计算差异。
+        file2设置了布局且没有偏移时默认按置换后的形状显示
+        """
+        if len(self.view1) != len(self.view2):
+            self.diff_view.clear(get_text('diff_length_mismatch').format(len(self.view1), len(self.view2)))
+            return
+        default_shape = self.view2.shape if isinstance(self.view2, PermutedView) else None
+        diff = DifferenceView(self.view1, self.view2, self.diff_mode_combo.currentData())
+        self.diff_view.set_data(diff, default_shape)
     def closeEvent(self, event):
+        self.spectrum_panel.stop()
+        self.stats_panel.stop()
+        self.diff_view.stop()
+        self.stop_metrics()
+        if self.align_worker is not None:
+            self.align_worker.requestInterruption()
+            self.align_worker.result_ready.disconnect()
+            self.align_worker.failed.disconnect()
+            self.align_worker = None
+        self.window_manager.unregister_window(self)
         # 清理所有提示框（避免内存残留）
         for key in ["file1", "file2", "compare"]:
             if self.tooltip[key]:
@@ -0,0 +1,134 @@
+# 拼接清单（JSON描述多个拼接任务，可无界面批量执行，独立任务在进程池中并行）
+import os
+import sys
+import json
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from .concat_utils import stream_concat_to_file
+from .config import Config
+
+MANIFEST_VERSION = 1
+
+def make_job(inputs, output, dtype="float32", shapes=None, axis=0):
+    """构造一个拼接任务（shapes为None时按一维简单拼接）"""
+    return {
+        'inputs': list(inputs),
+        'shapes': [list(shape) for shape in shapes] if shapes is not None else None,
+        'dtype': np.dtype(dtype).name,
+        'axis': int(axis),
+        'output': output,
+    }
+
+def _to_manifest_path(path, base_dir):
+    """尽量保存为相对清单所在目录的路径，清单和数据一起移动后仍可用"""
+    try:
+        return os.path.relpath(path, base_dir).replace(os.sep, '/')
+    except ValueError:
+        # Windows下不同盘符无法转为相对路径
+        return path
+
+def _validate_job(job, index):
+    for key in ('inputs', 'output'):
+        if not job.get(key):
+            raise ValueError(f"任务 {index} 缺少字段 '{key}'")
+    shapes = job.get('shapes')
+    if shapes is not None and len(shapes) != len(job['inputs']):
+        raise ValueError(f"任务 {index} 的形状数量与输入文件数量不一致")
+    np.dtype(job.get('dtype', 'float32'))
+
+def load_manifest(manifest_path):
+    """
+    读取清单，返回任务列表（相对路径按清单所在目录解析为绝对路径）
+    清单格式：{"version": 1, "jobs": [{"inputs", "shapes", "dtype", "axis", "output"}, ...]}
+    """
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    jobs = manifest.get('jobs', []) if isinstance(manifest, dict) else manifest
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+
+    resolved = []
+    for index, job in enumerate(jobs):
+        _validate_job(job, index)
+        resolved.append(make_job(
+            [os.path.join(base_dir, path) for path in job['inputs']],
+            os.path.join(base_dir, job['output']),
+            job.get('dtype', 'float32'), job.get('shapes'), job.get('axis', 0)
+        ))
+
+    outputs = [os.path.normcase(os.path.abspath(job['output'])) for job in resolved]
+    if len(set(outputs)) != len(outputs):
+        raise ValueError("清单中有多个任务写入同一个输出文件")
+    return resolved
+
+def save_manifest(manifest_path, jobs):
+    """保存清单（路径写为相对清单所在目录的形式）"""
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    stored = []
+    for job in jobs:
+        job = dict(job)
+        job['inputs'] = [_to_manifest_path(path, base_dir) for path in job['inputs']]
+        job['output'] = _to_manifest_path(job['output'], base_dir)
+        stored.append(job)
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump({'version': MANIFEST_VERSION, 'jobs': stored}, f, ensure_ascii=False, indent=2)
+
+def add_job_to_manifest(manifest_path, job):
+    """把任务追加到清单（已有同一输出文件的任务时替换它），清单不存在时新建"""
+    jobs = load_manifest(manifest_path) if os.path.exists(manifest_path) else []
+    target = os.path.normcase(os.path.abspath(job['output']))
+    jobs = [j for j in jobs if os.path.normcase(os.path.abspath(j['output'])) != target]
+    jobs.append(job)
+    save_manifest(manifest_path, jobs)
+    return len(jobs)
+
+def run_job(job, chunk_size=None):
+    """执行单个任务（流式写出，峰值内存只与chunk_size有关），返回输出形状"""
+    return stream_concat_to_file(
+        job['inputs'], job['output'], job['dtype'],
+        shapes=job['shapes'], axis=job['axis'], chunk_size=chunk_size
+    )
+
+def run_manifest(jobs, max_workers=None, chunk_size=None, on_job_done=None):
+    """
+    在进程池中并行执行相互独立的任务，单个任务失败不影响其他任务
+    :param on_job_done: 回调 on_job_done(index, job, out_shape, error)
+    :return: [(job, out_shape, error), ...]，顺序与jobs一致
+    """
+    if not jobs:
+        return []
+    max_workers = max(1, min(max_workers or os.cpu_count() or 1, len(jobs)))
+    chunk_size = chunk_size or Config.STREAM_CHUNK_ELEMENTS
+    results = [None] * len(jobs)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(run_job, job, chunk_size): index for index, job in enumerate(jobs)}
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                out_shape, error = future.result(), None
+            except Exception as e:
+                out_shape, error = None, str(e)
+            results[index] = (jobs[index], out_shape, error)
+            if on_job_done:
+                on_job_done(index, jobs[index], out_shape, error)
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="按JSON清单批量执行张量拼接（无界面）")
+    parser.add_argument('manifest', help="清单文件路径")
+    parser.add_argument('-j', '--jobs', type=int, default=None, help="并行进程数（默认CPU核数）")
+    parser.add_argument('--chunk-size', type=int, default=None, help="每次拷贝的元素数（决定每个进程的峰值内存）")
+    args = parser.parse_args(argv)
+
+    jobs = load_manifest(args.manifest)
+    def report(index, job, out_shape, error):
+        status = f"失败: {error}" if error else f"完成 {tuple(out_shape)}"
+        print(f"[{index + 1}/{len(jobs)}] {job['output']} {status}", flush=True)
+
+    results = run_manifest(jobs, args.jobs, args.chunk_size, on_job_done=report)
+    failed = sum(1 for _, _, error in results if error)
+    print(f"共 {len(results)} 个任务，成功 {len(results) - failed}，失败 {failed}")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,206 @@
+# 流式拼接（memmap预分配输出，按块拷贝，不整体载入内存）
+import os
+import re
+import numpy as np
+from .bin_utils import open_bin_memmap, iter_chunk_ranges
+from .config import Config
+
+class ConcatCancelled(Exception):
+    """流式拼接被中途取消"""
+    pass
+
+def concat_output_shape(shapes, axis):
+    """
+    校验各输入形状并返回拼接结果形状（除拼接轴外其余维度必须一致）
+    :param shapes: 每个输入的形状元组
+    """
+    if not shapes:
+        raise ValueError("没有可拼接的输入")
+    ndim = len(shapes[0])
+    if not 0 <= axis < ndim:
+        raise ValueError(f"拼接维度 {axis} 超出范围（张量维度为 {ndim}）")
+    for shape in shapes[1:]:
+        if len(shape) != ndim:
+            raise ValueError(f"张量维度不一致: {shapes[0]} vs {shape}")
+        if shape[:axis] != shapes[0][:axis] or shape[axis + 1:] != shapes[0][axis + 1:]:
+            raise ValueError(f"除拼接维度 {axis} 外形状不一致: {shapes[0]} vs {shape}")
+
+    out_shape = list(shapes[0])
+    out_shape[axis] = sum(shape[axis] for shape in shapes)
+    return tuple(out_shape)
+
+def slab_view(shape, axis):
+    """
+    把任意维张量按拼接轴看作二维 (outer, shape[axis] * inner)：
+    沿axis拼接等价于这个二维矩阵按列拼接，每个输入在输出中占一段连续的列
+    """
+    outer = int(np.prod(shape[:axis], dtype=np.int64))
+    width = int(np.prod(shape[axis:], dtype=np.int64))
+    return outer, width
+
+def parse_split_spec(text, dim):
+    """
+    解析拆分方式，返回沿拆分轴的区间列表[(start, stop), ...]
+      "4"      -> 均分为4份（不能整除时前面的分片多1）
+      "2,3,5"  -> 依次按大小切分（总和必须等于该维长度）
+      "10:20"  -> 只截取[10, 20)这一段（与Python切片相同，支持负数和省略，如":8"、"-4:"）
+    """
+    text = text.strip()
+    if not text:
+        raise ValueError("请输入拆分方式")
+    if ':' in text:
+        parts = text.split(':')
+        if len(parts) != 2:
+            raise ValueError(f"切片格式应为 start:stop：{text}")
+        start, stop, _ = slice(*[int(p) if p.strip() else None for p in parts]).indices(dim)
+        if stop <= start:
+            raise ValueError(f"切片 {text} 在长度 {dim} 的维度上为空")
+        return [(start, stop)]
+
+    sizes = [int(p) for p in re.findall(r'-?\d+', text)]
+    if not sizes:
+        raise ValueError(f"无法解析拆分方式：{text}")
+    if len(sizes) == 1:
+        n = sizes[0]
+        if not 1 <= n <= dim:
+            raise ValueError(f"份数 {n} 超出范围（该维长度为 {dim}）")
+        base, extra = divmod(dim, n)
+        sizes = [base + 1] * extra + [base] * (n - extra)
+    elif any(size <= 0 for size in sizes) or sum(sizes) != dim:
+        raise ValueError(f"各分片大小之和 {sum(sizes)} 与该维长度 {dim} 不一致")
+
+    bounds = np.concatenate(([0], np.cumsum(sizes))).tolist()
+    return list(zip(bounds[:-1], bounds[1:]))
+
+def _copy_columns(dst2d, dst_col, src2d, src_col, width, chunk_size, on_copied, cancel_check):
+    """把src2d[:, src_col:src_col+width]按块拷贝到dst2d[:, dst_col:dst_col+width]"""
+    rows = src2d.shape[0]
+    # 一行放得下时按多行拷贝，否则一行内再按列切块
+    rows_per_block = max(1, chunk_size // max(1, width))
+    cols_per_block = max(1, min(width, chunk_size))
+    for r0, r1 in iter_chunk_ranges(rows, rows_per_block):
+        for c0, c1 in iter_chunk_ranges(width, cols_per_block):
+            if cancel_check and cancel_check():
+                raise ConcatCancelled()
+            dst2d[r0:r1, dst_col + c0:dst_col + c1] = src2d[r0:r1, src_col + c0:src_col + c1]
+            on_copied((r1 - r0) * (c1 - c0))
+
+def write_memmap_atomically(out_path, dtype, shape, fill):
+    """
+    以memmap预分配out_path并调用fill(out)写入：先写临时文件，完成后再改名，
+    取消或失败时不留下不完整的结果
+    """
+    tmp_path = out_path + ".part"
+    out = np.memmap(tmp_path, dtype=dtype, mode='w+', shape=shape)
+    try:
+        fill(out)
+        out.flush()
+    except BaseException:
+        del out
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    # 释放memmap后再改名（Windows下文件映射未关闭时无法替换）
+    del out
+    os.replace(tmp_path, out_path)
+
+def open_shaped_memmap(file_path, dtype, shape):
+    """以memmap打开并校验文件大小与形状一致"""
+    src = open_bin_memmap(file_path, dtype)
+    if int(np.prod(shape, dtype=np.int64)) != len(src):
+        raise ValueError(f"文件大小与形状不匹配：{os.path.basename(file_path)}，形状 {shape}，实际 {len(src)} 个元素")
+    return src
+
+def stream_concat_to_file(file_paths, out_path, dtype, shapes=None, axis=0, chunk_size=None,
+                          progress_callback=None, cancel_check=None):
+    """
+    把多个bin文件沿axis拼接后直接写入out_path：输出文件以memmap预分配，
+    每个输入以只读memmap打开，按 (行块, 列块) 拷贝到输出中对应的跨步位置，
+    峰值内存只与chunk_size有关，与文件大小无关。
+    :param shapes: 每个输入的形状；为None时按一维处理（简单拼接）
+    :return: 输出形状
+    """
+    dtype = np.dtype(dtype)
+    chunk_size = chunk_size or Config.STREAM_CHUNK_ELEMENTS
+    if shapes is None:
+        shapes = [(os.path.getsize(path) // dtype.itemsize,) for path in file_paths]
+        axis = 0
+    shapes = [tuple(int(d) for d in shape) for shape in shapes]
+    sources = [open_shaped_memmap(path, dtype, shape) for path, shape in zip(file_paths, shapes)]
+
+    out_shape = concat_output_shape(shapes, axis)
+    outer, out_width = slab_view(out_shape, axis)
+    total = outer * out_width
+    if total == 0:
+        raise ValueError("拼接结果为空")
+
+    copied = [0]
+    def on_copied(n):
+        copied[0] += n
+        if progress_callback:
+            progress_callback(int(copied[0] * 100 / total))
+
+    def fill(out):
+        col_offset = 0
+        for src, shape in zip(sources, shapes):
+            _, width = slab_view(shape, axis)
+            _copy_columns(out, col_offset, src.reshape(outer, width), 0, width,
+                          chunk_size, on_copied, cancel_check)
+            col_offset += width
+
+    write_memmap_atomically(out_path, dtype, (outer, out_width), fill)
+    return out_shape
+
+def stream_split_to_files(file_path, dtype, shape, axis, ranges, out_paths, chunk_size=None,
+                          progress_callback=None, cancel_check=None):
+    """
+    拼接的逆操作：把一个张量沿axis按ranges切成多个分片，分别写入out_paths。
+    源文件以只读memmap打开，每个分片是源二维视图 (outer, shape[axis] * inner)
+    中连续的一段列，按块跨步拷贝，不把源张量读入内存。
+    :param ranges: 沿axis的[(start, stop), ...]，见parse_split_spec
+    :return: 每个分片的形状
+    """
+    dtype = np.dtype(dtype)
+    chunk_size = chunk_size or Config.STREAM_CHUNK_ELEMENTS
+    shape = tuple(int(d) for d in shape)
+    if not 0 <= axis < len(shape):
+        raise ValueError(f"拆分维度 {axis} 超出范围（张量维度为 {len(shape)}）")
+    if len(ranges) != len(out_paths):
+        raise ValueError("分片数量与输出文件数量不一致")
+    src = open_shaped_memmap(file_path, dtype, shape)
+
+    outer, width = slab_view(shape, axis)
+    inner = width // shape[axis] if shape[axis] else 0
+    src2d = src.reshape(outer, width)
+    total = sum((stop - start) for start, stop in ranges) * outer * inner
+    if total == 0:
+        raise ValueError("拆分结果为空")
+
+    copied = [0]
+    def on_copied(n):
+        copied[0] += n
+        if progress_callback:
+            progress_callback(int(copied[0] * 100 / total))
+
+    # 每个分片各自原子写入；中途失败或取消时删除已完成的分片，不留下只拆了一部分的结果
+    out_shapes = []
+    written = []
+    try:
+        for (start, stop), out_path in zip(ranges, out_paths):
+            part_width = (stop - start) * inner
+            write_memmap_atomically(
+                out_path, dtype, (outer, part_width),
+                lambda out: _copy_columns(out, 0, src2d, start * inner, part_width,
+                                          chunk_size, on_copied, cancel_check)
+            )
+            written.append(out_path)
+            part_shape = list(shape)
+            part_shape[axis] = stop - start
+            out_shapes.append(tuple(part_shape))
+    except BaseException:
+        for path in written:
+            if os.path.exists(path):
+                os.remove(path)
+        raise
+    return out_shapes
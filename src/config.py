@@ -14,6 +14,41 @@ class Config:
     SHOW_DATA_THRESHOLD = 200
     MAX_DOWNSAMPLE_POINTS = 200000
     
+    # 流式处理（memmap分块）
+    STREAM_CHUNK_ELEMENTS = 4 * 1024 * 1024
+    SPECTRUM_SEGMENT_LENGTH = 1024
+    PERMUTE_TILE = 256
+    LAYOUT_DETECT_BUDGET = 1 << 21  # 布局检测时所有置换合计读取的采样元素数
+    
+    # 并行I/O（按存储类型限制并发：网络存储延迟高，用更多并发请求掩盖延迟）
+    IO_CONCURRENCY = {'local': 4, 'network': 16}
+    IO_READ_AHEAD = 2  # 流式读取时提前发出的块数
+    
+    # 进程级数组缓存（memmap、降采样数据、统计/频谱结果、热力图瓦片，各窗口共享）
+    ARRAY_CACHE_BYTES = 1 << 30           # 字节预算，超过时按最近最少使用淘汰
+    ARRAY_CACHE_MAX_ENTRIES = 4096        # 条目数上限（memmap不占内存，按条目数限制）
+    
+    # 内存预算（共享缓存 + 各窗口的数组和画布），超出时降低后台窗口的内存占用
+    MEMORY_BUDGET_BYTES = 2 << 30
+    MEMORY_CHECK_INTERVAL_MS = 2000
+    MEMORY_COARSE_FACTOR = 8              # 每降一级，降采样点数缩小的倍数
+    
+    # 张量拼接
+    CONCAT_PREVIEW_MAX_FILES = 16
+    
+    # NaN/Inf位置索引
+    NONFINITE_MAX_RUNS = 1 << 20          # 最多记录的连续区间数（每个区间16字节）
+    NONFINITE_MAX_MARKERS = 2000          # 图上最多标记的位置数
+    
+    # 二维热力图（瓦片金字塔）
+    HEATMAP_TILE = 256                    # 瓦片边长（像素）
+    HEATMAP_DIRECT_ELEMENTS = 1 << 22     # 覆盖源元素数不超过此值的瓦片直接从源数据归约
+    HEATMAP_OVERVIEW_PIXELS = 1024        # 占位缩略图的最大边长
+    HEATMAP_NONFINITE_COLOR = '#ff00ff'   # 差异热力图中不匹配的NaN/Inf位置（+inf）的颜色
+    SLICE_PREFETCH = 2                    # 拖动切片滑块时预取前后各几个相邻切片
+    SLICE_CACHE = 8                       # 缓存的切片数（瓦片本身存放在共享数组缓存中）
+    MONTAGE_PIXELS = 2048                 # 通道拼图整张图的最大边长（超过时每个通道按跨步降采样）
+    
     # 基础尺寸（96DPI基准）
     BASE_WINDOW_WIDTH = 600
     BASE_WINDOW_HEIGHT = 400
@@ -1,6 +1,5 @@
 # 数据管理器
-import numpy as np
-from .bin_utils import read_bin_file, handle_invalid_values
+from . import cache_manager
 from .config import Config
 
 class DataManager:
@@ -12,25 +11,20 @@ class DataManager:
     
     def load_file(self, file_path, dtype="float32"):
         """加载并处理文件数据"""
-        import numpy as np
-        
         self.file_path = file_path
         self.dtype = dtype
         
         try:
-            # 读取原始数据
-            self.raw_data = handle_invalid_values(
-                read_bin_file(file_path, dtype=np.dtype(dtype))
-            )
+            # 共享的memmap（不整体读入）和降采样数据，非法值只在降采样读出的点上处理
+            self.raw_data = cache_manager.open_memmap(file_path, dtype)
             
             if len(self.raw_data) == 0:
                 pass
                 return None
             
             # 降采样处理
-            self.processed_data = self._downsample_data(
-                self.raw_data, Config.MAX_DOWNSAMPLE_POINTS
-            )
+            step = cache_manager.decimation_step(len(self.raw_data), Config.MAX_DOWNSAMPLE_POINTS)
+            self.processed_data = cache_manager.decimated(file_path, dtype, step)
             
             pass
             return self.processed_data
@@ -0,0 +1,655 @@
+# 张量切片视图（固定其余维度看一维曲线或二维热力图；热力图用瓦片金字塔渲染，后台计算可见瓦片，像地图一样平移缩放）
+import threading
+from collections import OrderedDict
+from functools import partial
+import numpy as np
+import matplotlib
+from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QGridLayout, QLabel, QLineEdit,
+                             QSpinBox, QComboBox, QPushButton, QSlider, QCheckBox)
+from PyQt5.QtCore import Qt, QThread, QTimer, pyqtSignal
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+from .bin_utils import handle_invalid_values
+from .config import Config
+from .language_manager import get_text
+from .montage import ChannelMontage
+from .shape_utils import candidate_shapes, format_shape, parse_shape
+from .tile_pyramid import AGGREGATES, TileCancelled, TilePyramid, slice_view
+from . import cache_manager
+
+# 保持运行中线程的引用，直到线程真正结束
+_running_workers = set()
+
+class TileWorker(QThread):
+    """后台按顺序计算待显示的瓦片；视图变化后不再需要的瓦片会被放弃"""
+    tile_ready = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+    def __init__(self, pyramid, parent=None):
+        super().__init__(parent)
+        self.pyramid = pyramid
+        self._lock = threading.Lock()
+        self._pending = []
+        self._wanted = set()
+
+    def set_pending(self, keys):
+        """替换待计算的瓦片列表（只保留当前可见区域需要的）"""
+        with self._lock:
+            self._pending = list(keys)
+            self._wanted = set(keys)
+
+    def _is_stale(self, key):
+        with self._lock:
+            return key not in self._wanted
+
+    def run(self):
+        while not self.isInterruptionRequested():
+            with self._lock:
+                if not self._pending:
+                    return
+                key = self._pending.pop(0)
+            try:
+                self.pyramid.tile(
+                    *key, cancel_check=lambda: self.isInterruptionRequested() or self._is_stale(key)
+                )
+            except TileCancelled:
+                continue
+            except Exception as e:
+                self.failed.emit(str(e))
+                return
+            self.tile_ready.emit(key)
+
+def prepare_slice(data, shape, axes, fixed, montage_axis=None, region=None, cancel_check=None):
+    """
+    准备一个切片：给出montage_axis时生成该维度所有通道的拼图；
+    一维切片按跨步降采样读出 (values, step)；
+    二维切片建立瓦片金字塔，给出region=(x0, x1, y0, y1, 宽像素, 高像素)时预先算好该区域的瓦片
+    """
+    if montage_axis is not None:
+        return ChannelMontage(data, shape, montage_axis, axes, fixed)
+    view = slice_view(data, shape, axes, fixed)
+    if len(axes) == 1:
+        step = max(1, -(-len(view) // Config.MAX_DOWNSAMPLE_POINTS))
+        return handle_invalid_values(np.array(view[::step], dtype=np.float32), copy=False), step
+    pyramid = TilePyramid(view)
+    pyramid.overview()
+    if region is not None:
+        fill_region(pyramid, region, cancel_check)
+    return pyramid
+
+def fill_region(pyramid, region, cancel_check=None):
+    """算好瓦片金字塔在region=(x0, x1, y0, y1, 宽像素, 高像素)中显示所需的全部瓦片"""
+    x0, x1, y0, y1, width_px, height_px = region
+    x1, y1 = min(x1, pyramid.cols), min(y1, pyramid.rows)
+    if x0 < x1 and y0 < y1:
+        _, _, _, missing = pyramid.render(x0, x1, y0, y1, width_px, height_px)
+        for key in missing:
+            pyramid.tile(*key, cancel_check=cancel_check)
+    return pyramid
+
+class SlicePrefetchWorker(QThread):
+    """后台依次准备相邻切片，拖动滑块时相邻切片已在缓存中；被中断时放弃剩余任务"""
+    slice_ready = pyqtSignal(object, object)
+
+    def __init__(self, tasks, parent=None):
+        super().__init__(parent)
+        self.tasks = list(tasks)
+
+    def run(self):
+        for key, prepare in self.tasks:
+            if self.isInterruptionRequested():
+                return
+            try:
+                result = prepare(self.isInterruptionRequested)
+            except TileCancelled:
+                return
+            except Exception:
+                # 预取失败不影响当前显示，真正切换到该切片时再报告错误
+                continue
+            self.slice_ready.emit(key, result)
+
+class HeatmapView(QWidget):
+    """
+    把bin文件按形状看作张量：选一个维度显示为曲线、或两个维度显示为热力图，
+    其余维度用滑块固定。切片都是memmap上的跨步视图，不拷贝整个张量
+    """
+    def __init__(self, parent, dpi):
+        super().__init__(parent)
+        self.dpi = dpi
+        self.file_path = None
+        self.dtype = None
+        self.data = None
+        self.shape = None
+        self.axes = None
+        self.montage_axis = None
+        self.montage = None
+        self.fixed = {}
+        self.sliders = {}
+        # 切片缓存：(显示维度, 其余维度下标) -> 瓦片金字塔 或 一维的(values, step)
+        self.slices = OrderedDict()
+        self.pyramid = None
+        self.worker = None
+        self.prefetch_worker = None
+        self.image = None
+        self.colorbar = None
+        self.level = 0
+        self.status_text = ""
+        self.pan_start = None
+        self.zoom_factor = 1.2
+
+        # 视图变化后合并刷新（平移/缩放时不必每个事件都重新拼图）
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setSingleShot(True)
+        self.refresh_timer.setInterval(30)
+        self.refresh_timer.timeout.connect(self.refresh)
+        self._init_ui()
+
+    def _init_ui(self):
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(0)
+
+        # 使用方可以在这一行追加自己的控件
+        self.controls_layout = controls = QHBoxLayout()
+        margin = Config.get_scaled_value(5, self.dpi)
+        controls.setContentsMargins(margin, 3, margin, 3)
+        controls.setSpacing(Config.get_scaled_value(6, self.dpi))
+
+        controls.addWidget(QLabel(get_text('heatmap_shape')))
+        self.shape_input = QLineEdit()
+        self.shape_input.setPlaceholderText(get_text('shape_placeholder'))
+        self.shape_input.returnPressed.connect(self.apply)
+        controls.addWidget(self.shape_input, 1)
+
+        controls.addWidget(QLabel(get_text('heatmap_rows')))
+        self.row_axis_spin = QSpinBox()
+        self.row_axis_spin.setRange(0, 31)
+        controls.addWidget(self.row_axis_spin)
+
+        controls.addWidget(QLabel(get_text('heatmap_cols')))
+        self.col_axis_spin = QSpinBox()
+        # -1 表示不选列维度，按一维曲线显示
+        self.col_axis_spin.setRange(-1, 31)
+        self.col_axis_spin.setSpecialValueText(get_text('slice_line'))
+        self.col_axis_spin.setValue(1)
+        controls.addWidget(self.col_axis_spin)
+
+        controls.addWidget(QLabel(get_text('heatmap_aggregate')))
+        self.aggregate_combo = QComboBox()
+        for name in AGGREGATES:
+            self.aggregate_combo.addItem(get_text(f'aggregate_{name}'), name)
+        self.aggregate_combo.currentIndexChanged.connect(lambda _: self.refresh())
+        controls.addWidget(self.aggregate_combo)
+
+        self.montage_check = QCheckBox(get_text('montage'))
+        self.montage_check.setToolTip(get_text('montage_tooltip'))
+        self.montage_check.toggled.connect(lambda _: self.apply())
+        controls.addWidget(self.montage_check)
+
+        apply_btn = QPushButton(get_text('heatmap_apply'))
+        apply_btn.clicked.connect(self.apply)
+        controls.addWidget(apply_btn)
+        layout.addLayout(controls)
+
+        # 其余维度的下标滑块（应用形状后重建）
+        self.slider_widget = QWidget()
+        self.slider_layout = QGridLayout(self.slider_widget)
+        self.slider_layout.setContentsMargins(margin, 0, margin, 0)
+        self.slider_layout.setVerticalSpacing(0)
+        self.slider_widget.setVisible(False)
+        layout.addWidget(self.slider_widget)
+
+        self.status_label = QLabel("")
+        self.status_label.setAlignment(Qt.AlignCenter)
+        self.status_label.setStyleSheet(
+            f"color: #666; font-size: {Config.get_scaled_font_size(9, self.dpi)}px;"
+        )
+        layout.addWidget(self.status_label)
+
+        self.figure = Figure(
+            figsize=(Config.get_scaled_value(8, self.dpi) / 100, Config.get_scaled_value(5, self.dpi) / 100),
+            dpi=self.dpi,
+            facecolor='white'
+        )
+        self.canvas = FigureCanvas(self.figure)
+        self.ax = self.figure.add_subplot(111)
+        self.figure.subplots_adjust(left=0.08, right=0.92, top=0.92, bottom=0.08)
+        self.canvas.setMinimumHeight(Config.get_scaled_value(300, self.dpi))
+        layout.addWidget(self.canvas, 1)
+
+        self.canvas.mpl_connect('scroll_event', self._on_scroll)
+        self.canvas.mpl_connect('button_press_event', self._on_press)
+        self.canvas.mpl_connect('motion_notify_event', self._on_move)
+        self.canvas.mpl_connect('button_release_event', self._on_release)
+        self.canvas.mpl_connect('resize_event', lambda _: self.refresh_timer.start())
+
+    def set_source(self, file_path, dtype):
+        """设置数据文件（使用共享的memmap）"""
+        self.file_path = file_path
+        self.dtype = np.dtype(dtype)
+        self.set_data(cache_manager.open_memmap(file_path, self.dtype))
+
+    def set_data(self, data, default_shape=None):
+        """
+        设置要显示的一维数据（ndarray/memmap/置换视图/差异视图），形状不变时保留各滑块位置；
+        当前形状与元素数不符时改用default_shape（显示最后两维），没有时填入推断的二维形状
+        """
+        self.stop()
+        self.data = data
+        self.slices.clear()
+        try:
+            shape = self._parse_shape()
+            valid = int(np.prod(shape)) == len(self.data)
+        except ValueError:
+            valid = False
+        if not valid:
+            if default_shape is not None and len(default_shape) >= 2:
+                shapes = [tuple(default_shape)]
+            else:
+                # 按元素数推断（int8每个元素1字节）
+                shapes = [s for s in candidate_shapes(len(self.data), np.int8) if len(s) == 2]
+            if shapes:
+                self.shape_input.setText(format_shape(shapes[0]))
+                self.row_axis_spin.setValue(len(shapes[0]) - 2)
+                self.col_axis_spin.setValue(len(shapes[0]) - 1)
+        self.apply()
+
+    def clear(self, message=""):
+        """清空显示（如数据无法显示时），状态栏显示message"""
+        self.stop()
+        self.data = None
+        self.shape = None
+        self.pyramid = None
+        self.slices.clear()
+        self.slider_widget.setVisible(False)
+        self._reset_axes()
+        self.status_text = message
+        self.status_label.setText(message)
+        self.canvas.draw_idle()
+
+    def _parse_shape(self):
+        shape, message = parse_shape(self.shape_input.text())
+        if shape is None:
+            raise ValueError(message)
+        return shape
+
+    def apply(self):
+        """按当前形状和显示维度重建滑块，并从头显示当前切片（其余维度的下标尽量保留）"""
+        if self.data is None:
+            return
+        self.stop()
+        try:
+            shape = self._parse_shape()
+            if int(np.prod(shape)) != len(self.data):
+                raise ValueError(f"{format_shape(shape)} != {len(self.data)}")
+            row_axis, col_axis = self.row_axis_spin.value(), self.col_axis_spin.value()
+            if col_axis >= 0 and len(shape) < 2:
+                raise ValueError(get_text('heatmap_need_2d'))
+            axes = (row_axis,) if col_axis < 0 else (row_axis, col_axis)
+            # 只检查维度是否合法（得到的是视图，不读取数据）
+            slice_view(self.data, shape, axes)
+            montage_axis = None
+            if self.montage_check.isChecked():
+                # 拼图沿最后一个不显示且长度大于1的维度展开（如[N,C,H,W]中的C、[H,W,C]中的C）
+                channel_axes = [a for a in range(len(shape)) if a not in axes and shape[a] > 1]
+                if len(axes) != 2 or not channel_axes:
+                    raise ValueError(get_text('montage_need_channels'))
+                montage_axis = channel_axes[-1]
+        except ValueError as e:
+            self.pyramid = None
+            self.status_label.setText(get_text('heatmap_error').format(str(e)))
+            return
+
+        if shape != self.shape:
+            self.fixed = {}
+        self.shape, self.axes, self.montage_axis = shape, axes, montage_axis
+        self.fixed = {axis: index for axis, index in self.fixed.items() if axis not in axes}
+        self.slices.clear()
+        self._build_sliders()
+        self.show_slice(reset_view=True)
+
+    def _build_sliders(self):
+        while self.slider_layout.count():
+            item = self.slider_layout.takeAt(0)
+            if item.widget() is not None:
+                item.widget().deleteLater()
+        self.sliders = {}
+        for axis, size in enumerate(self.shape):
+            if axis in self.axes or axis == self.montage_axis or size <= 1:
+                continue
+            row = len(self.sliders)
+            slider = QSlider(Qt.Horizontal)
+            slider.setRange(0, size - 1)
+            slider.setValue(self.fixed.get(axis, 0))
+            value_label = QLabel(get_text('slice_index').format(slider.value(), size - 1))
+            slider.valueChanged.connect(lambda value, a=axis: self._on_slider_changed(a, value))
+            self.slider_layout.addWidget(QLabel(get_text('slice_axis').format(axis)), row, 0)
+            self.slider_layout.addWidget(slider, row, 1)
+            self.slider_layout.addWidget(value_label, row, 2)
+            self.sliders[axis] = (slider, value_label)
+        self.slider_widget.setVisible(bool(self.sliders))
+
+    def _slice_key(self, fixed):
+        shown = self.axes + (self.montage_axis,)
+        return shown, tuple(
+            int(fixed.get(axis, 0)) for axis in range(len(self.shape)) if axis not in shown
+        )
+
+    def _cache_slice(self, key, item):
+        """放入切片缓存（已有同一切片时保留已有的，其中可能有更多算好的瓦片）"""
+        if key not in self.slices:
+            self.slices[key] = item
+        self.slices.move_to_end(key)
+        while len(self.slices) > Config.SLICE_CACHE:
+            self.slices.popitem(last=False)
+
+    def release_slices(self):
+        """只保留当前切片，释放其余缓存的切片（窗口转入后台且内存超出预算时调用）"""
+        if self.axes is None:
+            return
+        current = self._slice_key(self.fixed)
+        for key in [k for k in self.slices if k != current]:
+            del self.slices[key]
+
+    def memory_arrays(self):
+        """本视图常驻内存的数组（瓦片存放在共享缓存中，不在此列）"""
+        for item in self.slices.values():
+            if isinstance(item, ChannelMontage):
+                yield item.image
+            elif isinstance(item, tuple):
+                yield item[0]
+            elif item._overview is not None:
+                yield item._overview[0]
+
+    def _get_slice(self, fixed):
+        key = self._slice_key(fixed)
+        item = self.slices.get(key)
+        if item is None:
+            item = prepare_slice(self.data, self.shape, self.axes, fixed, self.montage_axis)
+        self._cache_slice(key, item)
+        return self.slices[key]
+
+    def _slice_title(self):
+        """当前切片的下标表示，如 [3, :, :, 0]"""
+        shown = self.axes + (self.montage_axis,)
+        index = [':' if axis in shown else str(self.fixed.get(axis, 0)) for axis in range(len(self.shape))]
+        return f"[{', '.join(index)}]"
+
+    def _on_slider_changed(self, axis, value):
+        self.fixed[axis] = value
+        slider, value_label = self.sliders[axis]
+        value_label.setText(get_text('slice_index').format(value, slider.maximum()))
+        self.show_slice()
+        self._prefetch_neighbours(axis)
+
+    def show_slice(self, reset_view=False):
+        """显示当前下标对应的切片；二维切片维持当前的缩放和平移位置"""
+        self._stop_tiles()
+        try:
+            item = self._get_slice(self.fixed)
+        except (ValueError, OSError) as e:
+            self.status_label.setText(get_text('heatmap_error').format(str(e)))
+            return
+
+        if isinstance(item, ChannelMontage):
+            self.pyramid = None
+            self._show_montage(item)
+            return
+        if len(self.axes) == 1:
+            self.pyramid = None
+            self._show_line(*item)
+            return
+        self.pyramid = item
+        if reset_view or self.image is None:
+            self._reset_axes()
+            self.ax.set_xlim(-0.5, self.pyramid.cols - 0.5)
+            self.ax.set_ylim(self.pyramid.rows - 0.5, -0.5)
+        if len(self.shape) > 2:
+            self.ax.set_title(self._slice_title(), fontsize=Config.get_scaled_font_size(9, self.dpi))
+        self.refresh()
+
+    def _reset_axes(self):
+        if self.colorbar is not None:
+            self.colorbar.remove()
+            self.colorbar = None
+        self.ax.clear()
+        self.image = None
+        self.montage = None
+
+    def _show_line(self, values, step):
+        """一维切片显示为曲线（超过 MAX_DOWNSAMPLE_POINTS 时已按跨步降采样）"""
+        self._reset_axes()
+        self.ax.plot(np.arange(len(values)) * step, values, linewidth=0.8)
+        self.ax.grid(True, alpha=0.3)
+        self.ax.tick_params(axis='both', labelsize=Config.get_scaled_font_size(8, self.dpi))
+        if len(self.shape) > 1:
+            self.ax.set_title(self._slice_title(), fontsize=Config.get_scaled_font_size(9, self.dpi))
+        self.status_text = get_text('slice_status_1d').format(self.shape[self.axes[0]], step)
+        self.status_label.setText(self.status_text)
+        self.canvas.draw_idle()
+
+    def _show_montage(self, montage):
+        """通道拼图作为单张图像显示（每个通道已归一化到[0, 1]，格子间隔显示为背景）"""
+        self._reset_axes()
+        self.montage = montage
+        self.ax.imshow(montage.image, cmap='viridis', vmin=0, vmax=1, interpolation='nearest')
+        self.ax.set_xticks([])
+        self.ax.set_yticks([])
+        self.ax.set_title(self._slice_title(), fontsize=Config.get_scaled_font_size(9, self.dpi))
+        self.status_text = get_text('montage_status').format(
+            montage.channels, montage.rows, montage.cols, montage.tile_h, montage.tile_w, montage.step
+        )
+        self.status_label.setText(self.status_text)
+        self.canvas.draw_idle()
+
+    def _prefetch_neighbours(self, axis):
+        """后台准备沿axis前后相邻的切片；二维切片同时算好当前可见区域的瓦片"""
+        self._stop_prefetch()
+        region = None
+        if self.pyramid is not None:
+            bbox = self.ax.get_window_extent()
+            region = (*self.visible_region(), bbox.width, bbox.height)
+
+        current = self.fixed.get(axis, 0)
+        tasks = []
+        for offset in range(1, Config.SLICE_PREFETCH + 1):
+            for index in (current + offset, current - offset):
+                if not 0 <= index < self.shape[axis]:
+                    continue
+                fixed = dict(self.fixed)
+                fixed[axis] = index
+                key = self._slice_key(fixed)
+                cached = self.slices.get(key)
+                if cached is None:
+                    tasks.append((key, partial(prepare_slice, self.data, self.shape, self.axes, fixed,
+                                               self.montage_axis, region)))
+                elif region is not None:
+                    tasks.append((key, partial(fill_region, cached, region)))
+        if not tasks:
+            return
+
+        worker = SlicePrefetchWorker(tasks)
+        worker.slice_ready.connect(self._cache_slice)
+        worker.finished.connect(lambda: _running_workers.discard(worker))
+        _running_workers.add(worker)
+        self.prefetch_worker = worker
+        worker.start()
+
+    def visible_region(self):
+        """当前可见区域（源数据坐标，已裁剪到平面范围）：(x0, x1, y0, y1)"""
+        x0, x1 = sorted(self.ax.get_xlim())
+        y0, y1 = sorted(self.ax.get_ylim())
+        x0 = int(np.clip(np.floor(x0 + 0.5), 0, self.pyramid.cols - 1))
+        x1 = int(np.clip(np.ceil(x1 + 0.5), x0 + 1, self.pyramid.cols))
+        y0 = int(np.clip(np.floor(y0 + 0.5), 0, self.pyramid.rows - 1))
+        y1 = int(np.clip(np.ceil(y1 + 0.5), y0 + 1, self.pyramid.rows))
+        return x0, x1, y0, y1
+
+    def refresh(self):
+        """用已缓存的瓦片拼出可见区域，缺失的瓦片交给后台计算"""
+        if self.pyramid is None:
+            return
+        bbox = self.ax.get_window_extent()
+        x0, x1, y0, y1 = self.visible_region()
+        image, extent, self.level, missing = self.pyramid.render(
+            x0, x1, y0, y1, bbox.width, bbox.height, self.aggregate_combo.currentData()
+        )
+
+        xlim, ylim = self.ax.get_xlim(), self.ax.get_ylim()
+        if self.image is None:
+            # 差异视图中不匹配的NaN/Inf为+inf，以醒目颜色显示（imshow把非有限值作为被屏蔽的值，
+            # 用bad颜色绘制；over覆盖色标上限以外的情况）
+            color = Config.HEATMAP_NONFINITE_COLOR
+            cmap = matplotlib.colormaps['viridis'].with_extremes(over=color, bad=color)
+            self.image = self.ax.imshow(
+                image, extent=extent, cmap=cmap, interpolation='nearest', aspect='auto'
+            )
+            self.colorbar = self.figure.colorbar(self.image, ax=self.ax)
+            self.ax.tick_params(axis='both', labelsize=Config.get_scaled_font_size(8, self.dpi))
+        else:
+            self.image.set_data(image)
+            self.image.set_extent(extent)
+        # 色标按当前可见数据中的有限值自适应
+        finite = image[np.isfinite(image)]
+        vmin, vmax = (float(finite.min()), float(finite.max())) if finite.size else (0.0, 1.0)
+        self.image.set_clim(vmin, vmax if vmax > vmin else vmin + 1e-12)
+        self.ax.set_xlim(xlim)
+        self.ax.set_ylim(ylim)
+
+        self._update_status(len(missing))
+        if missing:
+            self._request_tiles(missing)
+        self.canvas.draw_idle()
+
+    def _update_status(self, pending):
+        k = 1 << self.level
+        text = get_text('heatmap_status').format(
+            self.pyramid.rows, self.pyramid.cols, self.level, k, k
+        )
+        if pending:
+            text += get_text('heatmap_pending').format(pending)
+        self.status_text = text
+        self.status_label.setText(text)
+
+    def _request_tiles(self, keys):
+        # 离视图中心近的瓦片优先
+        x0, x1, y0, y1 = self.visible_region()
+        center = ((y0 + y1) / 2, (x0 + x1) / 2)
+        def distance(key):
+            r0, r1, c0, c1 = self.pyramid.tile_bounds(*key)
+            return abs((r0 + r1) / 2 - center[0]) + abs((c0 + c1) / 2 - center[1])
+        keys = sorted(keys, key=distance)
+
+        if self.worker is not None and self.worker.isRunning():
+            self.worker.set_pending(keys)
+            return
+        worker = TileWorker(self.pyramid)
+        worker.set_pending(keys)
+        worker.tile_ready.connect(lambda _: self.refresh_timer.start())
+        worker.failed.connect(lambda message: self.status_label.setText(get_text('heatmap_error').format(message)))
+        # 线程退出与新请求之间可能有竞争，结束时再刷新一次补上遗漏的瓦片
+        worker.finished.connect(self._on_worker_finished)
+        worker.finished.connect(lambda: _running_workers.discard(worker))
+        _running_workers.add(worker)
+        self.worker = worker
+        worker.start()
+
+    def _on_worker_finished(self):
+        if self.worker is not None and self.worker.isFinished():
+            self.worker = None
+            self.refresh_timer.start()
+
+    def stop(self):
+        """放弃未完成的瓦片计算和切片预取"""
+        self._stop_tiles()
+        self._stop_prefetch()
+
+    def _stop_prefetch(self):
+        if self.prefetch_worker is not None:
+            self.prefetch_worker.requestInterruption()
+            self.prefetch_worker.slice_ready.disconnect()
+            self.prefetch_worker = None
+
+    def _stop_tiles(self):
+        if self.worker is not None:
+            self.worker.requestInterruption()
+            self.worker.tile_ready.disconnect()
+            self.worker.failed.disconnect()
+            self.worker.finished.disconnect(self._on_worker_finished)
+            self.worker = None
+
+    # ---------------------- 交互：滚轮缩放、拖动平移 ----------------------
+    def _on_scroll(self, event):
+        if self.pyramid is None or event.inaxes != self.ax:
+            return
+        factor = 1 / self.zoom_factor if event.button == 'up' else self.zoom_factor
+        x0, x1 = self.ax.get_xlim()
+        y0, y1 = self.ax.get_ylim()
+        mx, my = event.xdata, event.ydata
+        # 最多放大到约10个元素可见，最多缩小到完整平面
+        if event.button == 'up' and abs(x1 - x0) < 10 and abs(y1 - y0) < 10:
+            return
+        self.ax.set_xlim(self._clamp_range(mx - (mx - x0) * factor, mx + (x1 - mx) * factor, self.pyramid.cols))
+        self.ax.set_ylim(self._clamp_range(my - (my - y0) * factor, my + (y1 - my) * factor, self.pyramid.rows))
+        self.canvas.draw_idle()
+        self.refresh_timer.start()
+
+    @staticmethod
+    def _clamp_range(a, b, n):
+        """把坐标范围限制在 [-0.5, n-0.5] 内（保持方向；超出时平移回来）"""
+        lo, hi = min(a, b), max(a, b)
+        width = min(hi - lo, n)
+        lo = min(max(lo, -0.5), n - 0.5 - width)
+        return (lo, lo + width) if a <= b else (lo + width, lo)
+
+    def _on_press(self, event):
+        if event.button == 1 and event.inaxes == self.ax and self.pyramid is not None:
+            self.pan_start = (event.x, event.y, self.ax.get_xlim(), self.ax.get_ylim())
+
+    def _on_move(self, event):
+        if self.pyramid is None:
+            if self.montage is not None:
+                self._show_montage_value(event)
+            return
+        if self.pan_start is None:
+            self._show_value(event)
+            return
+        # 按屏幕像素位移换算数据坐标，避免拖动时坐标系变化带来的抖动
+        x, y, xlim, ylim = self.pan_start
+        bbox = self.ax.get_window_extent()
+        dx = (event.x - x) * (xlim[1] - xlim[0]) / bbox.width
+        dy = (event.y - y) * (ylim[1] - ylim[0]) / bbox.height
+        self.ax.set_xlim(self._clamp_range(xlim[0] - dx, xlim[1] - dx, self.pyramid.cols))
+        self.ax.set_ylim(self._clamp_range(ylim[0] - dy, ylim[1] - dy, self.pyramid.rows))
+        self.canvas.draw_idle()
+        self.refresh_timer.start()
+
+    def _on_release(self, event):
+        if event.button == 1:
+            self.pan_start = None
+
+    def _show_value(self, event):
+        """鼠标悬停时显示该位置的原始值（直接从memmap读取一个元素）"""
+        if event.inaxes != self.ax or event.xdata is None:
+            return
+        row, col = int(round(event.ydata)), int(round(event.xdata))
+        if 0 <= row < self.pyramid.rows and 0 <= col < self.pyramid.cols:
+            self.status_label.setText(
+                self.status_text + "  " +
+                get_text('heatmap_value').format(row, col, float(self.pyramid.plane[row, col]))
+            )
+
+    def _show_montage_value(self, event):
+        if event.inaxes != self.ax or event.xdata is None:
+            return
+        location = self.montage.locate(event.xdata, event.ydata)
+        if location is not None:
+            channel, row, col = location
+            self.status_label.setText(
+                self.status_text + "  " +
+                get_text('montage_value').format(channel, row, col, self.montage.value(channel, row, col))
+            )
+
+    def closeEvent(self, event):
+        self.stop()
+        super().closeEvent(event)
@@ -0,0 +1,135 @@
+# 共享I/O线程池（按存储类型限制并发；多文件读取并行发出，流式读取提前预读）
+import os
+import re
+import sys
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from .config import Config
+
+# 视为网络存储的文件系统类型（Linux /proc/mounts 中的类型名）
+NETWORK_FS_TYPES = {
+    'nfs', 'nfs4', 'cifs', 'smb3', 'smbfs', 'afs', 'ceph', 'glusterfs',
+    'lustre', 'gpfs', 'beegfs', 'fuse.sshfs', 'fuse.glusterfs', '9p',
+}
+
+_THREAD_PREFIX = "io-"
+_executors = {}
+_executors_lock = threading.Lock()
+
+@lru_cache(maxsize=1)
+def _mount_table():
+    """[(挂载点, 文件系统类型), ...]，按挂载点长度降序（最长前缀优先匹配）"""
+    mounts = []
+    try:
+        with open('/proc/mounts', 'r') as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 3:
+                    # 挂载点中的空格等字符以八进制转义
+                    mount_point = re.sub(r'\\([0-7]{3})', lambda m: chr(int(m.group(1), 8)), parts[1])
+                    mounts.append((mount_point, parts[2]))
+    except OSError:
+        pass
+    return sorted(mounts, key=lambda m: len(m[0]), reverse=True)
+
+@lru_cache(maxsize=256)
+def _storage_of_dir(directory):
+    if sys.platform == 'win32':
+        if directory.startswith('\\\\'):
+            return 'network'
+        try:
+            import ctypes
+            drive = os.path.splitdrive(directory)[0] + '\\'
+            # DRIVE_REMOTE = 4（映射的网络驱动器）
+            return 'network' if ctypes.windll.kernel32.GetDriveTypeW(drive) == 4 else 'local'
+        except Exception:
+            return 'local'
+    for mount_point, fs_type in _mount_table():
+        if directory == mount_point or directory.startswith(mount_point.rstrip('/') + '/'):
+            return 'network' if fs_type in NETWORK_FS_TYPES else 'local'
+    return 'local'
+
+def storage_type(path):
+    """文件所在存储的类型：'local' 或 'network'（按目录缓存判断结果）"""
+    if not path:
+        return 'local'
+    return _storage_of_dir(os.path.dirname(os.path.abspath(path)))
+
+def storage_type_of(*sources):
+    """
+    数据来源的存储类型：接受文件路径、memmap（filename属性）或
+    由多个文件组成的对象（file_paths属性），任一来源在网络存储上即返回'network'
+    """
+    paths = []
+    for source in sources:
+        if isinstance(source, str):
+            paths.append(source)
+        else:
+            paths.extend(getattr(source, 'file_paths', None) or [getattr(source, 'filename', None)])
+    return 'network' if any(storage_type(p) == 'network' for p in paths if p) else 'local'
+
+def get_executor(storage='local'):
+    """按存储类型共享的线程池（并发数见 Config.IO_CONCURRENCY，首次使用时创建）"""
+    with _executors_lock:
+        executor = _executors.get(storage)
+        if executor is None:
+            workers = Config.IO_CONCURRENCY.get(storage, Config.IO_CONCURRENCY['local'])
+            executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"{_THREAD_PREFIX}{storage}")
+            _executors[storage] = executor
+        return executor
+
+def _run_inline(fn, *args, **kwargs):
+    """在当前线程执行并包装为已完成的Future"""
+    future = Future()
+    try:
+        future.set_result(fn(*args, **kwargs))
+    except Exception as e:
+        future.set_exception(e)
+    return future
+
+def _in_io_thread():
+    return threading.current_thread().name.startswith(_THREAD_PREFIX)
+
+def submit(path, fn, *args, **kwargs):
+    """
+    在path所在存储对应的线程池中执行fn(*args, **kwargs)，返回Future。
+    已经在I/O线程中时（如预读任务内部再读多个文件）直接在当前线程执行，
+    避免池内任务互相等待导致死锁
+    """
+    if _in_io_thread():
+        return _run_inline(fn, *args, **kwargs)
+    return get_executor(storage_type(path)).submit(fn, *args, **kwargs)
+
+def submit_all(fn, paths, *args, **kwargs):
+    """对每个文件发出fn(path, *args, **kwargs)，返回与paths顺序一致的Future列表"""
+    return [submit(path, fn, path, *args, **kwargs) for path in paths]
+
+def map_files(fn, paths, *args, **kwargs):
+    """并行执行fn(path, ...)并按顺序返回结果列表（任一失败时抛出其异常）"""
+    return [future.result() for future in submit_all(fn, paths, *args, **kwargs)]
+
+def read_ahead(fn, items, storage='local', depth=None):
+    """
+    按顺序返回fn(item)的结果，同时保持后面depth个item已在线程池中读取，
+    使调用方处理当前块时下一块的I/O已经在进行
+    """
+    if _in_io_thread():
+        yield from map(fn, items)
+        return
+    depth = max(1, depth or Config.IO_READ_AHEAD)
+    executor = get_executor(storage)
+    pending = deque()
+    items = iter(items)
+    try:
+        for item in items:
+            pending.append(executor.submit(fn, item))
+            if len(pending) > depth:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        # 提前结束（取消/异常）时丢弃尚未开始的预读
+        for future in pending:
+            future.cancel()
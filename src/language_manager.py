@@ -74,7 +74,7 @@ TEXTS = {
     'language': {'zh': '语言', 'en': 'Language'},
     'chinese': {'zh': '中文', 'en': 'Chinese'},
     'english': {'zh': 'English', 'en': 'English'},
-    'tips': {'zh': '提示:\n- 按ESC键关闭任何窗口\n- 支持拖放文件（1个打开，2个对比）\n- 右键点击图形可保存图片', 'en': 'Tips:\n- Press ESC to close any window\n- Support drag & drop (1 file to open, 2 files to compare)\n- Right-click on chart to save image'},
+    'tips': {'zh': '提示:\n- 按ESC键关闭任何窗口\n- 支持拖放文件（1个打开，2个对比，3个及以上多路对比）\n- 右键点击图形可保存图片', 'en': 'Tips:\n- Press ESC to close any window\n- Support drag & drop (1 file to open, 2 to compare, 3+ for multi-compare)\n- Right-click on chart to save image'},
     'file_opened': {'zh': '已打开文件: {} (文件 {})', 'en': 'File opened: {} (File {})'},
     'no_files': {'zh': '没有打开的文件', 'en': 'No files opened'},
     'select_first_file': {'zh': '选择第一个BIN文件', 'en': 'Select First BIN File'},
@@ -84,18 +84,53 @@ TEXTS = {
     'tensor_concat_title': {'zh': '张量拼接工具', 'en': 'Tensor Concatenation Tool'},
     'drag_bin_files': {'zh': '将 BIN 文件拖放到此处\n(最多支持 4 个文件)', 'en': 'Drag BIN files here\n(Up to 4 files supported)'},
     'add_bin_file': {'zh': '+ 添加 BIN 文件', 'en': '+ Add BIN File'},
-    'file_list': {'zh': '文件列表 (最多4个文件)', 'en': 'File List (Max 4 files)'},
+    'file_list': {'zh': '文件列表', 'en': 'File List'},
     'config_options': {'zh': '配置选项', 'en': 'Configuration'},
     'data_type': {'zh': '数据类型:', 'en': 'Data Type:'},
     'concat_mode': {'zh': '拼接模式:', 'en': 'Concat Mode:'},
     'simple_concat': {'zh': '简单拼接 (第1维)', 'en': 'Simple Concat (1st dim)'},
     'tensor_concat_mode': {'zh': '张量拼接 (指定形状)', 'en': 'Tensor Concat (specify shape)'},
+    'split_mode': {'zh': '拆分/切片 (单个文件)', 'en': 'Split / Slice (single file)'},
+    'split_axis': {'zh': '拆分轴:', 'en': 'Split Axis:'},
+    'split_spec': {'zh': '拆分方式:', 'en': 'Split:'},
+    'split_spec_placeholder': {'zh': '如 4 或 2,3,5 或 10:20', 'en': 'e.g. 4 or 2,3,5 or 10:20'},
+    'split_spec_tooltip': {'zh': '4: 均分为4份\n2,3,5: 按大小依次切分\n10:20: 只截取该维的[10, 20)', 'en': '4: split into 4 equal parts\n2,3,5: split by sizes\n10:20: extract [10, 20) along the axis'},
+    'split_spec_error': {'zh': '拆分方式错误: {}', 'en': 'Invalid split: {}'},
+    'split_need_one_file': {'zh': '拆分模式只能有一个输入文件', 'en': 'Split mode needs exactly one input file'},
+    'split_ready': {'zh': '✓ 将拆分为 {} 个分片, 拆分轴: {}', 'en': '✓ Will write {} shards, split axis: {}'},
+    'run_split': {'zh': '执行拆分', 'en': 'Run Split'},
+    'split_failed': {'zh': '拆分失败', 'en': 'Split Failed'},
+    'select_output_dir': {'zh': '选择输出目录', 'en': 'Select Output Directory'},
+    'split_saved': {'zh': '已写出 {} 个分片到:\n{}\n\n第一个分片形状: {}', 'en': 'Wrote {} shards to:\n{}\n\nFirst shard shape: {}'},
+    'infer_shapes': {'zh': '推断形状', 'en': 'Infer Shapes'},
+    'infer_shapes_tooltip': {'zh': '根据文件大小、数据类型、拼接轴和已填写的形状，为未填写的文件填入候选形状', 'en': 'Fill empty shapes with candidates inferred from file size, dtype, axis and the shapes already entered'},
+    'save_manifest': {'zh': '添加到清单', 'en': 'Add to Manifest'},
+    'save_manifest_tooltip': {'zh': '把当前拼接配置作为任务写入JSON清单（已有清单时追加），\n可用 python -m src.concat_manifest 清单.json 无界面并行执行', 'en': 'Write the current concat setup as a job into a JSON manifest (appends to an existing one);\nrun headlessly in parallel with python -m src.concat_manifest manifest.json'},
+    'manifest_saved': {'zh': '已写入清单：{}\n共 {} 个任务\n\n批量执行：python -m src.concat_manifest 清单.json -j 并行数', 'en': 'Manifest written: {}\n{} job(s) in total\n\nRun: python -m src.concat_manifest manifest.json -j WORKERS'},
+    'permute_mode': {'zh': '布局转换 (单个文件)', 'en': 'Permute Layout (single file)'},
+    'permutation': {'zh': '维度置换:', 'en': 'Permutation:'},
+    'permutation_placeholder': {'zh': '如 0,2,3,1 或 NCHW->NHWC', 'en': 'e.g. 0,2,3,1 or NCHW->NHWC'},
+    'permutation_tooltip': {'zh': '输出第i维 = 输入第perm[i]维（与numpy.transpose相同）\n也可以用字母描述布局，如 NCHW->NHWC', 'en': 'Output dim i = input dim perm[i] (same as numpy.transpose)\nLetter layouts such as NCHW->NHWC are also accepted'},
+    'permutation_error': {'zh': '维度置换错误: {}', 'en': 'Invalid permutation: {}'},
+    'permute_ready': {'zh': '✓ 布局转换: {} -> {}', 'en': '✓ Permute: {} -> {}'},
+    'run_permute': {'zh': '执行转换', 'en': 'Run Permute'},
+    'permute_failed': {'zh': '布局转换失败', 'en': 'Permute Failed'},
+    'file2_layout': {'zh': 'file2布局', 'en': 'file2 Layout'},
+    'file2_layout_tooltip': {'zh': '按形状和维度置换惰性重排file2后再对比（不写文件）', 'en': 'Lazily permute file2 by shape and permutation before comparing (nothing is written)'},
+    'layout_dialog_title': {'zh': 'file2布局转换', 'en': 'file2 Layout Permutation'},
+    'layout_shape': {'zh': '原始形状:', 'en': 'Original shape:'},
+    'layout_clear': {'zh': '清除', 'en': 'Clear'},
+    'detect_layout': {'zh': '自动检测', 'en': 'Auto Detect'},
+    'detect_layout_tooltip': {'zh': '以file1为参考，采样比较所有维度置换的余弦相似度，并在全量数据上确认最佳结果', 'en': 'Using file1 as reference, rank every permutation by sampled cosine similarity and confirm the best one on full data'},
+    'detect_layout_length': {'zh': 'file1有 {} 个元素，file2有 {} 个元素', 'en': 'file1 has {} elements, file2 has {}'},
+    'detect_layout_progress': {'zh': '全量确认中... {}%', 'en': 'Confirming on full data... {}%'},
+    'detect_layout_result': {'zh': '全量余弦相似度: {:.6f}\n采样排名: {}', 'en': 'Full-data cosine: {:.6f}\nSampled ranking: {}'},
+    'layout_error': {'zh': '布局无效: {}', 'en': 'Invalid layout: {}'},
     'concat_axis': {'zh': '拼接轴:', 'en': 'Concat Axis:'},
     'show_preview': {'zh': '显示数据预览', 'en': 'Show Data Preview'},
     'preview_result': {'zh': '预览拼接结果', 'en': 'Preview Result'},
     'save_result': {'zh': '保存结果', 'en': 'Save Result'},
     'add_files': {'zh': '请添加文件', 'en': 'Please add files'},
-    'max_files_warning': {'zh': '最多支持 4 个文件', 'en': 'Maximum 4 files supported'},
     'files_ready': {'zh': '✓ {} 个文件就绪', 'en': '✓ {} files ready'},
     'simple_mode': {'zh': '简单拼接模式 (第1维)', 'en': 'Simple concat mode (1st dim)'},
     'tensor_mode': {'zh': '张量模式, 拼接轴: {}', 'en': 'Tensor mode, concat axis: {}'},
@@ -119,8 +154,13 @@ TEXTS = {
     
     # 文件操作
     'file_error': {'zh': '文件错误', 'en': 'File Error'},
-    'not_support_3_files': {'zh': '不支持3个及以上文件对比', 'en': 'Not support comparing 3+ files'},
     'select_bin_file': {'zh': '选择BIN文件', 'en': 'Select BIN File'},
+    'saving_progress': {'zh': '正在保存... {}%', 'en': 'Saving... {}%'},
+    'save_overwrites_input': {'zh': '不能覆盖正在拼接的输入文件', 'en': 'Cannot overwrite one of the input files'},
+    'compare_with_reference': {'zh': '与参考对比', 'en': 'Compare with Reference'},
+    'compare_with_reference_tooltip': {'zh': '不生成拼接结果，直接与参考文件流式对比', 'en': 'Stream-compare the concatenation against a reference file without writing it'},
+    'select_reference_file': {'zh': '选择参考文件', 'en': 'Select Reference File'},
+    'virtual_compare_result': {'zh': '参考文件: {}\n比较长度: {:,}（参考 {:,} / 拼接结果 {:,}）\n\nCos = {:.6f}\nMSE = {:.3e}\nMAE = {:.3e}\nMaxAbs = {:.3e}\nScale = {:.4g}', 'en': 'Reference: {}\nCompared length: {:,} (reference {:,} / concat {:,})\n\nCos = {:.6f}\nMSE = {:.3e}\nMAE = {:.3e}\nMaxAbs = {:.3e}\nScale = {:.4g}'},
     'save_concat_result': {'zh': '保存拼接结果', 'en': 'Save Concatenation Result'},
     'result_saved': {'zh': '拼接结果已保存到:\n{}\n\n形状: {}\n大小: {:,} 字节', 'en': 'Result saved to:\n{}\n\nShape: {}\nSize: {:,} bytes'},
     
@@ -141,9 +181,92 @@ TEXTS = {
     'save_success_msg': {'zh': '图片已保存至: {}', 'en': 'Image saved to: {}'},
     'file_length_mismatch': {'zh': 'File length mismatch: {} vs {}', 'en': 'File length mismatch: {} vs {}'},
     'similarity': {'zh': 'Similarity: Cos={:.3f}, MSE={:.3e}, MAE={:.3e}', 'en': 'Similarity: Cos={:.3f}, MSE={:.3e}, MAE={:.3e}'},
+    'similarity_scaled': {'zh': 'Scale={:.4g}, Bias={:.3g}: MSE={:.3e}, MAE={:.3e}', 'en': 'Scale={:.4g}, Bias={:.3g}: MSE={:.3e}, MAE={:.3e}'},
+    'fit_bias': {'zh': '拟合偏置', 'en': 'Fit Bias'},
+    'fit_bias_tooltip': {'zh': '最小二乘拟合 file1 ≈ scale × file2 + bias（不勾选时bias固定为0）', 'en': 'Least-squares fit file1 ≈ scale × file2 + bias (bias fixed to 0 when unchecked)'},
     'calc_error': {'zh': '计算指标出错: {}', 'en': 'Calculation error: {}'},
+    'metrics_computing': {'zh': '正在计算全量对比指标… {}%', 'en': 'Computing full-data metrics... {}%'},
     'index': {'zh': 'Index', 'en': 'Index'},
     'value': {'zh': 'Value', 'en': 'Value'},
+    'shift': {'zh': '偏移:', 'en': 'Shift:'},
+    'shift_tooltip': {'zh': 'file2相对file1的偏移（元素数）：file2[i + 偏移] 对应 file1[i]', 'en': 'Shift of file2 relative to file1 (elements): file2[i + shift] matches file1[i]'},
+    'auto_align': {'zh': '自动对齐', 'en': 'Auto Align'},
+    'aligning': {'zh': '对齐中...', 'en': 'Aligning...'},
+    'align_result': {'zh': '检测到偏移: {}（相关系数 {:.4f}）', 'en': 'Detected shift: {} (correlation {:.4f})'},
+    'align_failed': {'zh': '偏移检测失败: {}', 'en': 'Shift detection failed: {}'},
+    
+    # 多路对比窗口
+    'multi_compare_title': {'zh': '多路对比 - 1个参考 vs {}个候选', 'en': 'Multi Comparison - 1 reference vs {} candidates'},
+    'multi_compare_plot_title': {'zh': '参考 vs {}个候选（降采样步长={}）', 'en': 'Reference vs {} candidates (decimation step={})'},
+    'reference_file': {'zh': '参考文件:', 'en': 'Reference:'},
+    'reference_type': {'zh': '参考类型:', 'en': 'Ref Type:'},
+    'candidate_type': {'zh': '候选类型:', 'en': 'Candidate Type:'},
+    'comparing': {'zh': '正在对比... {}%', 'en': 'Comparing... {}%'},
+    'similarity_matrix': {'zh': '相似度矩阵', 'en': 'Similarity Matrix'},
+    'similarity_matrix_title': {'zh': '相似度矩阵 - {}个文件', 'en': 'Similarity Matrix - {} files'},
+    'similarity_matrix_plot_title': {'zh': '两两{}（{}个文件）', 'en': 'Pairwise {} ({} files)'},
+    'metric': {'zh': '指标:', 'en': 'Metric:'},
+    'cluster_order': {'zh': '聚类排序', 'en': 'Cluster Order'},
+    'compared_length': {'zh': '公共长度: {}', 'en': 'Common length: {}'},
+    
+    # 频谱面板
+    'heatmap': {'zh': '切片/热力图', 'en': 'Slice / Heatmap'},
+    'heatmap_shape': {'zh': '形状:', 'en': 'Shape:'},
+    'heatmap_rows': {'zh': '行维度:', 'en': 'Row axis:'},
+    'heatmap_cols': {'zh': '列维度:', 'en': 'Col axis:'},
+    'heatmap_aggregate': {'zh': '聚合:', 'en': 'Aggregate:'},
+    'aggregate_mean': {'zh': '均值', 'en': 'Mean'},
+    'aggregate_min': {'zh': '最小值', 'en': 'Min'},
+    'aggregate_max': {'zh': '最大值', 'en': 'Max'},
+    'heatmap_apply': {'zh': '应用', 'en': 'Apply'},
+    'heatmap_need_2d': {'zh': '热力图需要至少二维的形状', 'en': 'Heatmap needs a shape with at least 2 dimensions'},
+    'heatmap_error': {'zh': '热力图参数错误: {}', 'en': 'Heatmap error: {}'},
+    'heatmap_status': {'zh': '{} × {} · 级别 {} (每像素 {}×{} 个元素)', 'en': '{} × {} · level {} ({}×{} elements per pixel)'},
+    'heatmap_pending': {'zh': ' · 正在计算 {} 个瓦片', 'en': ' · computing {} tiles'},
+    'heatmap_value': {'zh': '[{}, {}] = {:.6g}', 'en': '[{}, {}] = {:.6g}'},
+    'slice_line': {'zh': '无（曲线）', 'en': 'None (line)'},
+    'slice_axis': {'zh': '维度 {}:', 'en': 'Axis {}:'},
+    'slice_index': {'zh': '{} / {}', 'en': '{} / {}'},
+    'slice_status_1d': {'zh': '长度 {} · 每点间隔 {} 个元素', 'en': 'length {} · {} elements per point'},
+    'stats': {'zh': '统计', 'en': 'Stats'},
+    'stats_computing': {'zh': '正在统计... {}%', 'en': 'Computing statistics... {}%'},
+    'stats_failed': {'zh': '统计失败: {}', 'en': 'Statistics failed: {}'},
+    'stats_length': {'zh': '长度: {}', 'en': 'Length: {}'},
+    'stat_min': {'zh': '最小值', 'en': 'Min'},
+    'stat_max': {'zh': '最大值', 'en': 'Max'},
+    'stat_mean': {'zh': '均值', 'en': 'Mean'},
+    'stat_std': {'zh': '标准差', 'en': 'Std'},
+    'stat_l2_norm': {'zh': 'L2范数', 'en': 'L2 norm'},
+    'stat_zero_count': {'zh': '零值个数', 'en': 'Zeros'},
+    'stat_nan_count': {'zh': 'NaN个数', 'en': 'NaN count'},
+    'stat_inf_count': {'zh': 'Inf个数', 'en': 'Inf count'},
+    'stat_argmin': {'zh': '最小值下标', 'en': 'Argmin'},
+    'stat_argmax': {'zh': '最大值下标', 'en': 'Argmax'},
+    'nonfinite_skipped': {'zh': '（跳过 {} 个NaN/Inf位置）', 'en': ' ({} NaN/Inf positions skipped)'},
+    'nonfinite_count': {'zh': 'NaN/Inf: {} 处', 'en': 'NaN/Inf: {} runs'},
+    'nonfinite_position': {'zh': 'NaN/Inf: [{}, {}) · 第 {}/{} 处', 'en': 'NaN/Inf: [{}, {}) · {}/{}'},
+    'nonfinite_prev': {'zh': '上一个NaN/Inf', 'en': 'Previous NaN/Inf'},
+    'nonfinite_next': {'zh': '下一个NaN/Inf', 'en': 'Next NaN/Inf'},
+    'nonfinite_truncated': {'zh': '（位置过多，只记录前 {} 处）', 'en': ' (too many, first {} recorded)'},
+    'memory_usage': {'zh': '内存：{} / {}', 'en': 'Memory: {} / {}'},
+    'memory_usage_detail': {'zh': '共享缓存 {}，窗口数据 {}，图像缓冲 {}；超出预算时后台窗口自动降低分辨率', 'en': 'Shared cache {}, window data {}, figure buffers {}; background windows lower their resolution when over budget'},
+    'montage': {'zh': '通道拼图', 'en': 'Montage'},
+    'montage_tooltip': {'zh': '把最后一个未显示的维度（如[N,C,H,W]中的C）的所有通道拼成网格，每个通道单独归一化', 'en': 'Tile every channel of the last non-displayed axis (e.g. C in [N,C,H,W]) into a grid, each normalized on its own'},
+    'montage_need_channels': {'zh': '通道拼图需要两个显示维度和一个长度大于1的其他维度', 'en': 'Montage needs two display axes and another axis longer than 1'},
+    'montage_status': {'zh': '{} 个通道 · {} × {} 网格 · 每格 {}×{} (每 {} 个元素取1)', 'en': '{} channels · {} × {} grid · {}×{} per cell (every {}th element)'},
+    'montage_value': {'zh': '通道 {} [{}, {}] = {:.6g}', 'en': 'channel {} [{}, {}] = {:.6g}'},
+    'diff_heatmap': {'zh': '差异热力图', 'en': 'Diff Heatmap'},
+    'diff_heatmap_tooltip': {'zh': '按形状把两个文件的逐元素差异显示为二维热力图（默认按最大值聚合，个别异常点不会被平均掉）', 'en': 'Show the element-wise difference of both files as a 2D heatmap (max aggregation by default so single outliers stay visible)'},
+    'diff_mode': {'zh': '差异:', 'en': 'Difference:'},
+    'diff_abs': {'zh': '|a−b|', 'en': '|a−b|'},
+    'diff_rel': {'zh': '相对误差', 'en': 'Relative error'},
+    'diff_length_mismatch': {'zh': '对齐后两个文件的长度不一致（{} vs {}），无法逐元素比较', 'en': 'Aligned lengths differ ({} vs {}); cannot compare element-wise'},
+    'spectrum': {'zh': '频谱', 'en': 'Spectrum'},
+    'spectrum_computing': {'zh': '正在计算频谱... {}%', 'en': 'Computing spectrum... {}%'},
+    'spectrum_failed': {'zh': '频谱计算失败: {}', 'en': 'Spectrum failed: {}'},
+    'spectrum_title': {'zh': 'Welch功率谱 (分段长度={})', 'en': 'Welch Power Spectrum (segment={})'},
+    'frequency': {'zh': '归一化频率 (周期/采样点)', 'en': 'Normalized Frequency (cycles/sample)'},
+    'power': {'zh': '功率', 'en': 'Power'},
     
     # 通用
     'close': {'zh': '关闭', 'en': 'Close'},
@@ -0,0 +1,219 @@
+# 布局转换（任意维度置换，如NCHW ↔ NHWC；分块写文件或惰性视图）
+import itertools
+import numpy as np
+from .concat_utils import ConcatCancelled, open_shaped_memmap, write_memmap_atomically
+from .config import Config
+from .stream_metrics import MetricAccumulator, stream_compare
+
+def parse_permutation(text, ndim):
+    """
+    解析维度置换，返回perm元组（输出第i维 = 输入第perm[i]维，与np.transpose一致）
+      "0,2,3,1"       -> 直接给出维度顺序
+      "NCHW->NHWC"    -> 用字母描述输入和输出布局（每个字母代表一维，不能重复）
+    """
+    text = text.strip().replace(' ', '')
+    if not text:
+        raise ValueError("请输入维度置换")
+    if '->' in text:
+        src, dst = text.upper().split('->', 1)
+        if len(src) != ndim or sorted(src) != sorted(dst) or len(set(src)) != ndim:
+            raise ValueError(f"布局 {text} 与 {ndim} 维形状不匹配")
+        perm = tuple(src.index(c) for c in dst)
+    else:
+        try:
+            perm = tuple(int(p) for p in text.split(',') if p)
+        except ValueError:
+            raise ValueError(f"无法解析维度置换：{text}")
+        if sorted(perm) != list(range(ndim)):
+            raise ValueError(f"维度置换 {perm} 不是 0..{ndim - 1} 的排列")
+    return perm
+
+def permuted_shape(shape, perm):
+    return tuple(shape[p] for p in perm)
+
+def _tile_shape(out_shape, perm, chunk_size):
+    """
+    分块大小：输出最内维和“源数据最内维对应的输出维”各取PERMUTE_TILE，
+    使一个块在读（源连续方向）和写（输出连续方向）两侧都是连续的小段；
+    其余维度从内到外在总元素数预算内尽量扩大
+    """
+    ndim = len(out_shape)
+    tile = [1] * ndim
+    tile_len = Config.PERMUTE_TILE
+    for d in {ndim - 1, perm.index(ndim - 1)}:
+        tile[d] = min(out_shape[d], tile_len)
+    for d in reversed(range(ndim)):
+        if tile[d] == 1:
+            budget = chunk_size // int(np.prod(tile))
+            tile[d] = max(1, min(out_shape[d], budget))
+    return tile
+
+def permute_to_file(file_path, dtype, shape, perm, out_path, chunk_size=None,
+                    progress_callback=None, cancel_check=None):
+    """
+    把形状为shape的bin文件按perm置换维度后写入out_path：
+    源文件以只读memmap打开并转置为跨步视图（不拷贝），输出以memmap预分配，
+    按分块逐块拷贝，峰值内存只与chunk_size有关
+    :return: 输出形状
+    """
+    dtype = np.dtype(dtype)
+    chunk_size = chunk_size or Config.STREAM_CHUNK_ELEMENTS
+    shape = tuple(int(d) for d in shape)
+    perm = tuple(perm)
+    if sorted(perm) != list(range(len(shape))):
+        raise ValueError(f"维度置换 {perm} 与形状 {shape} 不匹配")
+    src = open_shaped_memmap(file_path, dtype, shape).reshape(shape).transpose(perm)
+    out_shape = src.shape
+    total = int(np.prod(out_shape))
+
+    tile = _tile_shape(out_shape, perm, chunk_size)
+    ranges = [list(range(0, n, t)) for n, t in zip(out_shape, tile)]
+
+    def fill(out):
+        copied = 0
+        for starts in itertools.product(*ranges):
+            if cancel_check and cancel_check():
+                raise ConcatCancelled()
+            block = tuple(slice(s, min(s + t, n)) for s, t, n in zip(starts, tile, out_shape))
+            out[block] = src[block]
+            copied += int(np.prod([b.stop - b.start for b in block]))
+            if progress_callback:
+                progress_callback(int(copied * 100 / total))
+
+    write_memmap_atomically(out_path, dtype, out_shape, fill)
+    return out_shape
+
+class PermutedView:
+    """
+    置换维度后的惰性一维视图：对外表现为置换后张量按C顺序展平的序列，
+    支持len()、切片和整数数组索引，访问时才从底层数组（通常是memmap）读取对应元素，不写任何文件。
+    步长为1的切片仍是PermutedView（只记录起止位置，如偏移对齐后的视图），
+    np.asarray()或跨步切片时才读出数据
+    """
+    def __init__(self, data, shape, perm):
+        shape = tuple(int(d) for d in shape)
+        if int(np.prod(shape)) != len(data):
+            raise ValueError(f"形状 {shape} 与数据长度 {len(data)} 不匹配")
+        self.dtype = data.dtype
+        self.view = np.asarray(data).reshape(shape).transpose(perm)
+        self.start = 0
+        self.length = self.view.size
+        self.shape = self.view.shape
+
+    def _window(self, start, length):
+        """同一置换张量展平后[self.start + start, self.start + start + length)的视图"""
+        window = object.__new__(PermutedView)
+        window.dtype = self.dtype
+        window.view = self.view
+        window.start = self.start + start
+        window.length = length
+        # 只有完整视图才能按置换后的形状查看，部分视图只是一维序列
+        window.shape = self.view.shape if length == self.view.size else (length,)
+        return window
+
+    def __len__(self):
+        return self.length
+
+    def __array__(self, dtype=None, copy=None):
+        data = self._read_flat(self.view, self.start, self.start + self.length)
+        return data if dtype is None else data.astype(dtype)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self))
+            if step == 1:
+                return self._window(start, max(0, stop - start))
+            # 跨步访问（降采样）：只读取被取到的元素
+            key = np.arange(start, stop, step)
+        elif not isinstance(key, np.ndarray):
+            index = int(key)
+            if index < 0:
+                index += len(self)
+            if not 0 <= index < len(self):
+                raise IndexError(f"下标 {key} 超出范围（长度为 {len(self)}）")
+            return self.view[np.unravel_index(self.start + index, self.view.shape)]
+        key = np.asarray(key, dtype=np.int64)
+        key = np.where(key < 0, key + len(self), key)
+        return self.view[np.unravel_index(self.start + key, self.view.shape)]
+
+    @classmethod
+    def _read_flat(cls, view, start, stop):
+        """读取多维视图展平后的[start, stop)：中间完整的子块整体拷贝，首尾递归处理"""
+        if view.ndim == 1:
+            return np.array(view[start:stop])
+        inner = int(np.prod(view.shape[1:]))
+        i0, r0 = divmod(start, inner)
+        i1, r1 = divmod(stop, inner)
+        if i0 == i1:
+            return cls._read_flat(view[i0], r0, r1)
+        parts = []
+        if r0:
+            parts.append(cls._read_flat(view[i0], r0, inner))
+            i0 += 1
+        if i1 > i0:
+            parts.append(np.ascontiguousarray(view[i0:i1]).reshape(-1))
+        if r1:
+            parts.append(cls._read_flat(view[i1], 0, r1))
+        return np.concatenate(parts) if len(parts) > 1 else parts[0]
+
+def _distinct_permutations(shape):
+    """全部维度置换，去掉只在长度为1的维度上不同（展平顺序相同）的重复项"""
+    seen = set()
+    for perm in itertools.permutations(range(len(shape))):
+        key = tuple(p for p in perm if shape[p] != 1)
+        if key not in seen:
+            seen.add(key)
+            yield perm
+
+def strided_sample_indices(length, count, seed=0):
+    """分层随机采样：把[0, length)等分为count段，每段随机取一个位置（结果有序，memmap按顺序访问）"""
+    count = max(1, min(int(count), length))
+    stride = length // count
+    rng = np.random.default_rng(seed)
+    return np.arange(count, dtype=np.int64) * stride + rng.integers(0, stride, count)
+
+def rank_permutations(reference, candidate, shape, sample_budget=None, seed=0):
+    """
+    判断candidate是否是reference的某种维度置换：
+    对shape的每个维度置换，在同一组分层随机采样位置上计算
+    reference 与 置换后candidate 的余弦相似度，按相似度从高到低排序。
+    每个置换只读取采样到的元素，总读取量由sample_budget限制，与数据规模无关。
+    :param reference/candidate: 一维ndarray或memmap（需支持整数数组索引）
+    :param shape: candidate在文件中的形状
+    :return: [(perm, cosine), ...]
+    """
+    shape = tuple(int(d) for d in shape)
+    length = int(np.prod(shape))
+    if len(reference) != length or len(candidate) != length:
+        raise ValueError(f"形状 {shape} 与数据长度不匹配: {len(reference)} vs {len(candidate)}")
+    perms = list(_distinct_permutations(shape))
+    sample_budget = sample_budget or Config.LAYOUT_DETECT_BUDGET
+    per_perm = int(np.clip(sample_budget // len(perms), 1024, 1 << 16))
+
+    indices = strided_sample_indices(length, per_perm, seed)
+    ref = np.asarray(reference[indices], dtype=np.float64)
+    results = []
+    for perm in perms:
+        # 置换后展平位置 -> 置换后坐标 -> 原始坐标 -> 原始展平位置
+        out_coords = np.unravel_index(indices, permuted_shape(shape, perm))
+        src_coords = [None] * len(shape)
+        for k, p in enumerate(perm):
+            src_coords[p] = out_coords[k]
+        src = np.ravel_multi_index(src_coords, shape)
+        acc = MetricAccumulator()
+        acc.update(ref, np.asarray(candidate[src], dtype=np.float64))
+        results.append((perm, float(acc.cosine_similarity())))
+    results.sort(key=lambda item: item[1], reverse=True)
+    return results
+
+def detect_permutation(reference, candidate, shape, sample_budget=None, progress_callback=None,
+                       cancel_check=None):
+    """
+    采样排序后，在全量数据上流式确认排名第一的置换
+    :return: {'perm', 'cosine'（全量）, 'ranking'（采样结果）}
+    """
+    ranking = rank_permutations(reference, candidate, shape, sample_budget)
+    best = ranking[0][0]
+    acc = stream_compare(reference, PermutedView(candidate, shape, best),
+                         progress_callback=progress_callback, cancel_check=cancel_check)
+    return {'perm': best, 'cosine': float(acc.cosine_similarity()), 'ranking': ranking}
@@ -0,0 +1,58 @@
+# 通道拼图（把[C,H,W]的每个通道降采样后按网格拼成一张图，逐通道归一化）
+import numpy as np
+from .bin_utils import handle_invalid_values
+from .config import Config
+from .tile_pyramid import slice_view
+
+# 相邻格子之间的间隔（像素，显示为背景色）
+GAP = 1
+
+class ChannelMontage:
+    """
+    把张量沿channel_axis的每个通道（由axes给出的两个维度组成的平面）拼成一张图：
+    所有通道一次性按相同跨步从memmap读取，逐通道min/max归一化到[0, 1]都在整个数组上向量化完成，
+    结果是单张图像（格子间隔为NaN），用一次imshow显示
+    """
+    def __init__(self, data, shape, channel_axis, axes, fixed=None, max_pixels=None):
+        self.view = slice_view(data, shape, (channel_axis,) + tuple(axes), fixed)
+        if self.view.ndim != 3:
+            raise ValueError("通道拼图需要一个通道维度和两个显示维度")
+        self.channels, height, width = self.view.shape
+        max_pixels = max_pixels or Config.MONTAGE_PIXELS
+
+        # 网格尽量接近正方形（按通道平面的宽高比）
+        self.cols = int(np.clip(np.ceil(np.sqrt(self.channels * height / width)), 1, self.channels))
+        self.rows = -(-self.channels // self.cols)
+        self.step = max(1, -(-self.cols * width // max_pixels), -(-self.rows * height // max_pixels))
+
+        tiles = handle_invalid_values(np.array(self.view[:, ::self.step, ::self.step], dtype=np.float32), copy=False)
+        self.vmin = tiles.min(axis=(1, 2))
+        self.vmax = tiles.max(axis=(1, 2))
+        span = self.vmax - self.vmin
+        tiles -= self.vmin[:, None, None]
+        tiles /= np.where(span > 0, span, 1)[:, None, None]
+
+        self.tile_h, self.tile_w = tiles.shape[1:]
+        cell_h, cell_w = self.tile_h + GAP, self.tile_w + GAP
+        grid = np.full((self.rows * self.cols, cell_h, cell_w), np.nan, dtype=np.float32)
+        grid[:self.channels, :self.tile_h, :self.tile_w] = tiles
+        self.image = grid.reshape(self.rows, self.cols, cell_h, cell_w).transpose(0, 2, 1, 3).reshape(
+            self.rows * cell_h, self.cols * cell_w
+        )[:-GAP, :-GAP]
+
+    def locate(self, x, y):
+        """图像坐标 -> (通道, 行, 列)（源数据坐标），落在间隔或空格子上时返回None"""
+        cell_h, cell_w = self.tile_h + GAP, self.tile_w + GAP
+        x, y = int(round(x)), int(round(y))
+        if x < 0 or y < 0:
+            return None
+        grid_row, ty = divmod(y, cell_h)
+        grid_col, tx = divmod(x, cell_w)
+        channel = grid_row * self.cols + grid_col
+        if ty >= self.tile_h or tx >= self.tile_w or grid_col >= self.cols or channel >= self.channels:
+            return None
+        return channel, ty * self.step, tx * self.step
+
+    def value(self, channel, row, col):
+        """源数据中的原始值（直接读取一个元素）"""
+        return float(self.view[channel, row, col])
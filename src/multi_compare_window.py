@@ -0,0 +1,334 @@
+# 多路对比窗口（一个参考文件 vs 多个候选文件）
+import os
+import numpy as np
+from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
+                             QLabel, QComboBox, QFrame, QSplitter, QTableWidget, QPushButton,
+                             QTableWidgetItem, QHeaderView, QAbstractItemView)
+from PyQt5.QtCore import Qt, QThread, pyqtSignal
+from PyQt5.QtGui import QFont, QKeyEvent, QColor
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+import matplotlib.pyplot as plt
+from .config import Config
+from .style_manager import StyleManager
+from .window_manager import WindowManager
+from .language_manager import get_text
+from .stream_metrics import compare_reference_to_candidates, StreamCancelled
+from .similarity_matrix_window import SimilarityMatrixWindow
+
+# 保持运行中线程的引用，直到线程真正结束
+_running_workers = set()
+
+class MultiCompareWorker(QThread):
+    """后台执行参考文件对所有候选文件的流式对比"""
+    progress = pyqtSignal(int)
+    result_ready = pyqtSignal(object, object)
+    failed = pyqtSignal(str)
+
+    def __init__(self, ref_path, candidate_paths, ref_dtype, candidate_dtype, parent=None):
+        super().__init__(parent)
+        self.ref_path = ref_path
+        self.candidate_paths = candidate_paths
+        self.ref_dtype = ref_dtype
+        self.candidate_dtype = candidate_dtype
+
+    def run(self):
+        try:
+            results, traces = compare_reference_to_candidates(
+                self.ref_path, self.candidate_paths,
+                ref_dtype=self.ref_dtype, candidate_dtype=self.candidate_dtype,
+                progress_callback=self.progress.emit,
+                cancel_check=self.isInterruptionRequested
+            )
+        except StreamCancelled:
+            return
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+        self.result_ready.emit(results, traces)
+
+class NumericTableItem(QTableWidgetItem):
+    """按数值（而非显示文本）排序的表格项"""
+    def __init__(self, value, text):
+        super().__init__(text)
+        self.setData(Qt.UserRole, value)
+        self.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+
+    def __lt__(self, other):
+        return self.data(Qt.UserRole) < other.data(Qt.UserRole)
+
+def format_metric(value):
+    if abs(value) >= 1e-3 or value == 0:
+        return f"{value:.4f}"
+    return f"{value:.3e}"
+
+class MultiComparisonWindow(QMainWindow):
+    """一个参考文件对多个候选文件的对比：指标表 + 叠加的降采样曲线"""
+    COLUMNS = ['#', 'file', 'length', 'Cos', 'MSE', 'MAE', 'MaxAbs']
+
+    def __init__(self, file_paths, dtype="float32", parent=None, screen_dpi=None):
+        super().__init__(parent)
+        self.file_paths = list(file_paths)
+        self.ref_index = 0
+        self.ref_dtype = dtype
+        self.candidate_dtype = dtype
+        self.screen_dpi = screen_dpi or QApplication.desktop().logicalDpiX()
+        self.worker = None
+        self.results = []
+        self.traces = None
+        self.trace_lines = []
+
+        self.window_manager = WindowManager()
+        self.window_manager.register_window(self)
+
+        self.setWindowTitle(get_text('multi_compare_title').format(len(self.file_paths) - 1))
+        self.resize(
+            Config.get_scaled_value(1000, self.screen_dpi),
+            Config.get_scaled_value(750, self.screen_dpi)
+        )
+        self.setStyleSheet(StyleManager.generate_plot_style(self.screen_dpi))
+        icon = Config.load_icon()
+        if icon:
+            self.setWindowIcon(icon)
+
+        central_widget = QWidget()
+        self.setCentralWidget(central_widget)
+        self.main_layout = QVBoxLayout(central_widget)
+        self.main_layout.setContentsMargins(0, 0, 0, 0)
+        self.main_layout.setSpacing(0)
+
+        self._init_control_bar()
+        self._init_content()
+        self.start_compare()
+
+    # ---------------------- UI初始化 ----------------------
+    def _init_control_bar(self):
+        control_bar = QFrame()
+        control_bar.setObjectName("ControlBar")
+        layout = QHBoxLayout(control_bar)
+        margin = Config.get_scaled_value(5, self.screen_dpi)
+        layout.setContentsMargins(margin, 3, margin, 3)
+        layout.setSpacing(Config.get_scaled_value(8, self.screen_dpi))
+
+        font_size = Config.get_scaled_font_size(10, self.screen_dpi)
+
+        ref_label = QLabel(get_text('reference_file'))
+        ref_label.setFont(QFont(ref_label.font().family(), font_size))
+        layout.addWidget(ref_label)
+
+        self.ref_combo = QComboBox()
+        self.ref_combo.addItems([os.path.basename(p) for p in self.file_paths])
+        self.ref_combo.currentIndexChanged.connect(self._on_reference_changed)
+        layout.addWidget(self.ref_combo)
+
+        ref_dtype_label = QLabel(get_text('reference_type'))
+        ref_dtype_label.setFont(QFont(ref_dtype_label.font().family(), font_size))
+        layout.addWidget(ref_dtype_label)
+
+        self.ref_dtype_combo = QComboBox()
+        self.ref_dtype_combo.addItems(["int8", "int16", "float32"])
+        self.ref_dtype_combo.setCurrentText(self.ref_dtype)
+        self.ref_dtype_combo.currentTextChanged.connect(self._on_ref_dtype_changed)
+        layout.addWidget(self.ref_dtype_combo)
+
+        cand_dtype_label = QLabel(get_text('candidate_type'))
+        cand_dtype_label.setFont(QFont(cand_dtype_label.font().family(), font_size))
+        layout.addWidget(cand_dtype_label)
+
+        self.cand_dtype_combo = QComboBox()
+        self.cand_dtype_combo.addItems(["int8", "int16", "float32"])
+        self.cand_dtype_combo.setCurrentText(self.candidate_dtype)
+        self.cand_dtype_combo.currentTextChanged.connect(self._on_candidate_dtype_changed)
+        layout.addWidget(self.cand_dtype_combo)
+
+        matrix_btn = QPushButton(get_text('similarity_matrix'))
+        matrix_btn.clicked.connect(self.open_similarity_matrix)
+        layout.addWidget(matrix_btn)
+
+        self.status_label = QLabel("")
+        self.status_label.setFont(QFont(self.status_label.font().family(), font_size))
+        layout.addWidget(self.status_label)
+
+        layout.addStretch(1)
+        self.main_layout.addWidget(control_bar)
+
+    def _init_content(self):
+        splitter = QSplitter(Qt.Vertical)
+
+        # 指标表
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.horizontalHeader().setSectionResizeMode(1, QHeaderView.Stretch)
+        self.table.horizontalHeader().setSortIndicator(0, Qt.AscendingOrder)
+        self.table.itemSelectionChanged.connect(self._on_selection_changed)
+        splitter.addWidget(self.table)
+
+        # 叠加曲线
+        self.figure = Figure(
+            figsize=(Config.get_scaled_value(8, self.screen_dpi) / 100, Config.get_scaled_value(4, self.screen_dpi) / 100),
+            dpi=self.screen_dpi,
+            facecolor='white'
+        )
+        self.canvas = FigureCanvas(self.figure)
+        self.ax = self.figure.add_subplot(111)
+        splitter.addWidget(self.canvas)
+
+        splitter.setSizes([
+            Config.get_scaled_value(250, self.screen_dpi),
+            Config.get_scaled_value(450, self.screen_dpi)
+        ])
+        self.main_layout.addWidget(splitter, 1)
+
+    # ---------------------- 对比计算 ----------------------
+    def candidate_paths(self):
+        return [p for i, p in enumerate(self.file_paths) if i != self.ref_index]
+
+    def start_compare(self):
+        """在后台线程中重新计算所有候选文件的指标"""
+        self.stop_compare()
+        self.status_label.setText(get_text('comparing').format(0))
+        worker = MultiCompareWorker(
+            self.file_paths[self.ref_index], self.candidate_paths(),
+            self.ref_dtype, self.candidate_dtype
+        )
+        worker.progress.connect(lambda p: self.status_label.setText(get_text('comparing').format(p)))
+        worker.result_ready.connect(self._on_result)
+        worker.failed.connect(self._on_failed)
+        worker.finished.connect(lambda: _running_workers.discard(worker))
+        _running_workers.add(worker)
+        self.worker = worker
+        worker.start()
+
+    def stop_compare(self):
+        if self.worker is not None:
+            self.worker.requestInterruption()
+            self.worker.progress.disconnect()
+            self.worker.result_ready.disconnect()
+            self.worker.failed.disconnect()
+            self.worker = None
+
+    def _on_failed(self, message):
+        self.worker = None
+        self.status_label.setText(get_text('calc_error').format(message))
+
+    def _on_result(self, results, traces):
+        self.worker = None
+        self.results = results
+        self.traces = traces
+        self.status_label.setText("")
+        self._fill_table()
+        self._plot_traces()
+
+    def _fill_table(self):
+        self.table.setSortingEnabled(False)
+        self.table.setRowCount(len(self.results))
+        for row, result in enumerate(self.results):
+            index_item = NumericTableItem(row, str(row + 1))
+            index_item.setForeground(QColor(self._candidate_color(row)))
+            self.table.setItem(row, 0, index_item)
+
+            name_item = QTableWidgetItem(os.path.basename(result["file_path"]))
+            name_item.setToolTip(result["file_path"])
+            self.table.setItem(row, 1, name_item)
+
+            self.table.setItem(row, 2, NumericTableItem(result["original_length"], str(result["original_length"])))
+            for col, key in zip(range(3, 7), ["cosine_similarity", "mse", "mae", "max_abs_error"]):
+                value = result[key]
+                text = f"{value:.6f}" if key == "cosine_similarity" else format_metric(value)
+                self.table.setItem(row, col, NumericTableItem(value, text))
+        self.table.setSortingEnabled(True)
+        self.table.resizeColumnsToContents()
+        self.table.horizontalHeader().setSectionResizeMode(1, QHeaderView.Stretch)
+
+    def _candidate_color(self, i):
+        cmap = plt.get_cmap('tab10' if len(self.results) <= 10 else 'tab20')
+        return '#%02x%02x%02x' % tuple(int(c * 255) for c in cmap(i % cmap.N)[:3])
+
+    def _plot_traces(self):
+        self.ax.clear()
+        self.trace_lines = []
+        if self.traces is None:
+            return
+
+        step = self.traces["step"]
+        lw = Config.get_scaled_value(1.0, self.screen_dpi)
+        for i, trace in enumerate(self.traces["candidates"]):
+            line, = self.ax.plot(
+                np.arange(len(trace)) * step, trace,
+                color=self._candidate_color(i), linewidth=lw, alpha=0.6,
+                label=f"{i + 1}. {os.path.basename(self.results[i]['file_path'])}"
+            )
+            self.trace_lines.append(line)
+
+        reference = self.traces["reference"]
+        self.ax.plot(
+            np.arange(len(reference)) * step, reference,
+            color="#222222", linewidth=lw * 1.5, alpha=0.9,
+            label=f"ref: {os.path.basename(self.file_paths[self.ref_index])}", zorder=5
+        )
+
+        self.ax.set_title(
+            get_text('multi_compare_plot_title').format(len(self.results), step),
+            fontsize=Config.get_scaled_font_size(10, self.screen_dpi)
+        )
+        self.ax.set_xlabel(get_text('index'), fontsize=Config.get_scaled_font_size(9, self.screen_dpi))
+        self.ax.set_ylabel(get_text('value'), fontsize=Config.get_scaled_font_size(9, self.screen_dpi))
+        self.ax.tick_params(axis='both', labelsize=Config.get_scaled_font_size(8, self.screen_dpi))
+        self.ax.grid(True, alpha=0.2)
+        if len(self.results) <= 10:
+            self.ax.legend(fontsize=Config.get_scaled_font_size(7, self.screen_dpi), loc='upper right')
+        try:
+            self.figure.tight_layout()
+        except Exception:
+            pass
+        self.canvas.draw()
+
+    def _on_selection_changed(self):
+        """选中表格行时突出显示对应曲线"""
+        selected = {self.table.item(idx.row(), 0).data(Qt.UserRole)
+                    for idx in self.table.selectionModel().selectedRows()}
+        for i, line in enumerate(self.trace_lines):
+            if not selected:
+                line.set_alpha(0.6)
+                line.set_zorder(2)
+            elif i in selected:
+                line.set_alpha(1.0)
+                line.set_zorder(4)
+            else:
+                line.set_alpha(0.15)
+                line.set_zorder(2)
+        self.canvas.draw_idle()
+
+    def open_similarity_matrix(self):
+        """所有文件（含参考）的两两相似度矩阵"""
+        matrix_window = SimilarityMatrixWindow(
+            self.file_paths, dtype=self.candidate_dtype,
+            parent=None, screen_dpi=self.screen_dpi
+        )
+        matrix_window.show()
+
+    # ---------------------- 事件处理 ----------------------
+    def _on_reference_changed(self, index):
+        self.ref_index = index
+        self.start_compare()
+
+    def _on_ref_dtype_changed(self, dtype):
+        self.ref_dtype = dtype
+        self.start_compare()
+
+    def _on_candidate_dtype_changed(self, dtype):
+        self.candidate_dtype = dtype
+        self.start_compare()
+
+    def keyPressEvent(self, event: QKeyEvent):
+        if event.key() == Qt.Key_Escape:
+            self.close()
+        super().keyPressEvent(event)
+
+    def closeEvent(self, event):
+        self.stop_compare()
+        self.window_manager.unregister_window(self)
+        event.accept()
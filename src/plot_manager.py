@@ -8,6 +8,56 @@ from PyQt5.QtCore import Qt, QTimer
 from PyQt5.QtGui import QCursor, QFont
 from .config import Config
 
+def visible_vertices(ax, data):
+    """
+    data在当前x范围内的折线顶点 (x, y)。只取可见的一段（数据保持原生类型，
+    由matplotlib把这一小段转为浮点）；点数超过像素列数的两倍时每列只保留最小和最大值，
+    顶点数与画布宽度成正比而与数据长度无关
+    """
+    x_start, x_end = ax.get_xlim()
+    start = max(0, int(np.floor(x_start)))
+    stop = min(len(data), int(np.ceil(x_end)) + 1)
+    if stop <= start:
+        return np.empty(0), np.empty(0)
+    segment = data[start:stop]
+    n = len(segment)
+    columns = max(1, int(ax.bbox.width))
+    if n <= 2 * columns:
+        return np.arange(start, stop), segment
+    per = -(-n // columns)
+    full = n // per
+    blocks = segment[:full * per].reshape(full, per)
+    # 每列的最小值和最大值按原来的先后顺序连接，保留波形的起伏方向
+    index = np.sort(np.stack([blocks.argmin(axis=1), blocks.argmax(axis=1)], axis=1), axis=1)
+    index = (index + (np.arange(full) * per)[:, None]).ravel()
+    if full * per < n:
+        tail = segment[full * per:]
+        index = np.concatenate([index, full * per + np.sort([tail.argmin(), tail.argmax()])])
+    return start + index, segment[index]
+
+def plot_visible(ax, data, **kwargs):
+    """
+    把data画成折线，但只把可见范围的顶点交给matplotlib，x范围变化（缩放/平移）时自动更新顶点；
+    坐标轴的数据范围仍按完整数据计算。返回Line2D
+    """
+    line, = ax.plot([], [], **kwargs)
+    if len(data):
+        ax.update_datalim([(0, float(data.min())), (len(data) - 1, float(data.max()))])
+
+    def update(ax):
+        line.set_data(*visible_vertices(ax, data))
+
+    ax.callbacks.connect('xlim_changed', update)
+    update(ax)
+    return line
+
+def follow_canvas_size(canvas, *axes):
+    """画布尺寸变化时按新的像素宽度重新生成各坐标轴上 plot_visible 折线的顶点"""
+    def refresh(_):
+        for ax in axes:
+            ax.callbacks.process('xlim_changed', ax)
+    canvas.mpl_connect('resize_event', refresh)
+
 class PlotManager:
     def __init__(self, parent, dpi):
         self.parent = parent
@@ -16,6 +66,9 @@ class PlotManager:
         self.figure = None
         self.canvas = None
         self.ax = None
+        # 额外标记的位置（如NaN/Inf所在位置，绘图坐标）
+        self.markers = None
+        self.marker_artist = None
         
         # 交互状态
         self.tooltip = None
@@ -52,6 +105,7 @@ class PlotManager:
         self.canvas.mpl_connect('button_press_event', self._on_press)
         self.canvas.mpl_connect('motion_notify_event', self._on_move)
         self.canvas.mpl_connect('button_release_event', self._on_release)
+        follow_canvas_size(self.canvas, self.ax)
         
         # 右键菜单
         self.canvas.setContextMenuPolicy(Qt.CustomContextMenu)
@@ -90,9 +144,9 @@ class PlotManager:
         # 只恢复X轴范围，不恢复Y轴（核心修改）
         self.ax.set_xlim(current_xlim)
         
-        # 绘制主线
-        self.ax.plot(
-            self.data,
+        # 绘制主线（只有可见范围的顶点转为浮点交给渲染器）
+        plot_visible(
+            self.ax, self.data,
             color="#4285f4",
             linewidth=Config.get_scaled_value(1.2, self.dpi),
             zorder=1
@@ -109,11 +163,48 @@ class PlotManager:
         self.ax.grid(True, alpha=0.3, linewidth=Config.get_scaled_value(0.8, self.dpi))
         self.ax.tick_params(axis='both', labelsize=Config.get_scaled_font_size(8, self.dpi))
         
-        # 强制重新计算Y轴范围（核心修改：确保适配新数据）
-        self.ax.relim()  # 重新计算数据边界
+        # 强制重新计算Y轴范围（核心修改：确保适配新数据）；清除后的数据边界已按完整数据设置
         self.ax.autoscale_view(scaley=True, scalex=False)  # Y轴自动缩放，X轴保持用户视图
         
+        # 标记在Y轴缩放之后添加，不影响Y轴范围
+        self.marker_artist = None
+        self._draw_markers()
         self.canvas.draw()
+    
+    def set_markers(self, positions):
+        """设置标记位置（绘图坐标，None表示不标记），以贯穿整个高度的竖线显示"""
+        self.markers = positions
+        self._draw_markers()
+        self.canvas.draw_idle()
+    
+    def _draw_markers(self):
+        if self.marker_artist is not None:
+            self.marker_artist.remove()
+            self.marker_artist = None
+        if self.markers is None or len(self.markers) == 0:
+            return
+        ylim = self.ax.get_ylim()
+        self.marker_artist = self.ax.vlines(
+            self.markers, 0, 1,
+            transform=self.ax.get_xaxis_transform(),
+            colors="#ea4335",
+            linewidth=Config.get_scaled_value(1.0, self.dpi),
+            alpha=0.6,
+            zorder=0
+        )
+        self.ax.set_ylim(ylim)
+    
+    def center_on(self, x, max_width=None):
+        """把视图平移到以x为中心（保持当前缩放，宽度超过max_width时放大到max_width）"""
+        if self.data is None:
+            return
+        x_start, x_end = self.ax.get_xlim()
+        half = (x_end - x_start) / 2
+        if max_width is not None:
+            half = min(half, max_width / 2)
+        center = min(max(x, half), max(half, len(self.data) - 1 - half))
+        self.ax.set_xlim(center - half, center + half)
+        self.canvas.draw_idle()
     def _should_show_points(self):
         """判断是否显示数据点"""
         if not hasattr(self, 'data') or self.data is None:
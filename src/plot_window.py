@@ -1,14 +1,16 @@
 # 重构后的PlotWindow
 import sys
 import os
+import numpy as np
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                              QPushButton, QLabel, QComboBox, 
-                             QHBoxLayout, QFrame, QMessageBox)
+                             QHBoxLayout, QFrame, QMessageBox, QSplitter)
 from PyQt5.QtGui import QFont
-from PyQt5.QtCore import Qt, QTimer, pyqtSignal
+from PyQt5.QtCore import Qt, QTimer, QEvent, pyqtSignal
 from PyQt5.QtGui import QKeyEvent, QDragEnterEvent, QDropEvent
 
 from .comparison_window import ComparisonWindow
+from .multi_compare_window import MultiComparisonWindow
 from .config import Config
 from .style_manager import StyleManager
 from .data_manager import DataManager
@@ -16,6 +18,13 @@ from .plot_manager import PlotManager
 from .file_handler import FileHandler
 from .window_manager import WindowManager
 from .language_manager import get_text
+from .spectrum_panel import SpectrumPanel
+from .stats_panel import StatsPanel, StatsWorker
+from .heatmap_view import HeatmapView
+from . import cache_manager
+
+# 保持后台扫描线程的引用，直到线程真正结束
+_running_workers = set()
 
 class PlotWindow(QMainWindow):
     closed = pyqtSignal(int)
@@ -26,6 +35,13 @@ class PlotWindow(QMainWindow):
         self.index = index
         self.dtype = dtype
         self.screen_dpi = screen_dpi or QApplication.desktop().logicalDpiX()
+        # NaN/Inf位置索引（后台扫描得到）及波形图的降采样步长
+        self.nonfinite = None
+        self.nonfinite_cursor = None
+        self.nonfinite_worker = None
+        self.plot_step = 1
+        # 内存预算降级级别（0为完整显示，见 WindowManager.enforce_budget）
+        self.memory_level = 0
         
         # 初始化管理器
         self.data_manager = DataManager()
@@ -39,16 +55,11 @@ class PlotWindow(QMainWindow):
     
     def _fallback_load_data(self):
         """备用数据加载方法"""
-        import src.bin_utils as bin_utils
-        import numpy as np
-        
         try:
-            # 读取原始数据
-            raw_data = bin_utils.handle_invalid_values(
-                bin_utils.read_bin_file(self.file_path, dtype=np.dtype(self.dtype))
-            )
-            # 降采样
-            data = self._downsample_data(raw_data, Config.MAX_DOWNSAMPLE_POINTS)
+            # 共享的memmap和降采样数据（其他窗口已读过同一文件时直接复用）
+            raw_data = cache_manager.open_memmap(self.file_path, self.dtype)
+            step = cache_manager.decimation_step(len(raw_data), Config.MAX_DOWNSAMPLE_POINTS)
+            data = cache_manager.decimated(self.file_path, self.dtype, step)
             self.plot_manager.set_data(data)
             
             title = f"{os.path.basename(self.file_path)} ({self.dtype}) - length: {len(data)}"
@@ -135,29 +146,67 @@ class PlotWindow(QMainWindow):
         open_btn.clicked.connect(self._open_new_file)
         layout.addWidget(open_btn)
         
+        self.spectrum_btn = QPushButton(get_text('spectrum'))
+        self.spectrum_btn.setCheckable(True)
+        self.spectrum_btn.toggled.connect(self._on_spectrum_toggled)
+        layout.addWidget(self.spectrum_btn)
+        
+        self.heatmap_btn = QPushButton(get_text('heatmap'))
+        self.heatmap_btn.setCheckable(True)
+        self.heatmap_btn.toggled.connect(self._on_heatmap_toggled)
+        layout.addWidget(self.heatmap_btn)
+        
+        self.stats_btn = QPushButton(get_text('stats'))
+        self.stats_btn.setCheckable(True)
+        self.stats_btn.toggled.connect(self._on_stats_toggled)
+        layout.addWidget(self.stats_btn)
+        
+        # NaN/Inf位置导航（发现非法值时才显示）
+        self.nonfinite_prev_btn = QPushButton("◀")
+        self.nonfinite_prev_btn.setToolTip(get_text('nonfinite_prev'))
+        self.nonfinite_prev_btn.clicked.connect(lambda: self._goto_nonfinite(forward=False))
+        layout.addWidget(self.nonfinite_prev_btn)
+        self.nonfinite_label = QLabel("")
+        self.nonfinite_label.setStyleSheet("color: #ea4335;")
+        layout.addWidget(self.nonfinite_label)
+        self.nonfinite_next_btn = QPushButton("▶")
+        self.nonfinite_next_btn.setToolTip(get_text('nonfinite_next'))
+        self.nonfinite_next_btn.clicked.connect(lambda: self._goto_nonfinite(forward=True))
+        layout.addWidget(self.nonfinite_next_btn)
+        self._set_nonfinite_visible(False)
+        
         layout.addStretch(1)
         self.main_layout.addWidget(control_bar)
     
     def _init_plot_area(self):
-        """初始化绘图区域"""
-        self.main_layout.addWidget(self.plot_manager.canvas, 1)
+        """初始化绘图区域（波形 + 可选的频谱面板）"""
+        self.plot_splitter = QSplitter(Qt.Vertical)
+        self.plot_splitter.addWidget(self.plot_manager.canvas)
+        
+        # 二维热力图（首次打开时才创建），与波形图二选一显示
+        self.heatmap_view = None
+        
+        self.spectrum_panel = SpectrumPanel(self, self.screen_dpi)
+        self.spectrum_panel.setVisible(False)
+        self.plot_splitter.addWidget(self.spectrum_panel)
+        
+        self.stats_panel = StatsPanel(self, self.screen_dpi)
+        self.stats_panel.setVisible(False)
+        self.plot_splitter.addWidget(self.stats_panel)
+        
+        self.main_layout.addWidget(self.plot_splitter, 1)
     
 
     
     def _load_data(self):
         """加载数据"""
-        import src.bin_utils as bin_utils
-        import numpy as np
-        
         try:
-            # 读取原始数据
-            raw_data = bin_utils.handle_invalid_values(
-                bin_utils.read_bin_file(self.file_path, dtype=np.dtype(self.dtype))
-            )
-
-            
-            # 降采样
-            data = self._downsample_data(raw_data, Config.MAX_DOWNSAMPLE_POINTS)
+            # 共享的memmap（不整体读入）和降采样数据：其他窗口已读过同一文件时直接复用，
+            # 非法值只在降采样读出的点上处理
+            raw_data = cache_manager.open_memmap(self.file_path, self.dtype)
+            max_points = max(1, Config.MAX_DOWNSAMPLE_POINTS // Config.MEMORY_COARSE_FACTOR ** self.memory_level)
+            self.plot_step = cache_manager.decimation_step(len(raw_data), max_points)
+            data = cache_manager.decimated(self.file_path, self.dtype, self.plot_step)
             
             if data is not None and len(data) > 0:
                 self.plot_manager.set_data(data)
@@ -165,10 +214,126 @@ class PlotWindow(QMainWindow):
                 self.plot_manager.plot_data(title=title)
         except Exception:
             pass
+        self._scan_nonfinite()
+    
+    def _scan_nonfinite(self):
+        """
+        后台扫描NaN/Inf位置（与统计面板共用同一次扫描和缓存），完成后在波形图上标记；
+        整数类型不可能有非法值，不扫描
+        """
+        self._stop_nonfinite_scan()
+        self.nonfinite = None
+        self.nonfinite_cursor = None
+        self.plot_manager.set_markers(None)
+        self._set_nonfinite_visible(False)
+        if np.dtype(self.dtype).kind != 'f':
+            return
+        worker = StatsWorker([(self.file_path, self.dtype, "")])
+        worker.result_ready.connect(self._on_nonfinite_ready)
+        worker.finished.connect(lambda: _running_workers.discard(worker))
+        _running_workers.add(worker)
+        self.nonfinite_worker = worker
+        worker.start()
+    
+    def _stop_nonfinite_scan(self):
+        if self.nonfinite_worker is not None:
+            self.nonfinite_worker.requestInterruption()
+            self.nonfinite_worker.result_ready.disconnect()
+            self.nonfinite_worker = None
+    
+    def _on_nonfinite_ready(self, results):
+        self.nonfinite_worker = None
+        index = results[0][1].nonfinite
+        if not len(index):
+            return
+        self.nonfinite = index
+        self.plot_manager.set_markers(index.marker_positions() / self.plot_step)
+        text = get_text('nonfinite_count').format(len(index))
+        if index.truncated:
+            text += get_text('nonfinite_truncated').format(len(index))
+        self.nonfinite_label.setText(text)
+        self._set_nonfinite_visible(True)
+    
+    def _set_nonfinite_visible(self, visible):
+        for widget in (self.nonfinite_prev_btn, self.nonfinite_label, self.nonfinite_next_btn):
+            widget.setVisible(visible)
+    
+    def _goto_nonfinite(self, forward):
+        """跳到下一处（上一处）NaN/Inf，到头后从另一端继续；首次跳转从当前视图中心开始"""
+        if self.nonfinite is None:
+            return
+        runs = self.nonfinite.runs
+        if self.nonfinite_cursor is None:
+            x_start, x_end = self.plot_manager.ax.get_xlim()
+            center = (x_start + x_end) / 2 * self.plot_step
+            cursor = int(np.searchsorted(runs[:, 0], center, side='right' if forward else 'left'))
+            cursor = cursor if forward else cursor - 1
+        else:
+            cursor = self.nonfinite_cursor + (1 if forward else -1)
+        self.nonfinite_cursor = cursor % len(runs)
+        start, stop = (int(v) for v in runs[self.nonfinite_cursor])
+        self.nonfinite_label.setText(
+            get_text('nonfinite_position').format(start, stop, self.nonfinite_cursor + 1, len(runs))
+        )
+        # 放大到能看清单个数据点的范围
+        self.plot_manager.center_on(start / self.plot_step, max_width=Config.SHOW_DATA_THRESHOLD)
     def _on_dtype_changed(self, dtype):
         """数据类型改变"""
         self.dtype = dtype
         self._load_data()  # 直接重新加载数据
+        if self.spectrum_btn.isChecked():
+            self._update_spectrum()
+        if self.heatmap_btn.isChecked():
+            self._update_heatmap()
+        if self.stats_btn.isChecked():
+            self._update_stats()
+    
+    def _on_spectrum_toggled(self, checked):
+        """显示/隐藏频谱面板"""
+        self.spectrum_panel.setVisible(checked)
+        if checked:
+            self._update_spectrum()
+        else:
+            self.spectrum_panel.stop()
+    
+    def _on_heatmap_toggled(self, checked):
+        """在波形图和二维热力图之间切换"""
+        if checked and self.heatmap_view is None:
+            self.heatmap_view = HeatmapView(self, self.screen_dpi)
+            self.plot_splitter.insertWidget(1, self.heatmap_view)
+        self.plot_manager.canvas.setVisible(not checked)
+        if self.heatmap_view is not None:
+            self.heatmap_view.setVisible(checked)
+            if checked:
+                self._update_heatmap()
+            else:
+                self.heatmap_view.stop()
+    
+    def _update_heatmap(self):
+        try:
+            self.heatmap_view.set_source(self.file_path, self.dtype)
+        except (OSError, ValueError) as e:
+            QMessageBox.warning(self, get_text('file_error'), str(e))
+    
+    def _on_stats_toggled(self, checked):
+        """显示/隐藏统计面板"""
+        self.stats_panel.setVisible(checked)
+        if checked:
+            self._update_stats()
+        else:
+            self.stats_panel.stop()
+    
+    def _update_stats(self):
+        """在后台统计当前文件（已统计过的文件直接取缓存）"""
+        self.stats_panel.set_sources([
+            (self.file_path, self.dtype, f"{os.path.basename(self.file_path)} ({self.dtype})")
+        ])
+    
+    def _update_spectrum(self):
+        """在后台重新计算当前文件的频谱"""
+        self.spectrum_panel.set_sources([
+            (self.file_path, self.dtype, f"{os.path.basename(self.file_path)} ({self.dtype})", "#4285f4")
+        ])
     
     def _select_compare_file(self, file_path=None):
         """选择对比文件"""
@@ -215,10 +380,41 @@ class PlotWindow(QMainWindow):
         if len(valid_files) == 1:
             self._select_compare_file(valid_files[0])
         elif len(valid_files) > 1:
-            QMessageBox.information(self, get_text('hint'), get_text('not_support_3_files'))
+            # 当前文件作为参考，拖入的文件作为候选
+            multi_window = MultiComparisonWindow(
+                [self.file_path] + valid_files, dtype=self.dtype,
+                parent=None, screen_dpi=self.screen_dpi
+            )
+            multi_window.show()
         
         event.acceptProposedAction()
     
+    def memory_arrays(self):
+        """本窗口常驻内存的数组（供 WindowManager 统计内存占用）"""
+        if self.plot_manager.data is not None:
+            yield self.plot_manager.data
+        if self.heatmap_view is not None:
+            yield from self.heatmap_view.memory_arrays()
+    
+    def reduce_memory(self, level):
+        """
+        转入后台且总内存超出预算时降级：1 = 波形图改用更粗的降采样，
+        2 = 只保留memmap和最粗的预览，释放热力图的其余切片；重新激活时恢复
+        """
+        self.memory_level = level
+        if level >= 2 and self.heatmap_view is not None:
+            self.heatmap_view.release_slices()
+        self._load_data()
+    
+    def changeEvent(self, event):
+        """激活时更新窗口的最近使用顺序，之前被降级的恢复完整显示"""
+        if event.type() == QEvent.ActivationChange and self.isActiveWindow():
+            self.window_manager.touch_window(self)
+            if self.memory_level:
+                self.memory_level = 0
+                self._load_data()
+        super().changeEvent(event)
+    
     def keyPressEvent(self, event: QKeyEvent):
         """按键事件"""
         if event.key() == Qt.Key_Escape:
@@ -227,6 +423,11 @@ class PlotWindow(QMainWindow):
     
     def closeEvent(self, event):
         """关闭事件"""
+        self.spectrum_panel.stop()
+        self.stats_panel.stop()
+        self._stop_nonfinite_scan()
+        if self.heatmap_view is not None:
+            self.heatmap_view.stop()
         self.closed.emit(self.index)
         self.window_manager.unregister_window(self)
         event.accept()
\ No newline at end of file
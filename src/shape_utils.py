@@ -0,0 +1,86 @@
+# 形状推断（根据文件大小、数据类型、拼接轴和其他文件的形状给出候选形状）
+import re
+from functools import lru_cache
+import numpy as np
+
+@lru_cache(maxsize=4096)
+def prime_factors(n):
+    """质因数分解，返回((质数, 次数), ...)（结果缓存，同一元素数只分解一次）"""
+    factors = []
+    d = 2
+    while d * d <= n:
+        if n % d == 0:
+            count = 0
+            while n % d == 0:
+                n //= d
+                count += 1
+            factors.append((d, count))
+        d += 1 if d == 2 else 2
+    if n > 1:
+        factors.append((n, 1))
+    return tuple(factors)
+
+@lru_cache(maxsize=4096)
+def divisors(n):
+    """n的全部因数（升序），由质因数分解组合得到"""
+    if n <= 0:
+        return ()
+    result = [1]
+    for p, count in prime_factors(n):
+        result = [d * p ** k for d in result for k in range(count + 1)]
+    return tuple(sorted(result))
+
+def parse_shape(text):
+    """模糊解析形状（提取文本中的所有数字），返回(shape, message)"""
+    if not text.strip():
+        return None, "Empty input"
+        
+    # 提取数字
+    numbers = re.findall(r'\d+', text)
+    if not numbers:
+        return None, "No numbers found"
+        
+    try:
+        shape = tuple(map(int, numbers))
+        return shape, f"Parsed: {shape}"
+    except ValueError:
+        return None, "Invalid numbers"
+
+def format_shape(shape):
+    return ','.join(map(str, shape))
+
+def candidate_shapes(file_size, dtype, axis=0, sibling_shapes=(), limit=8):
+    """
+    根据文件大小推断候选形状（按可能性排序）：
+    1. 其他文件的形状在拼接轴上换成能整除的长度（拼接时其余维度必须相同）
+    2. 其他文件的形状在任一维上换成能整除的长度
+    3. 一维形状，以及因数接近平方根的二维形状
+    :return: 形状元组列表
+    """
+    itemsize = np.dtype(dtype).itemsize
+    if file_size <= 0 or file_size % itemsize:
+        return []
+    n = file_size // itemsize
+
+    candidates = []
+    def add(shape):
+        shape = tuple(int(d) for d in shape)
+        if shape not in candidates and int(np.prod(shape)) == n:
+            candidates.append(shape)
+
+    siblings = list(dict.fromkeys(tuple(s) for s in sibling_shapes if s))
+    for dims in ([axis], None):
+        for shape in siblings:
+            for i in (dims if dims is not None else range(len(shape))):
+                if i >= len(shape):
+                    continue
+                rest = int(np.prod(shape[:i] + shape[i + 1:]))
+                if rest > 0 and n % rest == 0:
+                    add(shape[:i] + (n // rest,) + shape[i + 1:])
+
+    add((n,))
+    root = np.sqrt(n)
+    near_root = sorted(divisors(n)[1:-1], key=lambda d: abs(np.log(d / root)))
+    for d in near_root[:4]:
+        add((d, n // d))
+    return candidates[:limit]
@@ -0,0 +1,272 @@
+# 相似度矩阵窗口（N个文件两两相似度，单次流式Gram计算）
+import os
+import numpy as np
+from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
+                             QLabel, QComboBox, QFrame, QCheckBox)
+from PyQt5.QtCore import Qt, QThread, pyqtSignal
+from PyQt5.QtGui import QFont, QKeyEvent
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+from .config import Config
+from .style_manager import StyleManager
+from .window_manager import WindowManager
+from .language_manager import get_text
+from .stream_metrics import stream_gram_matrix, StreamCancelled
+
+# 保持运行中线程的引用，直到线程真正结束
+_running_workers = set()
+
+def cluster_order(distance):
+    """
+    平均链接层次聚类，返回叶子顺序（相似的文件排在一起）
+    :param distance: N×N对称距离矩阵
+    """
+    n = len(distance)
+    if n <= 2:
+        return list(range(n))
+
+    dist = np.array(distance, dtype=np.float64)
+    np.fill_diagonal(dist, np.inf)
+    clusters = {i: [i] for i in range(n)}
+    sizes = {i: 1 for i in range(n)}
+    active = list(range(n))
+
+    while len(active) > 1:
+        sub = dist[np.ix_(active, active)]
+        a, b = np.unravel_index(np.argmin(sub), sub.shape)
+        ca, cb = active[a], active[b]
+
+        # 合并cb到ca，按簇大小加权更新平均距离
+        wa, wb = sizes[ca], sizes[cb]
+        merged = (dist[ca] * wa + dist[cb] * wb) / (wa + wb)
+        dist[ca, :] = merged
+        dist[:, ca] = merged
+        dist[ca, ca] = np.inf
+        clusters[ca] = clusters[ca] + clusters.pop(cb)
+        sizes[ca] = wa + wb
+        active.remove(cb)
+
+    return clusters[active[0]]
+
+class GramWorker(QThread):
+    """后台流式计算Gram矩阵"""
+    progress = pyqtSignal(int)
+    result_ready = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+    def __init__(self, file_paths, dtype, parent=None):
+        super().__init__(parent)
+        self.file_paths = file_paths
+        self.dtype = dtype
+
+    def run(self):
+        try:
+            result = stream_gram_matrix(
+                self.file_paths, self.dtype,
+                progress_callback=self.progress.emit,
+                cancel_check=self.isInterruptionRequested
+            )
+        except StreamCancelled:
+            return
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+        self.result_ready.emit(result)
+
+class SimilarityMatrixWindow(QMainWindow):
+    """N个文件的两两相似度热力图（可按层次聚类重排）"""
+    def __init__(self, file_paths, dtype="float32", parent=None, screen_dpi=None):
+        super().__init__(parent)
+        self.file_paths = list(file_paths)
+        self.dtype = dtype
+        self.screen_dpi = screen_dpi or QApplication.desktop().logicalDpiX()
+        self.worker = None
+        self.result = None
+        self.order = list(range(len(self.file_paths)))
+        self.matrix = None
+        self.heatmap_ax = None
+
+        self.window_manager = WindowManager()
+        self.window_manager.register_window(self)
+
+        self.setWindowTitle(get_text('similarity_matrix_title').format(len(self.file_paths)))
+        self.resize(
+            Config.get_scaled_value(800, self.screen_dpi),
+            Config.get_scaled_value(750, self.screen_dpi)
+        )
+        self.setStyleSheet(StyleManager.generate_plot_style(self.screen_dpi))
+        icon = Config.load_icon()
+        if icon:
+            self.setWindowIcon(icon)
+
+        central_widget = QWidget()
+        self.setCentralWidget(central_widget)
+        self.main_layout = QVBoxLayout(central_widget)
+        self.main_layout.setContentsMargins(0, 0, 0, 0)
+        self.main_layout.setSpacing(0)
+
+        self._init_control_bar()
+        self._init_plot_area()
+        self.start_compute()
+
+    def _init_control_bar(self):
+        control_bar = QFrame()
+        control_bar.setObjectName("ControlBar")
+        layout = QHBoxLayout(control_bar)
+        margin = Config.get_scaled_value(5, self.screen_dpi)
+        layout.setContentsMargins(margin, 3, margin, 3)
+        layout.setSpacing(Config.get_scaled_value(8, self.screen_dpi))
+        font_size = Config.get_scaled_font_size(10, self.screen_dpi)
+
+        dtype_label = QLabel(get_text('data_type_label'))
+        dtype_label.setFont(QFont(dtype_label.font().family(), font_size))
+        layout.addWidget(dtype_label)
+
+        self.dtype_combo = QComboBox()
+        self.dtype_combo.addItems(["int8", "int16", "float32"])
+        self.dtype_combo.setCurrentText(self.dtype)
+        self.dtype_combo.currentTextChanged.connect(self._on_dtype_changed)
+        layout.addWidget(self.dtype_combo)
+
+        metric_label = QLabel(get_text('metric'))
+        metric_label.setFont(QFont(metric_label.font().family(), font_size))
+        layout.addWidget(metric_label)
+
+        self.metric_combo = QComboBox()
+        self.metric_combo.addItems(["Cos", "MSE"])
+        self.metric_combo.currentTextChanged.connect(lambda _: self.plot_matrix())
+        layout.addWidget(self.metric_combo)
+
+        self.cluster_check = QCheckBox(get_text('cluster_order'))
+        self.cluster_check.setChecked(True)
+        self.cluster_check.toggled.connect(lambda _: self.plot_matrix())
+        layout.addWidget(self.cluster_check)
+
+        self.status_label = QLabel("")
+        self.status_label.setFont(QFont(self.status_label.font().family(), font_size))
+        layout.addWidget(self.status_label)
+
+        layout.addStretch(1)
+        self.main_layout.addWidget(control_bar)
+
+    def _init_plot_area(self):
+        self.figure = Figure(
+            figsize=(Config.get_scaled_value(7, self.screen_dpi) / 100, Config.get_scaled_value(6, self.screen_dpi) / 100),
+            dpi=self.screen_dpi,
+            facecolor='white'
+        )
+        self.canvas = FigureCanvas(self.figure)
+        self.canvas.mpl_connect('motion_notify_event', self._on_mouse_move)
+        self.main_layout.addWidget(self.canvas, 1)
+
+    # ---------------------- 计算 ----------------------
+    def start_compute(self):
+        self.stop_compute()
+        self.status_label.setText(get_text('comparing').format(0))
+        worker = GramWorker(self.file_paths, self.dtype)
+        worker.progress.connect(lambda p: self.status_label.setText(get_text('comparing').format(p)))
+        worker.result_ready.connect(self._on_result)
+        worker.failed.connect(self._on_failed)
+        worker.finished.connect(lambda: _running_workers.discard(worker))
+        _running_workers.add(worker)
+        self.worker = worker
+        worker.start()
+
+    def stop_compute(self):
+        if self.worker is not None:
+            self.worker.requestInterruption()
+            self.worker.progress.disconnect()
+            self.worker.result_ready.disconnect()
+            self.worker.failed.disconnect()
+            self.worker = None
+
+    def _on_failed(self, message):
+        self.worker = None
+        self.status_label.setText(get_text('calc_error').format(message))
+
+    def _on_result(self, result):
+        self.worker = None
+        self.result = result
+        status = get_text('compared_length').format(result["length"])
+        if result["skipped"]:
+            status += get_text('nonfinite_skipped').format(result["skipped"])
+        self.status_label.setText(status)
+        self.plot_matrix()
+
+    # ---------------------- 绘制 ----------------------
+    def plot_matrix(self):
+        if self.result is None:
+            return
+
+        use_cos = self.metric_combo.currentText() == "Cos"
+        matrix = self.result["cosine"] if use_cos else self.result["mse"]
+
+        # 聚类距离统一用 1 - cos，不随显示指标变化
+        if self.cluster_check.isChecked():
+            self.order = cluster_order(1.0 - self.result["cosine"])
+        else:
+            self.order = list(range(len(self.file_paths)))
+        self.matrix = matrix[np.ix_(self.order, self.order)]
+
+        self.figure.clear()
+        ax = self.figure.add_subplot(111)
+        self.heatmap_ax = ax
+        image = ax.imshow(self.matrix, cmap='viridis' if use_cos else 'magma_r', interpolation='nearest')
+        self.figure.colorbar(image, ax=ax, fraction=0.046, pad=0.04)
+
+        n = len(self.order)
+        tick_size = Config.get_scaled_font_size(7, self.screen_dpi)
+        if n <= 40:
+            labels = [f"{i + 1}" for i in self.order]
+            ax.set_xticks(range(n))
+            ax.set_yticks(range(n))
+            ax.set_xticklabels(labels, fontsize=tick_size)
+            ax.set_yticklabels(
+                [f"{i + 1}. {os.path.basename(self.file_paths[i])}" for i in self.order],
+                fontsize=tick_size
+            )
+        if n <= 12:
+            for r in range(n):
+                for c in range(n):
+                    value = self.matrix[r, c]
+                    ax.text(c, r, f"{value:.3f}" if use_cos else f"{value:.1e}",
+                            ha='center', va='center', fontsize=tick_size, color='white')
+
+        ax.set_title(
+            get_text('similarity_matrix_plot_title').format(self.metric_combo.currentText(), n),
+            fontsize=Config.get_scaled_font_size(10, self.screen_dpi)
+        )
+        try:
+            self.figure.tight_layout()
+        except Exception:
+            pass
+        self.canvas.draw()
+
+    def _on_mouse_move(self, event):
+        """悬停显示对应文件对和指标值"""
+        if self.matrix is None or event.inaxes is not self.heatmap_ax or event.xdata is None:
+            return
+        col, row = int(round(event.xdata)), int(round(event.ydata))
+        n = len(self.order)
+        if not (0 <= row < n and 0 <= col < n):
+            return
+        i, j = self.order[row], self.order[col]
+        self.status_label.setText(
+            f"{os.path.basename(self.file_paths[i])} vs {os.path.basename(self.file_paths[j])}: "
+            f"{self.metric_combo.currentText()}={self.matrix[row, col]:.6g}"
+        )
+
+    # ---------------------- 事件处理 ----------------------
+    def _on_dtype_changed(self, dtype):
+        self.dtype = dtype
+        self.start_compute()
+
+    def keyPressEvent(self, event: QKeyEvent):
+        if event.key() == Qt.Key_Escape:
+            self.close()
+        super().keyPressEvent(event)
+
+    def closeEvent(self, event):
+        self.stop_compute()
+        self.window_manager.unregister_window(self)
+        event.accept()
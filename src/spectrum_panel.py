@@ -0,0 +1,153 @@
+# 频谱面板（后台线程计算Welch功率谱）
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLabel
+from PyQt5.QtCore import Qt, QThread, pyqtSignal
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+from .config import Config
+from .language_manager import get_text
+from .spectrum_utils import compute_file_spectrum, SpectrumCancelled
+from . import io_manager
+
+# 保持运行中线程的引用，直到线程真正结束（面板关闭后线程可能仍在收尾）
+_running_workers = set()
+
+class SpectrumWorker(QThread):
+    """在后台线程中计算频谱，避免阻塞GUI线程（各文件在共享I/O线程池中并行读取计算）"""
+    progress = pyqtSignal(int)
+    result_ready = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+    def __init__(self, sources, parent=None):
+        """
+        :param sources: [(file_path, dtype, label, color), ...]
+        """
+        super().__init__(parent)
+        self.sources = sources
+
+    def run(self):
+        results = []
+        percents = [0] * len(self.sources)
+
+        def on_progress(i, percent):
+            percents[i] = percent
+            self.progress.emit(int(sum(percents) / len(percents)))
+
+        futures = [
+            io_manager.submit(
+                file_path, compute_file_spectrum, file_path, dtype,
+                progress_callback=lambda percent, i=i: on_progress(i, percent),
+                cancel_check=self.isInterruptionRequested
+            )
+            for i, (file_path, dtype, _, _) in enumerate(self.sources)
+        ]
+        try:
+            for future, (_, _, label, color) in zip(futures, self.sources):
+                freqs, psd = future.result()
+                results.append((label, color, freqs, psd))
+        except SpectrumCancelled:
+            return
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+        self.result_ready.emit(results)
+
+class SpectrumPanel(QWidget):
+    """频谱显示面板：数据源变化时在后台重算，缓存命中时立即显示"""
+    def __init__(self, parent, dpi):
+        super().__init__(parent)
+        self.dpi = dpi
+        self.sources = []
+        self.worker = None
+        self._init_ui()
+
+    def _init_ui(self):
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(0)
+
+        self.status_label = QLabel("")
+        self.status_label.setAlignment(Qt.AlignCenter)
+        self.status_label.setStyleSheet(
+            f"color: #666; font-size: {Config.get_scaled_font_size(9, self.dpi)}px;"
+        )
+        layout.addWidget(self.status_label)
+
+        self.figure = Figure(
+            figsize=(Config.get_scaled_value(8, self.dpi) / 100, Config.get_scaled_value(3, self.dpi) / 100),
+            dpi=self.dpi,
+            facecolor='white'
+        )
+        self.canvas = FigureCanvas(self.figure)
+        self.ax = self.figure.add_subplot(111)
+        self.canvas.setMinimumHeight(Config.get_scaled_value(160, self.dpi))
+        layout.addWidget(self.canvas, 1)
+
+    def set_sources(self, sources):
+        """设置数据源并开始计算 [(file_path, dtype, label, color), ...]"""
+        self.sources = list(sources)
+        self.refresh()
+
+    def refresh(self):
+        """重新计算频谱（取消尚未完成的计算）"""
+        self.stop()
+        if not self.sources:
+            return
+
+        self.status_label.setText(get_text('spectrum_computing').format(0))
+        worker = SpectrumWorker(self.sources)
+        worker.progress.connect(self._on_progress)
+        worker.result_ready.connect(self._on_result)
+        worker.failed.connect(self._on_failed)
+        worker.finished.connect(lambda: _running_workers.discard(worker))
+        _running_workers.add(worker)
+        self.worker = worker
+        worker.start()
+
+    def stop(self):
+        """取消当前计算；旧线程的结果会被忽略"""
+        if self.worker is not None:
+            self.worker.requestInterruption()
+            self.worker.progress.disconnect()
+            self.worker.result_ready.disconnect()
+            self.worker.failed.disconnect()
+            self.worker = None
+
+    def _on_progress(self, percent):
+        self.status_label.setText(get_text('spectrum_computing').format(percent))
+
+    def _on_failed(self, message):
+        self.worker = None
+        self.status_label.setText(get_text('spectrum_failed').format(message))
+
+    def _on_result(self, results):
+        self.worker = None
+        self.status_label.setText("")
+        self.ax.clear()
+        for label, color, freqs, psd in results:
+            # 直流分量单独由均值反映，对数坐标下跳过
+            self.ax.semilogy(
+                freqs[1:], psd[1:],
+                color=color,
+                linewidth=Config.get_scaled_value(1.0, self.dpi),
+                alpha=0.8,
+                label=label
+            )
+        self.ax.set_title(
+            get_text('spectrum_title').format(Config.SPECTRUM_SEGMENT_LENGTH),
+            fontsize=Config.get_scaled_font_size(10, self.dpi)
+        )
+        self.ax.set_xlabel(get_text('frequency'), fontsize=Config.get_scaled_font_size(9, self.dpi))
+        self.ax.set_ylabel(get_text('power'), fontsize=Config.get_scaled_font_size(9, self.dpi))
+        self.ax.tick_params(axis='both', labelsize=Config.get_scaled_font_size(8, self.dpi))
+        self.ax.grid(True, alpha=0.2, which='both')
+        if len(results) > 1:
+            self.ax.legend(fontsize=Config.get_scaled_font_size(8, self.dpi))
+        try:
+            self.figure.tight_layout()
+        except Exception:
+            pass
+        self.canvas.draw()
+
+    def closeEvent(self, event):
+        self.stop()
+        super().closeEvent(event)
@@ -0,0 +1,83 @@
+# 频谱分析工具（分块Welch功率谱）
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from .bin_utils import handle_invalid_values
+from .config import Config
+from . import cache_manager
+
+class SpectrumCancelled(Exception):
+    """频谱计算被中途取消"""
+    pass
+
+def welch_power_spectrum(data, nperseg=1024, chunk_size=None, progress_callback=None, cancel_check=None):
+    """
+    分块计算一维数据的Welch平均功率谱（Hann窗、50%重叠、去均值）
+    :param data: 一维数组或memmap，按块读取，不会整体载入内存
+    :param nperseg: 每段长度
+    :param chunk_size: 每块处理的元素数
+    :param progress_callback: 进度回调，参数为0~100的整数
+    :param cancel_check: 返回True时中止计算
+    :return: (freqs, psd)，频率为归一化频率（周期/采样点）
+    """
+    length = len(data)
+    if length < 2:
+        raise ValueError("数据长度不足，无法计算频谱")
+
+    nperseg = int(min(nperseg, length))
+    step = max(1, nperseg // 2)
+    n_segments = (length - nperseg) // step + 1
+
+    window = np.hanning(nperseg + 2)[1:-1]  # 去掉两端的0，避免窗口整体为0
+    scale = 1.0 / np.sum(window ** 2)
+
+    # 每块处理的段数（按块元素数折算）
+    chunk_size = chunk_size or Config.STREAM_CHUNK_ELEMENTS
+    segments_per_chunk = max(1, chunk_size // step)
+
+    psd_sum = np.zeros(nperseg // 2 + 1, dtype=np.float64)
+    for seg_start in range(0, n_segments, segments_per_chunk):
+        if cancel_check and cancel_check():
+            raise SpectrumCancelled()
+
+        seg_stop = min(seg_start + segments_per_chunk, n_segments)
+        begin = seg_start * step
+        end = (seg_stop - 1) * step + nperseg
+        chunk = np.array(data[begin:end], dtype=np.float64)
+        chunk = handle_invalid_values(chunk, copy=False)
+
+        # 用滑动窗口视图切段（零拷贝），再统一做FFT
+        segments = sliding_window_view(chunk, nperseg)[::step]
+        segments = segments - segments.mean(axis=1, keepdims=True)
+        spectrum = np.fft.rfft(segments * window, axis=1)
+        psd_sum += np.sum(spectrum.real ** 2 + spectrum.imag ** 2, axis=0)
+
+        if progress_callback:
+            progress_callback(int(seg_stop * 100 / n_segments))
+
+    psd = psd_sum * scale / n_segments
+    # 单边谱：除直流和奈奎斯特频点外能量翻倍
+    if nperseg % 2 == 0:
+        psd[1:-1] *= 2
+    else:
+        psd[1:] *= 2
+    freqs = np.fft.rfftfreq(nperseg)
+    return freqs, psd
+
+def compute_file_spectrum(file_path, dtype, nperseg=None, progress_callback=None, cancel_check=None):
+    """计算（或从共享缓存读取）bin文件的Welch功率谱，按文件、数据类型和分段长度缓存"""
+    nperseg = nperseg or Config.SPECTRUM_SEGMENT_LENGTH
+    result = cache_manager.get_cache().get_or_compute(
+        cache_manager.file_key('spectrum', file_path, dtype, int(nperseg)),
+        lambda: welch_power_spectrum(
+            cache_manager.open_memmap(file_path, dtype), nperseg=nperseg,
+            progress_callback=progress_callback, cancel_check=cancel_check
+        ),
+        cancel_check=cancel_check, cancel_error=SpectrumCancelled,
+    )
+    if progress_callback:
+        progress_callback(100)
+    return result
+
+def clear_spectrum_cache():
+    """清空频谱缓存"""
+    cache_manager.get_cache().clear('spectrum')
@@ -0,0 +1,150 @@
+# 汇总统计面板（后台线程单遍计算，结果按文件和数据类型缓存，各窗口共享）
+from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QLabel, QTableWidget, QTableWidgetItem,
+                             QHeaderView, QAbstractItemView)
+from PyQt5.QtCore import Qt, QThread, pyqtSignal
+from .config import Config
+from .language_manager import get_text
+from .stats_utils import compute_file_summary
+from .stream_metrics import StreamCancelled
+from . import io_manager
+
+# 保持运行中线程的引用，直到线程真正结束
+_running_workers = set()
+
+# 表格行：(统计项, 是否为整数)
+STATS_ROWS = [
+    ('min', False), ('max', False), ('mean', False), ('std', False), ('l2_norm', False),
+    ('zero_count', True), ('nan_count', True), ('inf_count', True), ('argmin', True), ('argmax', True),
+]
+
+def format_stat(value):
+    if value == 0 or 1e-3 <= abs(value) < 1e6:
+        return f"{value:.6g}"
+    return f"{value:.4e}"
+
+class StatsWorker(QThread):
+    """
+    在后台线程中计算各文件的汇总统计（各文件在共享I/O线程池中并行扫描），
+    结果为 [(label, SummaryAccumulator), ...]
+    """
+    progress = pyqtSignal(int)
+    result_ready = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+    def __init__(self, sources, parent=None):
+        """
+        :param sources: [(file_path, dtype, label), ...]
+        """
+        super().__init__(parent)
+        self.sources = sources
+
+    def run(self):
+        percents = [0] * len(self.sources)
+
+        def on_progress(i, percent):
+            percents[i] = percent
+            self.progress.emit(int(sum(percents) / len(percents)))
+
+        futures = [
+            io_manager.submit(
+                file_path, compute_file_summary, file_path, dtype,
+                progress_callback=lambda percent, i=i: on_progress(i, percent),
+                cancel_check=self.isInterruptionRequested
+            )
+            for i, (file_path, dtype, _) in enumerate(self.sources)
+        ]
+        try:
+            results = [(label, future.result()) for future, (_, _, label) in zip(futures, self.sources)]
+        except StreamCancelled:
+            return
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+        self.result_ready.emit(results)
+
+class StatsPanel(QWidget):
+    """汇总统计表：每列一个文件，缓存命中时立即显示"""
+    def __init__(self, parent, dpi):
+        super().__init__(parent)
+        self.dpi = dpi
+        self.sources = []
+        self.worker = None
+        self._init_ui()
+
+    def _init_ui(self):
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(0)
+
+        self.status_label = QLabel("")
+        self.status_label.setAlignment(Qt.AlignCenter)
+        self.status_label.setStyleSheet(
+            f"color: #666; font-size: {Config.get_scaled_font_size(9, self.dpi)}px;"
+        )
+        layout.addWidget(self.status_label)
+
+        self.table = QTableWidget(len(STATS_ROWS), 0)
+        self.table.setVerticalHeaderLabels([get_text(f'stat_{key}') for key, _ in STATS_ROWS])
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.table.setMinimumHeight(Config.get_scaled_value(160, self.dpi))
+        layout.addWidget(self.table, 1)
+
+    def set_sources(self, sources):
+        """设置数据源并开始计算 [(file_path, dtype, label), ...]"""
+        self.sources = list(sources)
+        self.refresh()
+
+    def refresh(self):
+        """重新计算统计（取消尚未完成的计算）"""
+        self.stop()
+        if not self.sources:
+            return
+
+        self.status_label.setText(get_text('stats_computing').format(0))
+        worker = StatsWorker(self.sources)
+        worker.progress.connect(self._on_progress)
+        worker.result_ready.connect(self._on_result)
+        worker.failed.connect(self._on_failed)
+        worker.finished.connect(lambda: _running_workers.discard(worker))
+        _running_workers.add(worker)
+        self.worker = worker
+        worker.start()
+
+    def stop(self):
+        """取消当前计算；旧线程的结果会被忽略"""
+        if self.worker is not None:
+            self.worker.requestInterruption()
+            self.worker.progress.disconnect()
+            self.worker.result_ready.disconnect()
+            self.worker.failed.disconnect()
+            self.worker = None
+
+    def _on_progress(self, percent):
+        self.status_label.setText(get_text('stats_computing').format(percent))
+
+    def _on_failed(self, message):
+        self.worker = None
+        self.status_label.setText(get_text('stats_failed').format(message))
+
+    def _on_result(self, results):
+        self.worker = None
+        results = [(label, acc.result()) for label, acc in results]
+        self.status_label.setText(get_text('stats_length').format(
+            ", ".join(f"{stats['length']}" for _, stats in results)
+        ))
+        self.table.setColumnCount(len(results))
+        self.table.setHorizontalHeaderLabels([label for label, _ in results])
+        for col, (_, stats) in enumerate(results):
+            for row, (key, is_int) in enumerate(STATS_ROWS):
+                value = stats[key]
+                item = QTableWidgetItem(str(int(value)) if is_int else format_stat(value))
+                item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                # 存在NaN/Inf时突出显示
+                if key in ('nan_count', 'inf_count') and value:
+                    item.setForeground(Qt.red)
+                self.table.setItem(row, col, item)
+
+    def closeEvent(self, event):
+        self.stop()
+        super().closeEvent(event)
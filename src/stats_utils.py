@@ -0,0 +1,202 @@
+# 汇总统计（单遍分块计算min/max/均值/标准差/L2范数/零值与NaN/Inf计数及其位置索引，按文件和数据类型缓存）
+import numpy as np
+from .bin_utils import iter_chunk_ranges
+from .config import Config
+from .stream_metrics import StreamCancelled
+from . import cache_manager, io_manager
+
+class NonFiniteIndex:
+    """
+    非有限值（NaN/±Inf）位置的稀疏索引：游程编码为有序的 [start, stop) 区间，
+    分块扫描时逐块追加（跨块相连的区间自动合并）；区间数超过 Config.NONFINITE_MAX_RUNS 时不再记录
+    """
+    def __init__(self):
+        self._starts = []
+        self._stops = []
+        self._runs = None
+        self.run_count = 0
+        self.truncated = False
+
+    def add_chunk(self, nonfinite, offset):
+        """追加一块的非有限值掩码（布尔数组），offset为该块第一个元素的下标"""
+        if self.truncated:
+            return
+        edges = np.diff(nonfinite.astype(np.int8), prepend=0, append=0)
+        starts = np.flatnonzero(edges == 1) + offset
+        stops = np.flatnonzero(edges == -1) + offset
+        if starts.size == 0:
+            return
+        # 与上一块末尾的区间相连时合并
+        if self._stops and self._stops[-1][-1] == starts[0]:
+            self._stops[-1][-1] = stops[0]
+            starts, stops = starts[1:], stops[1:]
+            self._runs = None
+        if self.run_count + starts.size > Config.NONFINITE_MAX_RUNS:
+            keep = Config.NONFINITE_MAX_RUNS - self.run_count
+            starts, stops = starts[:keep], stops[:keep]
+            self.truncated = True
+        if starts.size:
+            self._starts.append(starts)
+            self._stops.append(stops)
+            self.run_count += starts.size
+            self._runs = None
+
+    @property
+    def runs(self):
+        """(n, 2) 的 [start, stop) 区间数组"""
+        if self._runs is None:
+            if self._starts:
+                self._runs = np.stack([np.concatenate(self._starts), np.concatenate(self._stops)], axis=1)
+            else:
+                self._runs = np.empty((0, 2), dtype=np.int64)
+        return self._runs
+
+    def __len__(self):
+        return self.run_count
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in self._starts) + sum(a.nbytes for a in self._stops)
+
+    def marker_positions(self, limit=None):
+        """用于在图上标记的区间起点（区间过多时均匀抽取limit个）"""
+        starts = self.runs[:, 0]
+        limit = limit or Config.NONFINITE_MAX_MARKERS
+        if len(starts) > limit:
+            starts = starts[np.linspace(0, len(starts) - 1, limit).astype(np.int64)]
+        return starts
+
+class SummaryAccumulator:
+    """
+    按块累加一个序列的汇总统计。每块内用numpy向量化（求和为成对求和），
+    块之间按Chan/Welford并行公式合并均值和二阶中心矩，避免大数据上 sum(x²) - n·mean² 的抵消误差。
+    NaN/Inf单独计数，不参与min/max和矩的计算
+    """
+    def __init__(self):
+        self.length = 0
+        self.count = 0          # 有限值个数
+        self.mean = 0.0
+        self.m2 = 0.0           # 二阶中心矩之和
+        self.sum_sq = 0.0
+        self.min = None
+        self.max = None
+        self.argmin = -1
+        self.argmax = -1
+        self.zero_count = 0
+        self.nan_count = 0
+        self.inf_count = 0
+        self.nonfinite = NonFiniteIndex()
+
+    def update(self, chunk, offset):
+        """累加一块数据，offset为该块第一个元素在整个序列中的下标"""
+        chunk = np.asarray(chunk)
+        if chunk.size == 0:
+            return
+        self.length += chunk.size
+        self.zero_count += int(np.count_nonzero(chunk == 0))
+
+        if chunk.dtype.kind == 'f':
+            finite = np.isfinite(chunk)
+            n_finite = int(np.count_nonzero(finite))
+            if n_finite != chunk.size:
+                nan_count = int(np.count_nonzero(np.isnan(chunk)))
+                self.nan_count += nan_count
+                self.inf_count += chunk.size - n_finite - nan_count
+                self.nonfinite.add_chunk(~finite, offset)
+                # 非有限值在求最值时替换为不会被选中的值，保持下标与原数据一致
+                for_min = np.where(finite, chunk, np.inf)
+                for_max = np.where(finite, chunk, -np.inf)
+                values = chunk[finite]
+            else:
+                for_min = for_max = values = chunk
+        else:
+            for_min = for_max = values = chunk
+        if values.size == 0:
+            return
+
+        i_min, i_max = int(np.argmin(for_min)), int(np.argmax(for_max))
+        if self.min is None or for_min[i_min] < self.min:
+            self.min, self.argmin = float(for_min[i_min]), offset + i_min
+        if self.max is None or for_max[i_max] > self.max:
+            self.max, self.argmax = float(for_max[i_max]), offset + i_max
+
+        values = values.astype(np.float64)
+        n = values.size
+        chunk_mean = float(values.mean())
+        centered = values - chunk_mean
+        chunk_m2 = float(np.dot(centered, centered))
+        self.sum_sq += float(np.dot(values, values))
+
+        total = self.count + n
+        delta = chunk_mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += chunk_m2 + delta * delta * self.count * n / total
+        self.count = total
+
+    @property
+    def nbytes(self):
+        """缓存占用（主要是NaN/Inf位置索引）"""
+        return self.nonfinite.nbytes
+
+    def std(self):
+        """总体标准差（只统计有限值）"""
+        return float(np.sqrt(self.m2 / self.count)) if self.count else 0.0
+
+    def result(self):
+        """汇总为统计字典"""
+        return {
+            "length": self.length,
+            "min": self.min if self.min is not None else 0.0,
+            "max": self.max if self.max is not None else 0.0,
+            "mean": self.mean,
+            "std": self.std(),
+            "l2_norm": float(np.sqrt(self.sum_sq)),
+            "zero_count": self.zero_count,
+            "nan_count": self.nan_count,
+            "inf_count": self.inf_count,
+            "argmin": self.argmin,
+            "argmax": self.argmax,
+        }
+
+def stream_summary(data, chunk_size=None, progress_callback=None, cancel_check=None):
+    """
+    单遍分块计算一维数据的汇总统计，返回SummaryAccumulator
+    data可以是ndarray、memmap或任何支持len()和[start:stop]切片的对象
+    """
+    length = len(data)
+    chunk_size = chunk_size or Config.STREAM_CHUNK_ELEMENTS
+    acc = SummaryAccumulator()
+
+    def read_chunk(bounds):
+        start, stop = bounds
+        return np.asarray(data[start:stop])
+
+    # 统计当前块时，后面的块已在共享I/O线程池中预读
+    ranges = list(iter_chunk_ranges(length, chunk_size))
+    chunks = io_manager.read_ahead(read_chunk, ranges, io_manager.storage_type_of(data))
+    for (start, stop), chunk in zip(ranges, chunks):
+        if cancel_check and cancel_check():
+            raise StreamCancelled()
+        acc.update(chunk, start)
+        if progress_callback:
+            progress_callback(int(stop * 100 / length))
+    return acc
+
+def compute_file_summary(file_path, dtype, progress_callback=None, cancel_check=None):
+    """
+    计算（或从共享缓存读取）bin文件的汇总统计，按文件和数据类型缓存；
+    另一线程正在扫描同一文件时等待其结果，同一文件在各窗口中只扫描一遍
+    """
+    result = cache_manager.get_cache().get_or_compute(
+        cache_manager.file_key('summary', file_path, dtype),
+        lambda: stream_summary(cache_manager.open_memmap(file_path, dtype),
+                               progress_callback=progress_callback, cancel_check=cancel_check),
+        cancel_check=cancel_check, cancel_error=StreamCancelled,
+    )
+    if progress_callback:
+        progress_callback(100)
+    return result
+
+def clear_summary_cache():
+    """清空统计缓存"""
+    cache_manager.get_cache().clear('summary')
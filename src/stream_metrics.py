@@ -0,0 +1,327 @@
+# 流式对比指标（按块累加，不整体载入内存）
+import os
+import numpy as np
+from .bin_utils import read_bin_range, handle_invalid_values, iter_chunk_ranges
+from .config import Config
+from . import io_manager
+
+class StreamCancelled(Exception):
+    """流式计算被中途取消"""
+    pass
+
+class MetricAccumulator:
+    """
+    按块累加两个序列的对比指标（余弦相似度、MSE、MAE、最大绝对误差）
+    同时保留一阶和二阶累加量，可在不重读数据的情况下拟合 data1 ≈ scale * data2 + bias。
+    拟合相关的量按残差 r = data1 - data2 累加（Σr、Σr·b、Σr²），几乎相同的两组数据上
+    各项与差异同一量级，不会因大数相减而抵消。
+    任一方为NaN/Inf的位置在每块内用掩码跳过（不参与指标，计入skipped）
+    """
+    def __init__(self):
+        self.count = 0
+        self.sum1 = 0.0
+        self.sum2 = 0.0
+        self.dot = 0.0
+        self.sq1 = 0.0
+        self.sq2 = 0.0
+        self.sum_err = 0.0      # Σr
+        self.err_dot2 = 0.0     # Σr·data2
+        self.sq_err = 0.0       # Σr²
+        self.abs_err = 0.0
+        self.max_abs_err = 0.0
+        self.skipped = 0
+
+    def update(self, chunk1, chunk2):
+        """累加一块数据，两块长度必须一致"""
+        chunk1 = np.asarray(chunk1, dtype=np.float64)
+        chunk2 = np.asarray(chunk2, dtype=np.float64)
+        if chunk1.size != chunk2.size:
+            raise ValueError(f"数组长度不一致: {chunk1.size} vs {chunk2.size}")
+        valid = np.isfinite(chunk1) & np.isfinite(chunk2)
+        n_valid = int(np.count_nonzero(valid))
+        if n_valid != chunk1.size:
+            self.skipped += chunk1.size - n_valid
+            chunk1, chunk2 = chunk1[valid], chunk2[valid]
+        if chunk1.size == 0:
+            return
+
+        diff = chunk1 - chunk2
+        abs_diff = np.abs(diff)
+        self.count += chunk1.size
+        self.sum1 += float(chunk1.sum())
+        self.sum2 += float(chunk2.sum())
+        self.dot += float(np.dot(chunk1, chunk2))
+        self.sq1 += float(np.dot(chunk1, chunk1))
+        self.sq2 += float(np.dot(chunk2, chunk2))
+        self.sum_err += float(diff.sum())
+        self.err_dot2 += float(np.dot(diff, chunk2))
+        self.sq_err += float(np.dot(diff, diff))
+        self.abs_err += float(abs_diff.sum())
+        self.max_abs_err = max(self.max_abs_err, float(abs_diff.max()))
+
+    def cosine_similarity(self):
+        # 与bin_utils.cosine_similarity保持一致：任一方全零时返回0
+        if self.sq1 == 0 or self.sq2 == 0:
+            return 0.0
+        return self.dot / (np.sqrt(self.sq1) * np.sqrt(self.sq2) + 1e-10)
+
+    def mse(self):
+        return self.sq_err / self.count if self.count else 0.0
+
+    def mae(self):
+        return self.abs_err / self.count if self.count else 0.0
+
+    def fit_scale(self, with_bias=False):
+        """
+        最小二乘拟合 data1 ≈ scale * data2 (+ bias)，返回(scale, bias)
+        不带偏置时 scale = <a,b>/<b,b> = 1 + <r,b>/<b,b>；带偏置时 scale = 1 + cov(r,b)/var(b)
+        """
+        if self.count == 0:
+            return 0.0, 0.0
+        if not with_bias:
+            return (1.0 + self.err_dot2 / self.sq2 if self.sq2 else 0.0), 0.0
+
+        n = self.count
+        var2 = self.sq2 - self.sum2 * self.sum2 / n
+        if var2 <= 0:
+            return 0.0, self.sum1 / n
+        delta = (self.err_dot2 - self.sum_err * self.sum2 / n) / var2
+        bias = (self.sum_err - delta * self.sum2) / n
+        return 1.0 + delta, bias
+
+    def scaled_mse(self, scale, bias=0.0):
+        """
+        由累加量直接得到 data1 与 scale * data2 + bias 的MSE（无需再读数据）。
+        残差 data1 - scale*data2 - bias = r - δ·data2 - bias（δ = scale - 1），按残差展开
+        """
+        if self.count == 0:
+            return 0.0
+        n = self.count
+        delta = scale - 1.0
+        sse = (self.sq_err - 2 * delta * self.err_dot2 - 2 * bias * self.sum_err
+               + delta * delta * self.sq2 + 2 * delta * bias * self.sum2 + n * bias * bias)
+        return max(sse, 0.0) / n
+
+    def result(self):
+        """汇总为指标字典"""
+        scale, _ = self.fit_scale()
+        return {
+            "cosine_similarity": self.cosine_similarity(),
+            "mse": self.mse(),
+            "mae": self.mae(),
+            "max_abs_error": self.max_abs_err,
+            "scale": scale,
+            "scaled_mse": self.scaled_mse(scale),
+            "compared_length": self.count,
+            "skipped_nonfinite": self.skipped,
+        }
+
+def stream_compare(data1, data2, chunk_size=None, length=None, progress_callback=None, cancel_check=None):
+    """
+    对两个序列分块累加指标，返回MetricAccumulator
+    data1/data2可以是ndarray、memmap视图或任何支持len()和[start:stop]切片的对象（如VirtualConcatTensor）
+    :param length: 只比较前length个元素；为None时要求两者等长
+    """
+    if length is None:
+        if len(data1) != len(data2):
+            raise ValueError(f"数组长度不一致: {len(data1)} vs {len(data2)}")
+        length = len(data1)
+    chunk_size = chunk_size or Config.STREAM_CHUNK_ELEMENTS
+    acc = MetricAccumulator()
+
+    def read_pair(bounds):
+        start, stop = bounds
+        return np.asarray(data1[start:stop]), np.asarray(data2[start:stop])
+
+    # 累加当前块时，后面的块已在共享I/O线程池中预读
+    ranges = list(iter_chunk_ranges(length, chunk_size))
+    chunks = io_manager.read_ahead(read_pair, ranges, io_manager.storage_type_of(data1, data2))
+    for (start, stop), (chunk1, chunk2) in zip(ranges, chunks):
+        if cancel_check and cancel_check():
+            raise StreamCancelled()
+        acc.update(chunk1, chunk2)
+        if progress_callback:
+            progress_callback(int(stop * 100 / length))
+    return acc
+
+def stream_scaled_mae(data1, data2, fits, chunk_size=None, progress_callback=None, cancel_check=None):
+    """
+    data1 与 scale * data2 + bias 的MAE（绝对值无法由累加量得到，需要再扫描一遍）；
+    fits为[(scale, bias), ...]，一遍扫描同时算出全部，返回与fits顺序对应的列表。
+    与MetricAccumulator一致，任一方为NaN/Inf的位置不参与
+    """
+    length = len(data1)
+    chunk_size = chunk_size or Config.STREAM_CHUNK_ELEMENTS
+    totals = [0.0] * len(fits)
+    counts = [0] * len(fits)
+
+    def read_pair(bounds):
+        start, stop = bounds
+        return np.asarray(data1[start:stop]), np.asarray(data2[start:stop])
+
+    ranges = list(iter_chunk_ranges(length, chunk_size))
+    chunks = io_manager.read_ahead(read_pair, ranges, io_manager.storage_type_of(data1, data2))
+    for (start, stop), (chunk1, chunk2) in zip(ranges, chunks):
+        if cancel_check and cancel_check():
+            raise StreamCancelled()
+        chunk1 = chunk1.astype(np.float64, copy=False)
+        chunk2 = chunk2.astype(np.float64, copy=False)
+        for i, (scale, bias) in enumerate(fits):
+            abs_err = np.abs(chunk1 - (scale * chunk2 + bias))
+            valid = np.isfinite(abs_err)
+            totals[i] += float(abs_err.sum(where=valid))
+            counts[i] += int(np.count_nonzero(valid))
+        if progress_callback:
+            progress_callback(int(stop * 100 / length))
+    return [total / count if count else 0.0 for total, count in zip(totals, counts)]
+
+def _decimate_chunk(chunk, start, step):
+    """从[start, start+len(chunk))块中取出全局索引为step整数倍的元素（复制为连续数组，不引用整块）"""
+    offset = (-start) % step
+    return np.ascontiguousarray(chunk[offset::step])
+
+def compare_reference_to_candidates(ref_path, candidate_paths, ref_dtype="float32", candidate_dtype="float32",
+                                    chunk_size=None, trace_points=None,
+                                    progress_callback=None, cancel_check=None):
+    """
+    一个参考文件对多个候选文件的流式对比：参考文件每块只读一次，
+    所有候选文件的对应块由共享I/O线程池并行读取并累加指标，参考文件的下一块提前预读，
+    同时收集降采样曲线。
+    :return: (results, traces)
+        results: 每个候选文件的指标字典（含file_path、original_length）
+        traces: {'step': 降采样步长, 'reference': ndarray, 'candidates': [ndarray, ...]}
+    """
+    ref_dtype = np.dtype(ref_dtype)
+    candidate_dtype = np.dtype(candidate_dtype)
+    chunk_size = chunk_size or Config.STREAM_CHUNK_ELEMENTS
+    trace_points = trace_points or Config.MAX_DOWNSAMPLE_POINTS
+
+    ref_len = os.path.getsize(ref_path) // ref_dtype.itemsize
+    cand_lens = [os.path.getsize(p) // candidate_dtype.itemsize for p in candidate_paths]
+    if ref_len == 0:
+        raise ValueError(f"文件解析后为空（可能类型不匹配）：{ref_path}（指定类型：{ref_dtype}）")
+
+    max_len = max([ref_len] + cand_lens)
+    step = max(1, (max_len + trace_points - 1) // trace_points)
+
+    accumulators = [MetricAccumulator() for _ in candidate_paths]
+    ref_trace = []
+    cand_traces = [[] for _ in candidate_paths]
+
+    def process_candidate(i, start, stop, ref_chunk):
+        """读取第i个候选文件的[start, stop)，在重叠部分累加指标（在线程池中执行）"""
+        cand_stop = min(stop, cand_lens[i])
+        if cand_stop <= start:
+            return None
+        chunk = read_bin_range(candidate_paths[i], candidate_dtype, start, cand_stop - start)
+        overlap = min(len(chunk), len(ref_chunk))
+        accumulators[i].update(ref_chunk[:overlap], chunk[:overlap])
+        # 只有显示用的降采样曲线需要替换非法值
+        return handle_invalid_values(_decimate_chunk(chunk, start, step), copy=False)
+
+    def read_ref(bounds):
+        start, stop = bounds
+        ref_stop = min(stop, ref_len)
+        if ref_stop <= start:
+            return None
+        return read_bin_range(ref_path, ref_dtype, start, ref_stop - start)
+
+    ranges = list(iter_chunk_ranges(max_len, chunk_size))
+    ref_chunks = io_manager.read_ahead(read_ref, ranges, io_manager.storage_type(ref_path))
+    for (start, stop), ref_chunk in zip(ranges, ref_chunks):
+        if cancel_check and cancel_check():
+            raise StreamCancelled()
+
+        if ref_chunk is not None:
+            ref_trace.append(handle_invalid_values(_decimate_chunk(ref_chunk, start, step), copy=False))
+            # 只转换一次float64，所有候选文件共享
+            ref_chunk = ref_chunk.astype(np.float64)
+        else:
+            ref_chunk = np.empty(0, dtype=np.float64)
+
+        futures = [
+            io_manager.submit(path, process_candidate, i, start, stop, ref_chunk)
+            for i, path in enumerate(candidate_paths)
+        ]
+        for i, future in enumerate(futures):
+            decimated = future.result()
+            if decimated is not None:
+                cand_traces[i].append(decimated)
+
+        if progress_callback:
+            progress_callback(int(stop * 100 / max_len))
+
+    results = []
+    for path, length, acc in zip(candidate_paths, cand_lens, accumulators):
+        result = acc.result()
+        result["file_path"] = path
+        result["original_length"] = length
+        results.append(result)
+
+    traces = {
+        "step": step,
+        "reference": np.concatenate(ref_trace) if ref_trace else np.empty(0),
+        "candidates": [np.concatenate(t) if t else np.empty(0) for t in cand_traces],
+    }
+    return results, traces
+
+def stream_gram_matrix(file_paths, dtype="float32", chunk_size=None,
+                       progress_callback=None, cancel_check=None):
+    """
+    N个文件的流式Gram矩阵：每块并行读取所有文件组成(N, chunk)矩阵，累加点积。
+    所有文件只读一遍，按公共长度（最短文件）对齐；任一文件为NaN/Inf的位置整列跳过。
+    为避免几乎相同的文件在 sq_i + sq_j - 2·gram 中相消，累加的是各行减去第一个文件后的
+    D = X - X[0] 的Gram矩阵（及 D·X[0]、X[0]·X[0]），再还原出原始点积。
+    :return: {'gram': N×N点积矩阵, 'cosine': 余弦相似度矩阵, 'mse': 两两MSE矩阵,
+              'length': 公共长度, 'skipped': 跳过的位置数}
+    """
+    dtype = np.dtype(dtype)
+    n_files = len(file_paths)
+    lengths = [os.path.getsize(p) // dtype.itemsize for p in file_paths]
+    length = min(lengths)
+    if length == 0:
+        raise ValueError("存在解析后为空的文件，无法计算相似度矩阵")
+
+    # 按文件数缩小每块长度，保证一块的总内存有界
+    chunk_size = max(1, (chunk_size or Config.STREAM_CHUNK_ELEMENTS) // n_files)
+    gram_d = np.zeros((n_files, n_files), dtype=np.float64)  # D @ D.T
+    cross = np.zeros(n_files, dtype=np.float64)              # D @ X[0]
+    ref_sq = 0.0                                             # X[0] · X[0]
+    skipped = 0
+    block = np.empty((n_files, min(chunk_size, length)), dtype=np.float64)
+
+    def read_row(i, start, stop):
+        block[i, :stop - start] = read_bin_range(file_paths[i], dtype, start, stop - start)
+
+    for start, stop in iter_chunk_ranges(length, chunk_size):
+        if cancel_check and cancel_check():
+            raise StreamCancelled()
+
+        futures = [io_manager.submit(path, read_row, i, start, stop) for i, path in enumerate(file_paths)]
+        for future in futures:
+            future.result()
+        x = block[:, :stop - start]
+        valid = np.isfinite(x).all(axis=0)
+        if not valid.all():
+            skipped += int(valid.size - np.count_nonzero(valid))
+            x = x[:, valid]
+        ref = x[0]
+        d = x - ref
+        gram_d += d @ d.T
+        cross += d @ ref
+        ref_sq += float(ref @ ref)
+
+        if progress_callback:
+            progress_callback(int(stop * 100 / length))
+
+    count = length - skipped
+    gram = gram_d + cross[:, None] + cross[None, :] + ref_sq
+    sq = np.diag(gram).copy()
+    norms = np.sqrt(np.maximum(sq, 0.0))
+    denom = np.outer(norms, norms)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cosine = np.where(denom > 1e-10, np.clip(gram / denom, -1.0, 1.0), 0.0)
+    d_sq = np.diag(gram_d)
+    sse = np.maximum(d_sq[:, None] + d_sq[None, :] - 2 * gram_d, 0.0)
+    mse = sse / count if count else np.zeros_like(sse)
+    return {"gram": gram, "cosine": cosine, "mse": mse, "length": length, "skipped": skipped}
@@ -4,8 +4,10 @@ from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QPushButton,
                              QLabel, QLineEdit, QComboBox, QListWidget, 
                              QMessageBox, QFileDialog, QGroupBox, QSpinBox,
                              QListWidgetItem, QFrame, QSplitter, QWidget, QCheckBox,
-                             QApplication, QSlider, QGridLayout)
-from PyQt5.QtCore import Qt, QMimeData, QSize, QPoint, QPropertyAnimation, QEasingCurve, pyqtProperty
+                             QApplication, QSlider, QGridLayout, QListView, QStyledItemDelegate,
+                             QStyle, QToolTip, QAbstractItemView, QCompleter)
+from PyQt5.QtCore import (Qt, QMimeData, QSize, QPoint, QRect, QEvent, QThread, QTimer, pyqtSignal,
+                          QAbstractListModel, QModelIndex)
 from PyQt5.QtGui import QFont, QDragEnterEvent, QDropEvent, QPainter, QPen, QColor
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
@@ -13,234 +15,395 @@ import matplotlib.pyplot as plt
 from .config import Config
 from .theme_manager import theme_manager
 from .language_manager import get_text
-import src.bin_utils as bin_utils
-import re
+from .concat_utils import stream_concat_to_file, stream_split_to_files, parse_split_spec, ConcatCancelled
+from .virtual_tensor import VirtualConcatTensor
+from .shape_utils import candidate_shapes, format_shape, parse_shape
+from .layout_utils import permute_to_file, parse_permutation
+from .concat_manifest import make_job, add_job_to_manifest
+from .stream_metrics import stream_compare, StreamCancelled
+from . import cache_manager, io_manager
 
 # 设置matplotlib中文字体
 plt.rcParams['font.sans-serif'] = ['SimHei', 'Microsoft YaHei', 'DejaVu Sans']
 plt.rcParams['axes.unicode_minus'] = False
 
-class FileBlockWidget(QWidget):
-    """文件积木块显示组件 - 极简风格"""
-    def __init__(self, filename, color, index, parent_window):
-        super().__init__()
-        self.filename = filename
-        self.color = color
-        self.index = index
+# 保持运行中线程的引用，直到线程真正结束
+_running_workers = set()
+
+class ConcatSaveWorker(QThread):
+    """后台流式拼接并写入文件"""
+    progress = pyqtSignal(int)
+    result_ready = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+    def __init__(self, file_paths, out_path, dtype, shapes, axis, parent=None):
+        super().__init__(parent)
+        self.file_paths = file_paths
+        self.out_path = out_path
+        self.dtype = dtype
+        self.shapes = shapes
+        self.axis = axis
+
+    def run(self):
+        try:
+            out_shape = stream_concat_to_file(
+                self.file_paths, self.out_path, self.dtype,
+                shapes=self.shapes, axis=self.axis,
+                progress_callback=self.progress.emit,
+                cancel_check=self.isInterruptionRequested
+            )
+        except ConcatCancelled:
+            return
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+        self.result_ready.emit(out_shape)
+
+class SplitWorker(QThread):
+    """后台把一个张量沿某一维流式拆分/切片成多个文件"""
+    progress = pyqtSignal(int)
+    result_ready = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+    def __init__(self, file_path, dtype, shape, axis, ranges, out_paths, parent=None):
+        super().__init__(parent)
+        self.file_path = file_path
+        self.dtype = dtype
+        self.shape = shape
+        self.axis = axis
+        self.ranges = ranges
+        self.out_paths = out_paths
+
+    def run(self):
+        try:
+            out_shapes = stream_split_to_files(
+                self.file_path, self.dtype, self.shape, self.axis, self.ranges, self.out_paths,
+                progress_callback=self.progress.emit,
+                cancel_check=self.isInterruptionRequested
+            )
+        except ConcatCancelled:
+            return
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+        self.result_ready.emit(out_shapes)
+
+class PermuteWorker(QThread):
+    """后台把一个张量按维度置换流式写入新文件"""
+    progress = pyqtSignal(int)
+    result_ready = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+    def __init__(self, file_path, dtype, shape, perm, out_path, parent=None):
+        super().__init__(parent)
+        self.file_path = file_path
+        self.dtype = dtype
+        self.shape = shape
+        self.perm = perm
+        self.out_path = out_path
+
+    def run(self):
+        try:
+            out_shape = permute_to_file(
+                self.file_path, self.dtype, self.shape, self.perm, self.out_path,
+                progress_callback=self.progress.emit,
+                cancel_check=self.isInterruptionRequested
+            )
+        except ConcatCancelled:
+            return
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+        self.result_ready.emit(out_shape)
+
+def shape_status(shape_text, file_size, dtype):
+    """根据形状和文件大小给出状态：(符号, 颜色, 提示)"""
+    if not shape_text:
+        return "●", "#ccc", "Enter shape dimensions"
+    try:
+        shape = tuple(map(int, shape_text.split(',')))
+        expected_elements = int(np.prod(shape))
+        if file_size == expected_elements * dtype.itemsize:
+            return "✓", "#34a853", f"形状: {shape}\n大小匹配: {expected_elements} 个元素"
+        actual_elements = file_size // dtype.itemsize
+        return "✗", "#ea4335", f"形状: {shape}\n大小不匹配: 实际 {actual_elements} 个元素 vs 期望 {expected_elements} 个元素"
+    except Exception as e:
+        return "⚠", "#ff9800", f"Error: {str(e)}"
+
+class ConcatFileModel(QAbstractListModel):
+    """拼接文件列表模型：每行保存路径、颜色、形状和文件大小，增删和移动只通知变化的行"""
+    PathRole = Qt.UserRole + 1
+    ColorRole = Qt.UserRole + 2
+    ShapeRole = Qt.UserRole + 3
+    SizeRole = Qt.UserRole + 4
+
+    def __init__(self, colors, parent=None):
+        super().__init__(parent)
+        self.colors = colors
+        self.entries = []
+        self._paths = set()
+        self._color_counter = 0
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.entries)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        entry = self.entries[index.row()]
+        if role == Qt.DisplayRole:
+            return os.path.basename(entry['path'])
+        if role == Qt.ToolTipRole or role == self.PathRole:
+            return entry['path']
+        if role == self.ColorRole:
+            return entry['color']
+        if role == self.ShapeRole or role == Qt.EditRole:
+            return entry['shape']
+        if role == self.SizeRole:
+            return entry['size']
+        return None
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if not index.isValid() or role not in (Qt.EditRole, self.ShapeRole):
+            return False
+        self.entries[index.row()]['shape'] = value
+        self.dataChanged.emit(index, index, [self.ShapeRole])
+        return True
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsEditable
+
+    def paths(self):
+        return [entry['path'] for entry in self.entries]
+
+    def contains(self, path):
+        return path in self._paths
+
+    def shape(self, row):
+        return self.entries[row]['shape']
+
+    def add_files(self, file_paths):
+        """批量追加（跳过重复文件），一次性通知插入，返回实际添加数量"""
+        new_entries = []
+        for path in file_paths:
+            if path in self._paths:
+                continue
+            self._paths.add(path)
+            new_entries.append({
+                'path': path,
+                'color': self.colors[self._color_counter % len(self.colors)],
+                'shape': "",
+                'size': os.path.getsize(path),
+            })
+            self._color_counter += 1
+        if new_entries:
+            first = len(self.entries)
+            self.beginInsertRows(QModelIndex(), first, first + len(new_entries) - 1)
+            self.entries.extend(new_entries)
+            self.endInsertRows()
+        return len(new_entries)
+
+    def remove_row(self, row):
+        if not 0 <= row < len(self.entries):
+            return
+        self.beginRemoveRows(QModelIndex(), row, row)
+        entry = self.entries.pop(row)
+        self._paths.discard(entry['path'])
+        self.endRemoveRows()
+
+    def move_row(self, from_row, to_row):
+        """把from_row移动到to_row（移动后所在的位置）"""
+        n = len(self.entries)
+        if not (0 <= from_row < n and 0 <= to_row < n) or from_row == to_row:
+            return
+        # Qt的目标位置是“插入到该行之前”，向下移动时需要+1
+        destination = to_row + 1 if to_row > from_row else to_row
+        self.beginMoveRows(QModelIndex(), from_row, from_row, QModelIndex(), destination)
+        self.entries.insert(to_row, self.entries.pop(from_row))
+        self.endMoveRows()
+
+class VirtualCompareWorker(QThread):
+    """后台把虚拟拼接结果与参考文件做流式对比（不生成拼接结果）"""
+    progress = pyqtSignal(int)
+    result_ready = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+    def __init__(self, reference_path, file_paths, dtype, shapes, axis, parent=None):
+        super().__init__(parent)
+        self.reference_path = reference_path
+        self.file_paths = file_paths
+        self.dtype = dtype
+        self.shapes = shapes
+        self.axis = axis
+
+    def run(self):
+        try:
+            virtual = VirtualConcatTensor(self.file_paths, self.dtype, self.shapes, self.axis)
+            reference = cache_manager.open_memmap(self.reference_path, self.dtype)
+            length = min(len(reference), len(virtual))
+            acc = stream_compare(
+                reference, virtual, length=length,
+                progress_callback=self.progress.emit,
+                cancel_check=self.isInterruptionRequested
+            )
+        except StreamCancelled:
+            return
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+        result = acc.result()
+        result["reference_length"] = len(reference)
+        result["concat_length"] = len(virtual)
+        self.result_ready.emit(result)
+
+class FileItemDelegate(QStyledItemDelegate):
+    """文件行绘制代理 - 极简风格：只绘制可见行，删除/上移/下移按钮和形状输入都在代理中完成"""
+    ROW_HEIGHT = 40
+    SHAPE_ROW_HEIGHT = 36
+
+    def __init__(self, parent_window, parent=None):
+        super().__init__(parent)
         self.parent_window = parent_window
-        self.setFixedSize(450, 40)  # 简化高度
-        self._opacity = 1.0
-        self.init_ui()
-        
-    @pyqtProperty(float)
-    def opacity(self):
-        return self._opacity
-        
-    @opacity.setter
-    def opacity(self, value):
-        self._opacity = value
-        self.update()
-        
-    def paintEvent(self, event):
-        if self._opacity < 1.0:
-            painter = QPainter(self)
-            painter.setOpacity(self._opacity)
-            painter.fillRect(self.rect(), self.palette().window())
-        super().paintEvent(event)
-        
-    def init_ui(self):
-        layout = QHBoxLayout(self)
-        layout.setContentsMargins(8, 4, 8, 4)
-        layout.setSpacing(8)
-        
-        # 删除按钮 - 使用可点击文本
-        self.delete_btn = QLabel(get_text('delete'))
-        self.delete_btn.setFixedSize(32, 28)
-        self.delete_btn.setAlignment(Qt.AlignCenter)
-        self.delete_btn.setStyleSheet("""
-            QLabel {
-                border: 1px solid #dc3545;
-                border-radius: 4px;
-                background: #fff5f5;
-                color: #dc3545;
-                font-size: 10px;
-                font-weight: 500;
-            }
-            QLabel:hover {
-                background: #dc3545;
-                color: white;
-            }
-        """)
-        self.delete_btn.setToolTip(get_text('delete') + "文件")
-        self.delete_btn.mousePressEvent = lambda e: self.delete_file()
-        layout.addWidget(self.delete_btn)
-        
-        # 序号标签
-        self.index_label = QLabel(f"{self.index + 1}")
-        self.index_label.setFixedSize(28, 28)
-        self.index_label.setAlignment(Qt.AlignCenter)
-        self.index_label.setStyleSheet("""
-            QLabel {
-                background: #f8f9fa;
-                border: 1px solid #dee2e6;
-                border-radius: 4px;
-                color: #6c757d;
+
+    def sizeHint(self, option, index):
+        height = self.ROW_HEIGHT
+        if self.parent_window.uses_shapes():
+            height += self.SHAPE_ROW_HEIGHT
+        return QSize(450, height)
+
+    def _rects(self, rect):
+        """行内各部件的位置（与原积木块布局一致）"""
+        x, y = rect.left() + 8, rect.top() + 6
+        rects = {}
+        rects['delete'] = QRect(x, y, 32, 28)
+        rects['index'] = QRect(x + 40, y, 28, 28)
+        rects['name'] = QRect(x + 76, y, 200, 28)
+        rects['up'] = QRect(x + 284, y, 32, 28)
+        rects['down'] = QRect(x + 324, y, 32, 28)
+        y2 = rect.top() + self.ROW_HEIGHT
+        rects['shape_display'] = QRect(x + 40, y2, 80, 28)
+        rects['shape'] = QRect(x + 128, y2, 180, 28)
+        rects['status'] = QRect(x + 316, y2, 32, 28)
+        return rects
+
+    def _draw_box(self, painter, rect, text, fg, border, bg, bold=False, align=Qt.AlignCenter):
+        painter.setPen(QPen(QColor(border), 1))
+        painter.setBrush(QColor(bg))
+        painter.drawRoundedRect(rect, 4, 4)
+        font = painter.font()
+        font.setBold(bold)
+        painter.setFont(font)
+        painter.setPen(QColor(fg))
+        painter.drawText(rect.adjusted(8 if align & Qt.AlignLeft else 0, 0, 0, 0), align, text)
+
+    def paint(self, painter, option, index):
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+        if option.state & QStyle.State_Selected:
+            painter.fillRect(option.rect, QColor("#e8f0fe"))
+
+        rects = self._rects(option.rect)
+        row = index.row()
+        row_count = index.model().rowCount()
+        color = index.data(ConcatFileModel.ColorRole)
+
+        self._draw_box(painter, rects['delete'], get_text('delete'), "#dc3545", "#dc3545", "#fff5f5")
+        self._draw_box(painter, rects['index'], str(row + 1), "#6c757d", "#dee2e6", "#f8f9fa")
+
+        name = index.data(Qt.DisplayRole)
+        if len(name) > 22:
+            name = name[:19] + "..."
+        self._draw_box(painter, rects['name'], name, "white", QColor(color).darker(110).name(), color,
+                       align=Qt.AlignVCenter | Qt.AlignLeft)
+
+        enabled = ("#6c757d", "#6c757d", "#f8f9fa")
+        disabled = ("#adb5bd", "#e9ecef", "#f8f9fa")
+        self._draw_box(painter, rects['up'], get_text('move_up'), *(enabled if row > 0 else disabled))
+        self._draw_box(painter, rects['down'], get_text('move_down'),
+                       *(enabled if row < row_count - 1 else disabled))
+
+        if self.parent_window.uses_shapes():
+            shape_text = index.data(ConcatFileModel.ShapeRole)
+            display = f"[{shape_text.replace(',', ', ')}]" if shape_text else "[]"
+            if len(display) > 12:
+                display = display[:9] + "..."
+            self._draw_box(painter, rects['shape_display'], display, "#4285f4", "#4285f4", "#f0f8ff")
+            self._draw_box(painter, rects['shape'], shape_text or get_text('shape_placeholder'),
+                           "#333" if shape_text else "#aaa", "#ddd", "white",
+                           align=Qt.AlignVCenter | Qt.AlignLeft)
+            symbol, status_color, _ = shape_status(
+                shape_text, index.data(ConcatFileModel.SizeRole), self.parent_window.current_dtype()
+            )
+            self._draw_box(painter, rects['status'], symbol, status_color,
+                           status_color if symbol != "●" else "#eee", "#fafafa", bold=True)
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index):
+        """按钮点击：删除/上移/下移；点击形状区域进入编辑"""
+        if event.type() != QEvent.MouseButtonRelease or event.button() != Qt.LeftButton:
+            return False
+        rects = self._rects(option.rect)
+        pos = event.pos()
+        row = index.row()
+        if rects['delete'].contains(pos):
+            self.parent_window.remove_file(row)
+            return True
+        if rects['up'].contains(pos):
+            self.parent_window.move_file_to_position(row, row - 1)
+            return True
+        if rects['down'].contains(pos):
+            self.parent_window.move_file_to_position(row, row + 1)
+            return True
+        if self.parent_window.uses_shapes() and rects['shape'].contains(pos):
+            self.parent().edit(index)
+            return True
+        return False
+
+    def helpEvent(self, event, view, option, index):
+        if self.parent_window.uses_shapes() and self._rects(option.rect)['status'].contains(event.pos()):
+            _, _, tooltip = shape_status(
+                index.data(ConcatFileModel.ShapeRole), index.data(ConcatFileModel.SizeRole),
+                self.parent_window.current_dtype()
+            )
+            QToolTip.showText(event.globalPos(), tooltip, view)
+            return True
+        return super().helpEvent(event, view, option, index)
+
+    def createEditor(self, parent, option, index):
+        if not self.parent_window.uses_shapes():
+            return None
+        editor = QLineEdit(parent)
+        editor.setPlaceholderText(get_text('shape_placeholder'))
+        # 候选形状（由文件大小和其他文件的形状推断），打开编辑器时直接弹出
+        candidates = self.parent_window.shape_candidates(index.row())
+        if candidates:
+            completer = QCompleter(candidates, editor)
+            completer.setCompletionMode(QCompleter.UnfilteredPopupCompletion)
+            editor.setCompleter(completer)
+            QTimer.singleShot(0, completer.complete)
+        editor.setStyleSheet("""
+            QLineEdit {
+                border: 1px solid #4285f4;
+                border-radius: 2px;
+                padding: 0 8px;
                 font-size: 11px;
-                font-weight: normal;
-            }
-        """)
-        layout.addWidget(self.index_label)
-        
-        # 文件名标签
-        self.file_label = QLabel()
-        self.file_label.setFixedSize(200, 28)
-        self.update_file_display()
-        layout.addWidget(self.file_label)
-        
-        # 调整按钮 - 使用可点击文本
-        self.up_btn = QLabel(get_text('move_up'))
-        self.up_btn.setFixedSize(32, 28)
-        self.up_btn.setAlignment(Qt.AlignCenter)
-        self.up_btn.setStyleSheet("""
-            QLabel {
-                border: 1px solid #6c757d;
-                border-radius: 4px;
-                background: #f8f9fa;
-                color: #6c757d;
-                font-size: 10px;
-                font-weight: 500;
-            }
-            QLabel:hover {
-                background: #6c757d;
-                color: white;
+                font-family: 'Segoe UI', 'Microsoft YaHei', sans-serif;
+                background: white;
             }
         """)
-        self.up_btn.setToolTip(get_text('move_up'))
-        self.up_btn.mousePressEvent = lambda e: self.move_up() if self.index > 0 else None
-        layout.addWidget(self.up_btn)
-        
-        self.down_btn = QLabel(get_text('move_down'))
-        self.down_btn.setFixedSize(32, 28)
-        self.down_btn.setAlignment(Qt.AlignCenter)
-        self.down_btn.setStyleSheet(self.up_btn.styleSheet())
-        self.down_btn.setToolTip(get_text('move_down'))
-        self.down_btn.mousePressEvent = lambda e: self.move_down() if self.index < len(self.parent_window.file_list) - 1 else None
-        layout.addWidget(self.down_btn)
-        
-    def delete_file(self):
-        self.parent_window.remove_file(self.index)
-        
-    def update_file_display(self):
-        display_name = self.filename
-        if len(display_name) > 22:
-            display_name = display_name[:19] + "..."
-            
-        self.file_label.setStyleSheet(f"""
-            QLabel {{
-                background: {self.color};
-                border: 1px solid {QColor(self.color).darker(110).name()};
-                border-radius: 4px;
-                color: white;
-                font-size: 11px;
-                font-weight: normal;
-                padding-left: 8px;
-            }}
-        """)
-        
-        self.file_label.setText(display_name)
-        self.file_label.setAlignment(Qt.AlignVCenter | Qt.AlignLeft)
-        
-    def move_up(self):
-        if self.index > 0:
-            self.animate_move()
-            self.parent_window.move_file_to_position(self.index, self.index - 1)
-            
-    def move_down(self):
-        if self.index < len(self.parent_window.file_list) - 1:
-            self.animate_move()
-            self.parent_window.move_file_to_position(self.index, self.index + 1)
-            
-    def animate_move(self):
-        """移动动画效果"""
-        self.animation = QPropertyAnimation(self, b"opacity")
-        self.animation.setDuration(200)
-        self.animation.setStartValue(1.0)
-        self.animation.setKeyValueAt(0.5, 0.6)
-        self.animation.setEndValue(1.0)
-        self.animation.setEasingCurve(QEasingCurve.InOutQuad)
-        self.animation.start()
-            
-    def update_buttons(self):
-        # 更新按钮样式以反映启用/禁用状态
-        if self.index > 0:
-            self.up_btn.setStyleSheet("""
-                QLabel {
-                    border: 1px solid #6c757d;
-                    border-radius: 4px;
-                    background: #f8f9fa;
-                    color: #6c757d;
-                    font-size: 10px;
-                    font-weight: 500;
-                }
-                QLabel:hover {
-                    background: #6c757d;
-                    color: white;
-                }
-            """)
-        else:
-            self.up_btn.setStyleSheet("""
-                QLabel {
-                    border: 1px solid #e9ecef;
-                    border-radius: 4px;
-                    background: #f8f9fa;
-                    color: #adb5bd;
-                    font-size: 10px;
-                    font-weight: 500;
-                }
-            """)
-            
-        if self.index < len(self.parent_window.file_list) - 1:
-            self.down_btn.setStyleSheet("""
-                QLabel {
-                    border: 1px solid #6c757d;
-                    border-radius: 4px;
-                    background: #f8f9fa;
-                    color: #6c757d;
-                    font-size: 10px;
-                    font-weight: 500;
-                }
-                QLabel:hover {
-                    background: #6c757d;
-                    color: white;
-                }
-            """)
-        else:
-            self.down_btn.setStyleSheet("""
-                QLabel {
-                    border: 1px solid #e9ecef;
-                    border-radius: 4px;
-                    background: #f8f9fa;
-                    color: #adb5bd;
-                    font-size: 10px;
-                    font-weight: 500;
-                }
-            """)
-        
-    def update_index(self, new_index):
-        self.index = new_index
-        self.update_buttons()
-        self.index_label.setText(f"{self.index + 1}")
-        self.update_file_display()
-        
-    def update_text(self):
-        """更新按钮文本"""
-        self.delete_btn.setText(get_text('delete'))
-        self.up_btn.setText(get_text('move_up'))
-        self.down_btn.setText(get_text('move_down'))
-        self.delete_btn.setToolTip(get_text('delete') + "文件")
-        
+        return editor
 
-        
+    def setEditorData(self, editor, index):
+        editor.setText(index.data(ConcatFileModel.ShapeRole))
+
+    def setModelData(self, editor, model, index):
+        shape, _ = parse_shape(editor.text())
+        model.setData(index, ','.join(map(str, shape)) if shape else "")
+
+    def updateEditorGeometry(self, editor, option, index):
+        editor.setGeometry(self._rects(option.rect)['shape'])
 
 
 class DropZoneWidget(QLabel):  # 改成继承 QLabel！
@@ -279,177 +442,8 @@ class DropZoneWidget(QLabel):  # 改成继承 QLabel！
                 if url.isLocalFile() and url.toLocalFile().lower().endswith('.bin'):
                     files.append(url.toLocalFile())
             if files:
-                remaining = 4 - len(self.main_window.file_list)
-                files = files[:remaining]
                 self.main_window.add_files_from_drop(files)
             event.acceptProposedAction()
-class SmartShapeInput(QWidget):
-    def __init__(self, filename, color, file_path, parent_window):
-        super().__init__()
-        self.filename = filename
-        self.color = color
-        self.file_path = file_path
-        self.parent_window = parent_window
-        self.setFixedSize(450, 44)  # 与文件块组件保持一致的宽度
-        self.init_ui()
-        
-    def init_ui(self):
-        layout = QHBoxLayout(self)
-        layout.setContentsMargins(0, 0, 0, 0)
-        layout.setSpacing(8)
-        
-        # 占位空间（与序号对齐）
-        spacer = QLabel()
-        spacer.setFixedSize(32, 32)  # 与更新后的序号标签宽度保持一致
-        layout.addWidget(spacer)
-        
-        # 实时形状显示
-        self.shape_display = QLabel("[Shape]")
-        self.shape_display.setFixedSize(80, 32)
-        self.shape_display.setAlignment(Qt.AlignCenter)
-        self.shape_display.setStyleSheet("""
-            QLabel {
-                background: #f0f8ff;
-                border: 1px solid #4285f4;
-                border-radius: 2px;
-                color: #4285f4;
-                font-size: 10px;
-                font-weight: 500;
-                font-family: 'Segoe UI', 'Microsoft YaHei', sans-serif;
-            }
-        """)
-        layout.addWidget(self.shape_display)
-        
-        # 输入框
-        self.input = QLineEdit()
-        self.input.setFixedSize(180, 32)  # 调整宽度以适应形状显示
-        self.input.setPlaceholderText(get_text('shape_placeholder'))
-        self.input.setStyleSheet("""
-            QLineEdit {
-                border: 1px solid #ddd;
-                border-radius: 2px;
-                padding: 0 8px;
-                font-size: 11px;
-                font-family: 'Segoe UI', 'Microsoft YaHei', sans-serif;
-                background: white;
-            }
-            QLineEdit:focus {
-                border-color: #4285f4;
-            }
-        """)
-        self.input.textChanged.connect(self.on_text_changed)
-        layout.addWidget(self.input)
-        
-        # 状态指示器
-        self.status_indicator = QLabel("●")
-        self.status_indicator.setFixedSize(32, 32)  # 与删除按钮宽度保持一致
-        self.status_indicator.setAlignment(Qt.AlignCenter)
-        self.status_indicator.setStyleSheet("""
-            QLabel {
-                color: #ccc;
-                font-size: 16px;
-                border: 1px solid #eee;
-                border-radius: 2px;
-                background: #fafafa;
-                font-family: 'Segoe UI', 'Microsoft YaHei', sans-serif;
-            }
-        """)
-        layout.addWidget(self.status_indicator)
-        
-    def parse_shape(self, text):
-        """模糊解析形状"""
-        if not text.strip():
-            return None, "Empty input"
-            
-        # 提取数字
-        numbers = re.findall(r'\d+', text)
-        if not numbers:
-            return None, "No numbers found"
-            
-        try:
-            shape = tuple(map(int, numbers))
-            return shape, f"Parsed: {shape}"
-        except ValueError:
-            return None, "Invalid numbers"
-            
-    def on_text_changed(self, text):
-        shape, message = self.parse_shape(text)
-        
-        # 更新形状显示
-        if shape:
-            shape_text = str(list(shape))
-            if len(shape_text) > 12:
-                shape_text = shape_text[:9] + "..."
-            self.shape_display.setText(shape_text)
-            
-            try:
-                file_size = os.path.getsize(self.file_path)
-                dtype = np.dtype(self.parent_window.dtype_combo.currentText())
-                expected_size = np.prod(shape) * dtype.itemsize
-                
-                if file_size == expected_size:
-                    self.status_indicator.setText("✓")
-                    self.status_indicator.setStyleSheet("""
-                        QLabel {
-                            color: #34a853;
-                            font-size: 16px;
-                            font-weight: bold;
-                            border: 1px solid #34a853;
-                            border-radius: 2px;
-                            background: #f0fff4;
-                        }
-                    """)
-                    self.status_indicator.setToolTip(f"形状: {shape}\n大小匹配: {np.prod(shape)} 个元素")
-                    self.parent_window.file_shapes[self.filename] = ','.join(map(str, shape))
-                else:
-                    self.status_indicator.setText("✗")
-                    self.status_indicator.setStyleSheet("""
-                        QLabel {
-                            color: #ea4335;
-                            font-size: 16px;
-                            font-weight: bold;
-                            border: 1px solid #ea4335;
-                            border-radius: 2px;
-                            background: #fff5f5;
-                        }
-                    """)
-                    actual_elements = file_size // dtype.itemsize
-                    expected_elements = np.prod(shape)
-                    self.status_indicator.setToolTip(f"形状: {shape}\n大小不匹配: 实际 {actual_elements} 个元素 vs 期望 {expected_elements} 个元素")
-                    self.parent_window.file_shapes[self.filename] = ','.join(map(str, shape))
-            except Exception as e:
-                self.status_indicator.setText("⚠")
-                self.status_indicator.setStyleSheet("""
-                    QLabel {
-                        color: #ff9800;
-                        font-size: 16px;
-                        font-weight: bold;
-                        border: 1px solid #ff9800;
-                        border-radius: 2px;
-                        background: #fff8e1;
-                    }
-                """)
-                self.status_indicator.setToolTip(f"Error: {str(e)}")
-        else:
-            self.shape_display.setText("[]")
-            self.status_indicator.setText("●")
-            self.status_indicator.setStyleSheet("""
-                QLabel {
-                    color: #ccc;
-                    font-size: 16px;
-                    border: 1px solid #eee;
-                    border-radius: 2px;
-                    background: #fafafa;
-                }
-            """)
-            self.status_indicator.setToolTip(message if message != "Empty input" else "Enter shape dimensions")
-            self.parent_window.file_shapes[self.filename] = ""
-            
-        self.parent_window.validate_all()
-        
-    def set_text(self, text):
-        self.input.setText(text)
-
 class ResultPreviewWindow(QDialog):
     def __init__(self, parent, result_tensor, title="拼接结果预览"):
         super().__init__(parent)
@@ -500,17 +494,13 @@ class ResultPreviewWindow(QDialog):
         ax = self.figure.add_subplot(111)
         
         try:
-            # 将多维张量展平为1D进行可视化
-            data = self.result_tensor.flatten()
-            
-            # 智能下采样
-            if len(data) > 3000:
-                target_points = 2000
-                step = max(1, len(data) // target_points)
-                indices = np.arange(0, len(data), step)
-                data = data[indices]
+            # 按展平顺序等间隔取点（虚拟张量只读取被取到的元素）
+            if len(self.result_tensor) > 3000:
+                step, data = self.result_tensor.decimate(2000)
+            else:
+                step, data = 1, self.result_tensor[:]
                 
-            ax.plot(data, linewidth=1.5, color='#4285f4', alpha=0.8)
+            ax.plot(np.arange(len(data)) * step, data, linewidth=1.5, color='#4285f4', alpha=0.8)
             ax.set_title("Concatenation Result (Flattened)", fontsize=12)
             ax.set_xlabel("Index")
             ax.set_ylabel("Value")
@@ -523,11 +513,20 @@ class ResultPreviewWindow(QDialog):
         self.figure.tight_layout()
         self.canvas.draw()
 
+def load_thumbnail(file_path, dtype, max_points=1500):
+    """读取文件的降采样缩略数据（memmap跨步读取，只触及被采样的页；结果在各窗口共享的缓存中）"""
+    length = len(cache_manager.open_memmap(file_path, dtype))
+    step = max(1, length // max_points) if length > 2000 else 1
+    return cache_manager.decimated(file_path, dtype, step)
+
 class PreviewWindow(QDialog):
-    def __init__(self, parent, file_list, colors):
+    def __init__(self, parent, file_list, colors, dtype="float32"):
         super().__init__(parent)
         self.file_list = file_list
         self.colors = colors
+        self.dtype = dtype
+        self.grid = None   # 当前子图网格(rows, cols)
+        self.slots = []    # 每个网格位置的 (ax, line, error_text)，网格不变时复用
         self.setWindowTitle(get_text('data_preview'))
         self.resize(800, 600)
         self.position_near_parent()
@@ -569,58 +568,78 @@ class PreviewWindow(QDialog):
         self.canvas = FigureCanvas(self.figure)
         layout.addWidget(self.canvas)
         
-    def update_plots(self):
+    def grid_shape(self, n_files):
+        if n_files == 1:
+            return 1, 1
+        if n_files == 2:
+            return 2, 1
+        cols = int(np.ceil(np.sqrt(n_files)))
+        return int(np.ceil(n_files / cols)), cols
+        
+    def build_grid(self, grid):
+        """网格变化时才重建子图"""
         self.figure.clear()
-        
-        if not self.file_list:
-            return
+        self.grid = grid
+        self.slots = []
+        rows, cols = grid
+        for i in range(rows * cols):
+            ax = self.figure.add_subplot(rows, cols, i + 1)
+            line, = ax.plot([], [], linewidth=2.0, alpha=0.9)
+            error_text = ax.text(0.5, 0.5, "", ha='center', va='center', transform=ax.transAxes)
+            ax.tick_params(labelsize=8)
+            ax.grid(True, alpha=0.3)
+            self.slots.append((ax, line, error_text))
             
-        n_files = len(self.file_list)
-        if n_files == 1:
-            rows, cols = 1, 1
-        elif n_files == 2:
-            rows, cols = 2, 1
-        elif n_files <= 4:
-            rows, cols = 2, 2
-        else:
-            rows, cols = 3, 2
+    def update_plots(self):
+        """复用子图和曲线对象，只替换数据；数据来自缩略缓存，重排时不读文件"""
+        # 文件很多时只预览前面一部分
+        file_list = self.file_list[:Config.CONCAT_PREVIEW_MAX_FILES]
+        n_files = len(file_list)
+        if not n_files:
+            self.figure.clear()
+            self.grid = None
+            self.slots = []
+            self.canvas.draw_idle()
+            return
             
-        for i, file_path in enumerate(self.file_list):
-            ax = self.figure.add_subplot(rows, cols, i + 1)
+        # 所有缩略数据先在共享I/O线程池中并行读取（已缓存的直接返回），再按顺序填入子图
+        thumbnails = io_manager.submit_all(load_thumbnail, file_list, self.dtype)
+        grid = self.grid_shape(n_files)
+        grid_changed = grid != self.grid
+        if grid_changed:
+            self.build_grid(grid)
             
+        for i, (ax, line, error_text) in enumerate(self.slots):
+            if i >= n_files:
+                ax.set_visible(False)
+                continue
+            ax.set_visible(True)
+            file_path = file_list[i]
+            ax.set_title(f"{i+1}. {os.path.basename(file_path)}", fontsize=10)
             try:
-                # 使用float32作为默认类型
-                data = bin_utils.read_bin_file(file_path, dtype=np.dtype('float32'))
-                
-                # 智能下采样
-                if len(data) > 2000:
-                    # 使用更智能的下采样策略
-                    target_points = 1500
-                    step = max(1, len(data) // target_points)
-                    indices = np.arange(0, len(data), step)
-                    data = data[indices]
-                    
-                ax.plot(data, linewidth=2.0, color=self.colors[i % len(self.colors)], alpha=0.9)
-                ax.set_title(f"{i+1}. {os.path.basename(file_path)}", fontsize=10)
-                ax.tick_params(labelsize=8)
-                ax.grid(True, alpha=0.3)
-                
+                data = thumbnails[i].result()
+                line.set_data(np.arange(len(data)), data)
+                line.set_color(self.colors[i % len(self.colors)])
+                line.set_visible(True)
+                error_text.set_text("")
+                ax.relim()
+                ax.autoscale_view()
             except Exception as e:
-                ax.text(0.5, 0.5, f'Error loading\n{os.path.basename(file_path)}', 
-                       ha='center', va='center', transform=ax.transAxes)
+                line.set_visible(False)
+                error_text.set_text(f'Error loading\n{os.path.basename(file_path)}')
                 
-        self.figure.tight_layout()
-        self.canvas.draw()
+        if grid_changed:
+            self.figure.tight_layout()
+        self.canvas.draw_idle()
 
 class TensorConcatWindow(QDialog):
     def __init__(self, parent=None, screen_dpi=None):
         super().__init__(parent)
         self.screen_dpi = screen_dpi or 96
-        self.file_list = []
-        self.file_colors = {}  # 文件名 -> 颜色的映射
-        self.file_shapes = {}  # 文件名 -> 形状的映射
-        self.shape_widgets = []  # 存储形状输入组件
-        self.block_widgets = []  # 存储积木块组件
+        self.base_colors = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728']
+        self.file_model = ConcatFileModel(self.base_colors, self)  # 文件列表（路径、颜色、形状）
+        self.save_worker = None
+        self.compare_worker = None
         self.init_ui()
         
     def init_ui(self):
@@ -667,15 +686,28 @@ class TensorConcatWindow(QDialog):
         self.files_group = QGroupBox(get_text('file_list'))
         files_layout = QVBoxLayout(self.files_group)
         
-        # 文件列表区域（统一布局）
-        self.files_container = QWidget()
-        self.files_layout = QVBoxLayout(self.files_container)
-        self.files_layout.setContentsMargins(10, 10, 10, 10)
-        self.files_layout.setSpacing(8)
-        self.files_layout.setAlignment(Qt.AlignTop)
-        
-        files_layout.addWidget(self.files_container)
-        
+        # 文件列表区域：虚拟化列表，只绘制可见行
+        self.empty_widget = self.create_empty_widget()
+        files_layout.addWidget(self.empty_widget)
+        
+        self.file_view = QListView()
+        self.file_view.setModel(self.file_model)
+        self.file_view.setItemDelegate(FileItemDelegate(self, self.file_view))
+        self.file_view.setUniformItemSizes(True)
+        self.file_view.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.file_view.setEditTriggers(QAbstractItemView.DoubleClicked | QAbstractItemView.EditKeyPressed)
+        self.file_view.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.file_view.installEventFilter(self)
+        files_layout.addWidget(self.file_view)
+        
+        # 逐文件检查结果缓存：文件 -> 错误信息，只在该文件变化时更新
+        self.shape_issues = {}
+        self.file_model.rowsInserted.connect(self.on_rows_inserted)
+        self.file_model.rowsAboutToBeRemoved.connect(self.on_rows_about_to_be_removed)
+        self.file_model.rowsInserted.connect(self.on_files_changed)
+        self.file_model.rowsRemoved.connect(self.on_files_changed)
+        self.file_model.rowsMoved.connect(self.on_files_changed)
+        self.file_model.dataChanged.connect(self.on_data_changed)
 
         
         left_layout.addWidget(self.files_group)
@@ -710,20 +742,44 @@ class TensorConcatWindow(QDialog):
         self.axis_spinbox.setMinimum(0)
         self.axis_spinbox.setMaximum(10)
         self.axis_spinbox.setValue(0)
-        self.axis_spinbox.valueChanged.connect(self.validate_shape)
+        self.axis_spinbox.valueChanged.connect(lambda _: self.revalidate_entries())
         config_layout.addWidget(self.axis_spinbox, 2, 1)
         
+        # 拆分方式（仅拆分模式）
+        self.split_label = QLabel(get_text('split_spec'))
+        config_layout.addWidget(self.split_label, 3, 0)
+        self.split_input = QLineEdit()
+        self.split_input.setPlaceholderText(get_text('split_spec_placeholder'))
+        self.split_input.setToolTip(get_text('split_spec_tooltip'))
+        self.split_input.textChanged.connect(self.validate_shape)
+        config_layout.addWidget(self.split_input, 3, 1)
+        
+        # 维度置换（仅布局转换模式，与拆分方式共用一行）
+        self.perm_label = QLabel(get_text('permutation'))
+        config_layout.addWidget(self.perm_label, 3, 0)
+        self.perm_input = QLineEdit()
+        self.perm_input.setPlaceholderText(get_text('permutation_placeholder'))
+        self.perm_input.setToolTip(get_text('permutation_tooltip'))
+        self.perm_input.textChanged.connect(self.validate_shape)
+        config_layout.addWidget(self.perm_input, 3, 1)
+        
+        # 根据文件大小和已填写的形状自动推断
+        self.infer_shape_btn = QPushButton(get_text('infer_shapes'))
+        self.infer_shape_btn.setToolTip(get_text('infer_shapes_tooltip'))
+        self.infer_shape_btn.clicked.connect(self.infer_missing_shapes)
+        config_layout.addWidget(self.infer_shape_btn, 4, 0, 1, 2)
+        
         # 预览选项
         self.preview_btn_toggle = QPushButton(get_text('show_preview'))
         self.preview_btn_toggle.clicked.connect(self.show_preview_window)
         self.preview_btn_toggle.setEnabled(False)
-        config_layout.addWidget(self.preview_btn_toggle, 3, 0, 1, 2)
+        config_layout.addWidget(self.preview_btn_toggle, 5, 0, 1, 2)
         
         # 状态显示
         self.status_label = QLabel(get_text('add_files'))
         self.status_label.setStyleSheet("color: #666; font-size: 11px; padding: 8px; border-radius: 4px;")
         self.status_label.setWordWrap(True)
-        config_layout.addWidget(self.status_label, 4, 0, 1, 2)
+        config_layout.addWidget(self.status_label, 6, 0, 1, 2)
         
         # 配置区域已移到右侧
         
@@ -740,7 +796,19 @@ class TensorConcatWindow(QDialog):
         self.save_btn.clicked.connect(self.save_result)
         self.save_btn.setEnabled(False)
         
+        self.compare_ref_btn = QPushButton(get_text('compare_with_reference'))
+        self.compare_ref_btn.setToolTip(get_text('compare_with_reference_tooltip'))
+        self.compare_ref_btn.clicked.connect(self.compare_with_reference)
+        self.compare_ref_btn.setEnabled(False)
+        
+        self.manifest_btn = QPushButton(get_text('save_manifest'))
+        self.manifest_btn.setToolTip(get_text('save_manifest_tooltip'))
+        self.manifest_btn.clicked.connect(self.save_to_manifest)
+        self.manifest_btn.setEnabled(False)
+        
         btn_layout.addWidget(self.preview_btn)
+        btn_layout.addWidget(self.compare_ref_btn)
+        btn_layout.addWidget(self.manifest_btn)
         btn_layout.addWidget(self.save_btn)
         btn_layout.addStretch()
         left_layout.addLayout(btn_layout)
@@ -759,203 +827,181 @@ class TensorConcatWindow(QDialog):
         layout.addWidget(content_splitter)
         
         self.result_tensor = None
-        self.base_colors = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728']
         self.on_mode_changed()
-        self.update_file_blocks()
+        self.update_file_view()
         
     def update_mode_combo_items(self):
         """更新拼接模式下拉框选项"""
         current_index = self.mode_combo.currentIndex() if hasattr(self, 'mode_combo') else 0
         self.mode_combo.clear()
-        self.mode_combo.addItems([get_text('simple_concat'), get_text('tensor_concat_mode')])
+        self.mode_combo.addItems([get_text('simple_concat'), get_text('tensor_concat_mode'),
+                                  get_text('split_mode'), get_text('permute_mode')])
         self.mode_combo.setCurrentIndex(current_index)
         
+    @property
+    def file_list(self):
+        return self.file_model.paths()
+        
+    def is_tensor_mode(self):
+        return get_text('tensor_concat_mode') in self.mode_combo.currentText()
+        
+    def is_split_mode(self):
+        return get_text('split_mode') in self.mode_combo.currentText()
+        
+    def is_permute_mode(self):
+        return get_text('permute_mode') in self.mode_combo.currentText()
+        
+    def is_single_file_mode(self):
+        """拆分和布局转换模式只处理一个输入文件"""
+        return self.is_split_mode() or self.is_permute_mode()
+        
+    def uses_shapes(self):
+        """张量拼接、拆分和布局转换模式都需要为文件指定形状"""
+        return self.is_tensor_mode() or self.is_single_file_mode()
+        
+    def current_dtype(self):
+        return np.dtype(self.dtype_combo.currentText())
+        
     def add_file(self):
-        remaining_slots = 4 - len(self.file_list)
-        if remaining_slots <= 0:
-            QMessageBox.warning(self, get_text('hint'), get_text('max_files_warning'))
-            return
-            
         file_paths, _ = QFileDialog.getOpenFileNames(
-            self, f"Select BIN Files (can add {remaining_slots} more)", "", "BIN Files (*.bin);;All Files (*)"
+            self, "Select BIN Files", "", "BIN Files (*.bin);;All Files (*)"
         )
         if file_paths:
-            if len(file_paths) > remaining_slots:
-                QMessageBox.information(self, get_text('hint'), 
-                                       f"Can only add {remaining_slots} more files, selected first {remaining_slots}")
-                file_paths = file_paths[:remaining_slots]
             self.add_files_from_drop(file_paths)
             
     def add_files_from_drop(self, file_paths):
-        for file_path in file_paths:
-            if file_path not in self.file_list and len(self.file_list) < 4:
-                self.file_list.append(file_path)
-                # 为新文件分配颜色
-                filename = os.path.basename(file_path)
-                if filename not in self.file_colors:
-                    color_index = len(self.file_colors) % len(self.base_colors)
-                    self.file_colors[filename] = self.base_colors[color_index]
-                    self.file_shapes[filename] = ""  # 初始化形状
-        self.update_file_blocks()
-        # 如果预览窗口打开，更新预览
-        if self.preview_window and self.preview_window.isVisible():
-            self.preview_window.file_list = self.file_list.copy()
-            self.preview_window.colors = [self.file_colors[os.path.basename(f)] for f in self.file_list]
-            self.preview_window.update_plots()
-        self.validate_all()
+        self.file_model.add_files(file_paths)
         
     def remove_file(self, index):
         """删除指定索引的文件"""
-        if 0 <= index < len(self.file_list):
-            file_path = self.file_list.pop(index)
-            filename = os.path.basename(file_path)
-            
-            # 清理相关数据
-            if filename in self.file_colors:
-                del self.file_colors[filename]
-            if filename in self.file_shapes:
-                del self.file_shapes[filename]
-            
-            # 更新界面
-            self.update_file_blocks()
-            
-            # 如果预览窗口打开，更新预览
-            if self.preview_window and self.preview_window.isVisible():
-                if self.file_list:
-                    self.preview_window.file_list = self.file_list.copy()
-                    self.preview_window.colors = [self.file_colors[os.path.basename(f)] for f in self.file_list]
-                    self.preview_window.update_plots()
-                else:
-                    self.preview_window.close()
-            
-            # 重新验证
-            self.validate_all()
+        self.file_model.remove_row(index)
+        
+    def remove_selected_files(self):
+        """删除所有选中的行（从后往前删，保证行号不变）"""
+        rows = sorted({index.row() for index in self.file_view.selectedIndexes()}, reverse=True)
+        for row in rows:
+            self.file_model.remove_row(row)
         
     def move_file_to_position(self, from_index, to_index):
-        """移动文件到指定位置并添加动画效果"""
-        if 0 <= from_index < len(self.file_list) and 0 <= to_index < len(self.file_list) and from_index != to_index:
-            # 移动文件
-            file_path = self.file_list.pop(from_index)
-            self.file_list.insert(to_index, file_path)
-            
-            # 延迟更新界面，等待动画完成
-            from PyQt5.QtCore import QTimer
-            QTimer.singleShot(100, self.update_file_blocks)
-            
-            # 如果预览窗口打开，更新预览
-            if self.preview_window and self.preview_window.isVisible():
-                def update_preview():
-                    self.preview_window.file_list = self.file_list.copy()
-                    self.preview_window.colors = [self.file_colors[os.path.basename(f)] for f in self.file_list]
-                    self.preview_window.update_plots()
-                QTimer.singleShot(150, update_preview)
-            
-
+        """移动文件到指定位置"""
+        self.file_model.move_row(from_index, to_index)
+        
+    def eventFilter(self, obj, event):
+        # 列表中按Delete删除选中的文件
+        if obj is self.file_view and event.type() == QEvent.KeyPress and event.key() == Qt.Key_Delete \
+                and self.file_view.state() != QAbstractItemView.EditingState:
+            self.remove_selected_files()
+            return True
+        return super().eventFilter(obj, event)
+        
+    def on_files_changed(self, *args):
+        """文件增删或移动后：切换空状态、同步预览窗口并重新验证"""
+        self.update_file_view()
+        if self.preview_window and self.preview_window.isVisible():
+            if self.file_list:
+                self.preview_window.file_list = self.file_list
+                self.preview_window.colors = [entry['color'] for entry in self.file_model.entries]
+                self.preview_window.update_plots()
+            else:
+                self.preview_window.close()
+        self.validate_all()
         
-    def update_file_blocks(self):
-        # 清除旧的组件
-        for i in reversed(range(self.files_layout.count())):
-            child = self.files_layout.itemAt(i).widget()
-            if child:
-                child.setParent(None)
-        self.shape_widgets.clear()
-                
-        if not self.file_list:
-            # 优雅的空状态显示
-            empty_widget = QWidget()
-            empty_layout = QVBoxLayout(empty_widget)
-            empty_layout.setContentsMargins(30, 40, 30, 40)
-            empty_layout.setSpacing(15)
-            
-            # 图标
-            icon_label = QLabel("📁")
-            icon_label.setAlignment(Qt.AlignCenter)
-            icon_label.setStyleSheet("""
-                QLabel {
-                    font-size: 48px;
-                    color: #ddd;
-                    margin-bottom: 10px;
-                    background: transparent;
-                }
-            """)
-            empty_layout.addWidget(icon_label)
-            
-            # 主要提示文本
-            main_text = QLabel(get_text('no_files_empty'))
-            main_text.setAlignment(Qt.AlignCenter)
-            main_text.setStyleSheet("""
-                QLabel {
-                    color: #999;
-                    font-size: 16px;
-                    font-weight: 500;
-                    margin-bottom: 5px;
-                    background: transparent;
-                }
-            """)
-            empty_layout.addWidget(main_text)
-            
-            # 次要提示文本
-            hint_text = QLabel(get_text('drag_hint_empty'))
-            hint_text.setAlignment(Qt.AlignCenter)
-            hint_text.setStyleSheet("""
-                QLabel {
-                    color: #bbb;
-                    font-size: 12px;
-                    background: transparent;
-                }
-            """)
-            empty_layout.addWidget(hint_text)
-            
-            self.files_layout.addWidget(empty_widget)
-            self.preview_btn_toggle.setEnabled(False)
-        else:
-            is_tensor_mode = get_text('tensor_concat_mode') in self.mode_combo.currentText()
-            
-            for i, file_path in enumerate(self.file_list):
-                filename = os.path.basename(file_path)
-                color = self.file_colors[filename]
-                
-                # 创建文件块
-                block = FileBlockWidget(filename, color, i, self)
-                self.files_layout.addWidget(block)
-                
-                # 在张量模式下添加形状输入
-                if is_tensor_mode:
-                    shape_widget = SmartShapeInput(filename, color, file_path, self)
-                    shape_widget.set_text(self.file_shapes.get(filename, ""))
-                    self.files_layout.addWidget(shape_widget)
-                    self.shape_widgets.append((filename, shape_widget))
-                    
-            self.preview_btn_toggle.setEnabled(True)
-            
-            # 更新所有文件块的索引
-            block_index = 0
-            for i in range(self.files_layout.count()):
-                widget = self.files_layout.itemAt(i).widget()
-                if isinstance(widget, FileBlockWidget):
-                    widget.update_index(block_index)
-                    widget.update_buttons()
-                    widget.update_text()  # 更新按钮文本
-                    block_index += 1
+    def create_empty_widget(self):
+        # 优雅的空状态显示
+        empty_widget = QWidget()
+        empty_layout = QVBoxLayout(empty_widget)
+        empty_layout.setContentsMargins(30, 40, 30, 40)
+        empty_layout.setSpacing(15)
+        
+        # 图标
+        icon_label = QLabel("📁")
+        icon_label.setAlignment(Qt.AlignCenter)
+        icon_label.setStyleSheet("""
+            QLabel {
+                font-size: 48px;
+                color: #ddd;
+                margin-bottom: 10px;
+                background: transparent;
+            }
+        """)
+        empty_layout.addWidget(icon_label)
+        
+        # 主要提示文本
+        self.empty_main_text = QLabel(get_text('no_files_empty'))
+        self.empty_main_text.setAlignment(Qt.AlignCenter)
+        self.empty_main_text.setStyleSheet("""
+            QLabel {
+                color: #999;
+                font-size: 16px;
+                font-weight: 500;
+                margin-bottom: 5px;
+                background: transparent;
+            }
+        """)
+        empty_layout.addWidget(self.empty_main_text)
+        
+        # 次要提示文本
+        self.empty_hint_text = QLabel(get_text('drag_hint_empty'))
+        self.empty_hint_text.setAlignment(Qt.AlignCenter)
+        self.empty_hint_text.setStyleSheet("""
+            QLabel {
+                color: #bbb;
+                font-size: 12px;
+                background: transparent;
+            }
+        """)
+        empty_layout.addWidget(self.empty_hint_text)
+        return empty_widget
+        
+    def update_file_view(self):
+        has_files = self.file_model.rowCount() > 0
+        self.empty_widget.setVisible(not has_files)
+        self.file_view.setVisible(has_files)
+        self.preview_btn_toggle.setEnabled(has_files)
+        self.files_group.setTitle(
+            f"{get_text('file_list')} ({self.file_model.rowCount()})" if has_files else get_text('file_list')
+        )
             
     def on_mode_changed(self):
-        is_tensor_mode = get_text('tensor_concat_mode') in self.mode_combo.currentText()
-        # 显示/隐藏拼接轴控件
-        self.axis_label.setVisible(is_tensor_mode)
-        self.axis_spinbox.setVisible(is_tensor_mode)
-        self.update_file_blocks()
-        self.validate_all()
+        uses_shapes = self.uses_shapes()
+        is_split_mode = self.is_split_mode()
+        is_permute_mode = self.is_permute_mode()
+        # 显示/隐藏拼接轴、拆分方式和维度置换控件
+        self.axis_label.setVisible(uses_shapes and not is_permute_mode)
+        self.axis_spinbox.setVisible(uses_shapes and not is_permute_mode)
+        self.perm_label.setVisible(is_permute_mode)
+        self.perm_input.setVisible(is_permute_mode)
+        self.infer_shape_btn.setVisible(uses_shapes)
+        self.axis_label.setText(get_text('split_axis') if is_split_mode else get_text('concat_axis'))
+        self.split_label.setVisible(is_split_mode)
+        self.split_input.setVisible(is_split_mode)
+        self.compare_ref_btn.setVisible(not self.is_single_file_mode())
+        self.manifest_btn.setVisible(not self.is_single_file_mode())
+        if is_split_mode:
+            self.save_btn.setText(get_text('run_split'))
+        elif is_permute_mode:
+            self.save_btn.setText(get_text('run_permute'))
+        else:
+            self.save_btn.setText(get_text('save_result'))
+        # 行高随模式变化，重新布局列表
+        self.file_view.doItemsLayout()
+        self.revalidate_entries()
         
     def on_config_changed(self):
-        self.validate_all()
+        # 数据类型影响形状状态指示和预览
+        self.file_view.viewport().update()
+        if self.preview_window and self.preview_window.isVisible():
+            self.preview_window.dtype = self.current_dtype()
+            self.preview_window.update_plots()
+        self.revalidate_entries()
         
     def show_preview_window(self):
         if not self.file_list:
             return
             
-        colors = [self.file_colors[os.path.basename(f)] for f in self.file_list]
+        colors = [entry['color'] for entry in self.file_model.entries]
         if self.preview_window is None or not self.preview_window.isVisible():
-            self.preview_window = PreviewWindow(self, self.file_list.copy(), colors)
+            self.preview_window = PreviewWindow(self, self.file_list, colors, self.current_dtype())
             self.preview_window.show()
         else:
             self.preview_window.raise_()
@@ -964,125 +1010,396 @@ class TensorConcatWindow(QDialog):
     def validate_shape(self):
         self.validate_all()
         
+    def check_entry(self, entry):
+        """检查单个文件的形状，返回错误信息（无错误时为None）"""
+        if not self.uses_shapes():
+            return None
+        filename = os.path.basename(entry['path'])
+        shape_text = entry['shape'].strip()
+        if not shape_text:
+            return get_text('file_need_shape').format(filename)
+        try:
+            shape = tuple(map(int, shape_text.split(',')))
+        except ValueError as e:
+            return get_text('file_shape_error').format(filename, str(e))
+            
+        axis = self.axis_spinbox.value()
+        if axis >= len(shape) and not self.is_permute_mode():
+            return get_text('axis_out_of_range').format(axis, filename)
+        dtype = self.current_dtype()
+        expected_elements = int(np.prod(shape))
+        if entry['size'] != expected_elements * dtype.itemsize:
+            return get_text('file_size_mismatch').format(
+                filename, expected_elements, entry['size'] // dtype.itemsize
+            )
+        return None
+        
+    def update_entry_issue(self, entry):
+        """只重新检查一个文件，并更新问题表"""
+        issue = self.check_entry(entry)
+        if issue is None:
+            self.shape_issues.pop(id(entry), None)
+        else:
+            self.shape_issues[id(entry)] = issue
+            
+    def revalidate_entries(self):
+        """数据类型、拼接轴或模式变化时，所有文件都需要重新检查"""
+        self.shape_issues.clear()
+        for entry in self.file_model.entries:
+            self.update_entry_issue(entry)
+        self.validate_all()
+        
+    def on_rows_inserted(self, parent, first, last):
+        for row in range(first, last + 1):
+            self.update_entry_issue(self.file_model.entries[row])
+            
+    def on_rows_about_to_be_removed(self, parent, first, last):
+        for row in range(first, last + 1):
+            self.shape_issues.pop(id(self.file_model.entries[row]), None)
+            
+    def on_data_changed(self, top_left, bottom_right, roles=()):
+        for row in range(top_left.row(), bottom_right.row() + 1):
+            self.update_entry_issue(self.file_model.entries[row])
+        self.validate_all()
+        
+    def set_invalid_status(self, message):
+        self.status_label.setText(message)
+        self.status_label.setStyleSheet("color: #ea4335;")
+        self.preview_btn.setEnabled(False)
+        self.compare_ref_btn.setEnabled(False)
+        self.manifest_btn.setEnabled(False)
+        self.save_btn.setEnabled(False)
+        
     def validate_all(self):
-        if not self.file_list:
-            self.status_label.setText(get_text('add_files'))
-            self.status_label.setStyleSheet("color: #ea4335;")
-            self.preview_btn.setEnabled(False)
+        """汇总状态：逐文件的检查结果已缓存在shape_issues中，这里不再遍历所有文件"""
+        file_count = self.file_model.rowCount()
+        if not file_count:
+            self.set_invalid_status(get_text('add_files'))
             return
             
-        is_tensor_mode = get_text('tensor_concat_mode') in self.mode_combo.currentText()
-        dtype = np.dtype(self.dtype_combo.currentText())
-        
-        if is_tensor_mode:
-            # 检查每个文件的形状
-            axis = self.axis_spinbox.value()
+        if self.is_single_file_mode() and file_count != 1:
+            self.set_invalid_status(get_text('split_need_one_file'))
+            return
             
-            for file_path in self.file_list:
-                filename = os.path.basename(file_path)
-                shape_text = self.file_shapes.get(filename, "").strip()
+        if self.uses_shapes():
+            if self.shape_issues:
+                # 按行顺序报告第一个有问题的文件（只在存在问题时扫描，遇到第一个即停止）
+                issue = next(
+                    (self.shape_issues[id(entry)] for entry in self.file_model.entries
+                     if id(entry) in self.shape_issues),
+                    None
+                )
+                self.set_invalid_status(issue or next(iter(self.shape_issues.values())))
+                return
                 
-                if not shape_text:
-                    self.status_label.setText(get_text('file_need_shape').format(filename))
-                    self.status_label.setStyleSheet("color: #ea4335;")
-                    self.preview_btn.setEnabled(False)
+            axis = self.axis_spinbox.value()
+            if self.is_split_mode():
+                shape = tuple(map(int, self.file_model.shape(0).split(',')))
+                try:
+                    ranges = parse_split_spec(self.split_input.text(), shape[axis])
+                except ValueError as e:
+                    self.set_invalid_status(get_text('split_spec_error').format(str(e)))
+                    self.preview_btn.setEnabled(True)
                     return
-                    
+                self.status_label.setText(get_text('split_ready').format(len(ranges), axis))
+            elif self.is_permute_mode():
+                shape = tuple(map(int, self.file_model.shape(0).split(',')))
                 try:
-                    shape = tuple(map(int, shape_text.split(',')))
-                    
-                    if axis >= len(shape):
-                        self.status_label.setText(get_text('axis_out_of_range').format(axis, filename))
-                        self.status_label.setStyleSheet("color: #ea4335;")
-                        self.preview_btn.setEnabled(False)
-                        return
-                        
-                    expected_size = np.prod(shape) * dtype.itemsize
-                    file_size = os.path.getsize(file_path)
-                    if file_size != expected_size:
-                        actual_elements = file_size // dtype.itemsize
-                        expected_elements = np.prod(shape)
-                        self.status_label.setText(
-                            get_text('file_size_mismatch').format(filename, expected_elements, actual_elements)
-                        )
-                        self.status_label.setStyleSheet("color: #ea4335;")
-                        self.preview_btn.setEnabled(False)
-                        return
-                        
+                    perm = parse_permutation(self.perm_input.text(), len(shape))
                 except ValueError as e:
-                    self.status_label.setText(get_text('file_shape_error').format(filename, str(e)))
-                    self.status_label.setStyleSheet("color: #ea4335;")
-                    self.preview_btn.setEnabled(False)
+                    self.set_invalid_status(get_text('permutation_error').format(str(e)))
+                    self.preview_btn.setEnabled(True)
                     return
-                    
-            self.status_label.setText(
-                get_text('files_ready').format(len(self.file_list)) + "\n" +
-                get_text('tensor_mode').format(axis)
-            )
+                self.status_label.setText(
+                    get_text('permute_ready').format(shape, tuple(shape[p] for p in perm))
+                )
+            else:
+                self.status_label.setText(
+                    get_text('files_ready').format(file_count) + "\n" +
+                    get_text('tensor_mode').format(axis)
+                )
         else:
             # 简单模式
             self.status_label.setText(
-                get_text('files_ready').format(len(self.file_list)) + "\n" +
+                get_text('files_ready').format(file_count) + "\n" +
                 get_text('simple_mode')
             )
             
         self.status_label.setStyleSheet("color: #34a853;")
         self.preview_btn.setEnabled(True)
+        self.compare_ref_btn.setEnabled(self.compare_worker is None and not self.is_single_file_mode())
+        self.manifest_btn.setEnabled(not self.is_single_file_mode())
+        self.save_btn.setEnabled(self.save_worker is None)
+        
+    def sibling_shapes(self, exclude_row=None):
+        """其他文件已填写的形状（去重），用于推断候选形状"""
+        shapes = {}
+        for row, entry in enumerate(self.file_model.entries):
+            if row != exclude_row and entry['shape'] and id(entry) not in self.shape_issues:
+                shapes[entry['shape']] = None
+        return [tuple(map(int, text.split(','))) for text in shapes]
+        
+    def shape_candidates(self, row):
+        """某个文件的候选形状文本"""
+        entry = self.file_model.entries[row]
+        return [
+            format_shape(shape) for shape in candidate_shapes(
+                entry['size'], self.current_dtype(), self.axis_spinbox.value(),
+                self.sibling_shapes(exclude_row=row)
+            )
+        ]
+        
+    def infer_missing_shapes(self):
+        """为所有未填写形状的文件填入第一个候选形状"""
+        siblings = self.sibling_shapes()
+        dtype = self.current_dtype()
+        axis = self.axis_spinbox.value()
+        for row, entry in enumerate(self.file_model.entries):
+            if entry['shape']:
+                continue
+            candidates = candidate_shapes(entry['size'], dtype, axis, siblings)
+            if candidates:
+                self.file_model.setData(self.file_model.index(row), format_shape(candidates[0]))
             
+    def get_concat_plan(self):
+        """当前配置下的拼接参数：(dtype, shapes, axis)，简单模式下shapes为None"""
+        dtype = self.current_dtype()
+        if not self.uses_shapes():
+            return dtype, None, 0
+        shapes = [tuple(map(int, entry['shape'].split(','))) for entry in self.file_model.entries]
+        return dtype, shapes, self.axis_spinbox.value()
+        
     def preview_concat(self):
         try:
-            dtype = np.dtype(self.dtype_combo.currentText())
-            is_tensor_mode = get_text('tensor_concat_mode') in self.mode_combo.currentText()
+            dtype, shapes, axis = self.get_concat_plan()
             
-            data_arrays = []
-            for file_path in self.file_list:
-                data = bin_utils.read_bin_file(file_path, dtype=dtype)
-                data_arrays.append(data)
-                
-            if is_tensor_mode:
-                axis = self.axis_spinbox.value()
-                tensors = []
-                
-                for i, (file_path, data) in enumerate(zip(self.file_list, data_arrays)):
-                    filename = os.path.basename(file_path)
-                    shape_text = self.file_shapes[filename]
-                    shape = tuple(map(int, shape_text.split(',')))
-                    tensor = data.reshape(shape)
-                    tensors.append(tensor)
-                    
-                self.result_tensor = np.concatenate(tensors, axis=axis)
-                
-                # 显示结果预览窗口
-                result_window = ResultPreviewWindow(self, self.result_tensor, "Tensor Concatenation Result")
-                result_window.exec_()
-            else:
-                self.result_tensor = np.concatenate(data_arrays, axis=0)
-                
-                # 显示结果预览窗口
-                result_window = ResultPreviewWindow(self, self.result_tensor, "Simple Concatenation Result")
-                result_window.exec_()
-                
-            self.save_btn.setEnabled(True)
+            # 虚拟拼接：不读入也不分配结果，预览时只读取被采样到的元素
+            self.result_tensor = VirtualConcatTensor(self.file_list, dtype, shapes, axis)
+            title = "Tensor Concatenation Result" if shapes is not None else "Simple Concatenation Result"
+            
+            # 显示结果预览窗口
+            result_window = ResultPreviewWindow(self, self.result_tensor, title)
+            result_window.exec_()
             
         except Exception as e:
             QMessageBox.critical(self, get_text('concat_failed'), f"{get_text('error')}: {str(e)}")
             
+    def compare_with_reference(self):
+        """把当前拼接结果（虚拟）与一个参考文件做流式对比"""
+        if not self.file_list or self.compare_worker is not None:
+            return
+        try:
+            dtype, shapes, axis = self.get_concat_plan()
+        except ValueError as e:
+            QMessageBox.critical(self, get_text('concat_failed'), f"{get_text('error')}: {str(e)}")
+            return
+            
+        reference_path, _ = QFileDialog.getOpenFileName(
+            self, get_text('select_reference_file'), "", "BIN Files (*.bin);;All Files (*)"
+        )
+        if not reference_path:
+            return
+            
+        worker = VirtualCompareWorker(reference_path, self.file_list, dtype, shapes, axis)
+        worker.progress.connect(lambda p: self.status_label.setText(get_text('comparing').format(p)))
+        worker.result_ready.connect(lambda result: self.on_compare_finished(reference_path, result))
+        worker.failed.connect(self.on_compare_failed)
+        worker.finished.connect(lambda: _running_workers.discard(worker))
+        _running_workers.add(worker)
+        self.compare_worker = worker
+        self.compare_ref_btn.setEnabled(False)
+        worker.start()
+        
+    def on_compare_finished(self, reference_path, result):
+        self.compare_worker = None
+        self.validate_all()
+        QMessageBox.information(
+            self, get_text('compare_with_reference'),
+            get_text('virtual_compare_result').format(
+                os.path.basename(reference_path), result['compared_length'],
+                result['reference_length'], result['concat_length'],
+                result['cosine_similarity'], result['mse'], result['mae'],
+                result['max_abs_error'], result['scale']
+            )
+        )
+        
+    def on_compare_failed(self, message):
+        self.compare_worker = None
+        self.validate_all()
+        QMessageBox.critical(self, get_text('error'), get_text('calc_error').format(message))
+        
     def save_result(self):
-        if self.result_tensor is None:
+        """流式拼接直接写入目标文件（不依赖预览结果，内存占用与文件大小无关）"""
+        if not self.file_list or self.save_worker is not None:
+            return
+        if self.is_split_mode():
+            self.run_split()
+            return
+        if self.is_permute_mode():
+            self.run_permute()
+            return
+        try:
+            dtype, shapes, axis = self.get_concat_plan()
+        except (KeyError, ValueError) as e:
+            QMessageBox.critical(self, get_text('concat_failed'), f"{get_text('error')}: {str(e)}")
             return
             
         file_path, _ = QFileDialog.getSaveFileName(
             self, get_text('save_concat_result'), "concatenated.bin", "BIN Files (*.bin);;All Files (*)"
         )
+        if not file_path:
+            return
+        if os.path.abspath(file_path) in [os.path.abspath(f) for f in self.file_list]:
+            QMessageBox.critical(self, get_text('save_failed'), get_text('save_overwrites_input'))
+            return
+            
+        worker = ConcatSaveWorker(list(self.file_list), file_path, dtype, shapes, axis)
+        worker.progress.connect(lambda p: self.status_label.setText(get_text('saving_progress').format(p)))
+        worker.result_ready.connect(lambda shape: self.on_save_finished(file_path, shape, dtype))
+        worker.failed.connect(self.on_save_failed)
+        worker.finished.connect(lambda: _running_workers.discard(worker))
+        _running_workers.add(worker)
+        self.save_worker = worker
+        self.save_btn.setEnabled(False)
+        worker.start()
         
-        if file_path:
-            try:
-                self.result_tensor.tofile(file_path)
-                QMessageBox.information(
-                    self, get_text('save_success'), 
-                    get_text('result_saved').format(
-                        file_path, self.result_tensor.shape, self.result_tensor.nbytes
-                    )
-                )
-            except Exception as e:
-                QMessageBox.critical(self, get_text('save_failed'), f"{get_text('error')}: {str(e)}")
\ No newline at end of file
+    def save_to_manifest(self):
+        """把当前拼接配置作为一个任务写入JSON清单，之后可用 python -m src.concat_manifest 批量执行"""
+        if not self.file_list:
+            return
+        try:
+            dtype, shapes, axis = self.get_concat_plan()
+        except (KeyError, ValueError) as e:
+            QMessageBox.critical(self, get_text('concat_failed'), f"{get_text('error')}: {str(e)}")
+            return
+            
+        output_path, _ = QFileDialog.getSaveFileName(
+            self, get_text('save_concat_result'), "concatenated.bin", "BIN Files (*.bin);;All Files (*)"
+        )
+        if not output_path:
+            return
+        if os.path.abspath(output_path) in [os.path.abspath(f) for f in self.file_list]:
+            QMessageBox.critical(self, get_text('save_failed'), get_text('save_overwrites_input'))
+            return
+        manifest_path, _ = QFileDialog.getSaveFileName(
+            self, get_text('save_manifest'),
+            os.path.join(os.path.dirname(output_path), "concat_manifest.json"),
+            "JSON Files (*.json);;All Files (*)", options=QFileDialog.DontConfirmOverwrite
+        )
+        if not manifest_path:
+            return
+            
+        try:
+            job_count = add_job_to_manifest(
+                manifest_path, make_job(self.file_list, output_path, dtype, shapes, axis)
+            )
+        except (OSError, ValueError) as e:
+            QMessageBox.critical(self, get_text('save_failed'), f"{get_text('error')}: {str(e)}")
+            return
+        QMessageBox.information(
+            self, get_text('save_success'),
+            get_text('manifest_saved').format(manifest_path, job_count)
+        )
+        
+    def run_split(self):
+        """把唯一的输入文件按拆分方式流式写成多个分片"""
+        try:
+            dtype, shapes, axis = self.get_concat_plan()
+            shape = shapes[0]
+            ranges = parse_split_spec(self.split_input.text(), shape[axis])
+        except (IndexError, ValueError) as e:
+            QMessageBox.critical(self, get_text('split_failed'), f"{get_text('error')}: {str(e)}")
+            return
+            
+        source_path = self.file_list[0]
+        out_dir = QFileDialog.getExistingDirectory(
+            self, get_text('select_output_dir'), os.path.dirname(source_path)
+        )
+        if not out_dir:
+            return
+        stem = os.path.splitext(os.path.basename(source_path))[0]
+        out_paths = [
+            os.path.join(out_dir, f"{stem}_axis{axis}_{start}-{stop}.bin") for start, stop in ranges
+        ]
+        if os.path.abspath(source_path) in [os.path.abspath(p) for p in out_paths]:
+            QMessageBox.critical(self, get_text('save_failed'), get_text('save_overwrites_input'))
+            return
+            
+        worker = SplitWorker(source_path, dtype, shape, axis, ranges, out_paths)
+        worker.progress.connect(lambda p: self.status_label.setText(get_text('saving_progress').format(p)))
+        worker.result_ready.connect(lambda out_shapes: self.on_split_finished(out_dir, out_shapes))
+        worker.failed.connect(self.on_save_failed)
+        worker.finished.connect(lambda: _running_workers.discard(worker))
+        _running_workers.add(worker)
+        self.save_worker = worker
+        self.save_btn.setEnabled(False)
+        worker.start()
+        
+    def run_permute(self):
+        """把唯一的输入文件按维度置换写入新文件"""
+        try:
+            dtype, shapes, _ = self.get_concat_plan()
+            shape = shapes[0]
+            perm = parse_permutation(self.perm_input.text(), len(shape))
+        except (IndexError, ValueError) as e:
+            QMessageBox.critical(self, get_text('permute_failed'), f"{get_text('error')}: {str(e)}")
+            return
+            
+        source_path = self.file_list[0]
+        stem = os.path.splitext(os.path.basename(source_path))[0]
+        default_name = os.path.join(
+            os.path.dirname(source_path), f"{stem}_perm{''.join(map(str, perm))}.bin"
+        )
+        file_path, _ = QFileDialog.getSaveFileName(
+            self, get_text('save_concat_result'), default_name, "BIN Files (*.bin);;All Files (*)"
+        )
+        if not file_path:
+            return
+        if os.path.abspath(file_path) == os.path.abspath(source_path):
+            QMessageBox.critical(self, get_text('save_failed'), get_text('save_overwrites_input'))
+            return
+            
+        worker = PermuteWorker(source_path, dtype, shape, perm, file_path)
+        worker.progress.connect(lambda p: self.status_label.setText(get_text('saving_progress').format(p)))
+        worker.result_ready.connect(lambda out_shape: self.on_save_finished(file_path, out_shape, dtype))
+        worker.failed.connect(self.on_save_failed)
+        worker.finished.connect(lambda: _running_workers.discard(worker))
+        _running_workers.add(worker)
+        self.save_worker = worker
+        self.save_btn.setEnabled(False)
+        worker.start()
+        
+    def on_split_finished(self, out_dir, out_shapes):
+        self.save_worker = None
+        self.validate_all()
+        QMessageBox.information(
+            self, get_text('save_success'),
+            get_text('split_saved').format(len(out_shapes), out_dir, out_shapes[0])
+        )
+        
+    def on_save_finished(self, file_path, shape, dtype):
+        self.save_worker = None
+        self.validate_all()
+        QMessageBox.information(
+            self, get_text('save_success'), 
+            get_text('result_saved').format(
+                file_path, shape, int(np.prod(shape)) * dtype.itemsize
+            )
+        )
+        
+    def on_save_failed(self, message):
+        self.save_worker = None
+        self.validate_all()
+        QMessageBox.critical(self, get_text('save_failed'), f"{get_text('error')}: {message}")
+        
+    def closeEvent(self, event):
+        # 关闭窗口时取消未完成的保存和对比（临时文件由拼接函数清理）
+        for worker in (self.save_worker, self.compare_worker):
+            if worker is not None:
+                worker.requestInterruption()
+                worker.progress.disconnect()
+                worker.result_ready.disconnect()
+                worker.failed.disconnect()
+        self.save_worker = None
+        self.compare_worker = None
+        super().closeEvent(event)
@@ -0,0 +1,345 @@
+# 张量切片视图与二维热力图的瓦片金字塔（按需从memmap计算min/max/mean聚合，瓦片存放在共享数组缓存中）
+import itertools
+import weakref
+import numpy as np
+from .bin_utils import handle_invalid_values
+from .config import Config
+from . import cache_manager
+from .layout_utils import PermutedView
+
+# 每个瓦片的通道顺序
+AGGREGATES = ('mean', 'min', 'max')
+# 差异视图的计算方式：绝对误差 |a-b|，对称相对误差 |a-b| / max(|a|, |b|)
+DIFF_MODES = ('abs', 'rel')
+
+class TileCancelled(Exception):
+    """瓦片计算被中途放弃（已算完的子瓦片仍保留在缓存中）"""
+    pass
+
+def slice_view(data, shape, axes, fixed=None):
+    """
+    把一维数据按shape看作张量，取出axes组成的跨步视图（不拷贝），维度按axes给出的顺序排列
+    （如两个维度时为(行, 列)），其余维度取fixed中给定的下标（默认0）
+    """
+    shape = tuple(int(d) for d in shape)
+    axes = tuple(int(a) for a in axes)
+    if not axes:
+        raise ValueError("至少需要选择一个维度")
+    if len(set(axes)) != len(axes):
+        raise ValueError("行维度和列维度不能相同")
+    for axis in axes:
+        if not 0 <= axis < len(shape):
+            raise ValueError(f"维度 {axis} 超出范围（张量维度为 {len(shape)}）")
+    if isinstance(data, DifferenceView):
+        return DifferenceView(slice_view(data.a, shape, axes, fixed),
+                              slice_view(data.b, shape, axes, fixed), data.mode)
+    fixed = fixed or {}
+    index = []
+    for axis in range(len(shape)):
+        if axis in axes:
+            index.append(slice(None))
+            continue
+        i = int(fixed.get(axis, 0))
+        if not 0 <= i < shape[axis]:
+            raise ValueError(f"维度 {axis} 的下标 {i} 超出范围（长度为 {shape[axis]}）")
+        index.append(i)
+    view = _tensor_view(data, shape)[tuple(index)]
+    order = sorted(axes)
+    perm = tuple(order.index(axis) for axis in axes)
+    return view if perm == tuple(range(len(axes))) else view.transpose(perm)
+
+def _tensor_view(data, shape):
+    """
+    把一维数据看作shape形状的张量（不拷贝）：完整的置换视图按置换后的形状直接取底层跨步视图，
+    其他形状或部分置换视图（如偏移对齐后）用FlatTensorView惰性换算下标
+    """
+    if isinstance(data, PermutedView):
+        if shape == data.view.shape and len(data) == data.view.size:
+            return data.view
+        if int(np.prod(shape)) != len(data):
+            raise ValueError(f"形状 {shape} 与数据长度 {len(data)} 不匹配")
+        return FlatTensorView(data, shape)
+    return np.asarray(data).reshape(shape)
+
+class FlatTensorView:
+    """
+    把支持整数数组索引的一维序列（如PermutedView）看作张量的惰性视图：
+    记录 (offset, shape, strides)，取下标、切片、转置只改变这些参数，
+    np.asarray()时才换算出展平位置并从序列中读出对应元素
+    """
+    def __init__(self, data, shape, offset=0, strides=None):
+        self.data = data
+        self.shape = tuple(int(d) for d in shape)
+        self.offset = int(offset)
+        if strides is None:
+            strides = [1] * len(self.shape)
+            for axis in range(len(self.shape) - 2, -1, -1):
+                strides[axis] = strides[axis + 1] * self.shape[axis + 1]
+        self.strides = tuple(int(st) for st in strides)
+        self.dtype = data.dtype
+
+    @property
+    def ndim(self):
+        return len(self.shape)
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __getitem__(self, key):
+        key = key if isinstance(key, tuple) else (key,)
+        if len(key) > self.ndim:
+            raise IndexError(f"下标维数 {len(key)} 超过张量维度 {self.ndim}")
+        key = key + (slice(None),) * (self.ndim - len(key))
+        offset, shape, strides = self.offset, [], []
+        for k, n, st in zip(key, self.shape, self.strides):
+            if isinstance(k, slice):
+                start, stop, step = k.indices(n)
+                offset += start * st
+                shape.append(len(range(start, stop, step)))
+                strides.append(st * step)
+            else:
+                i = int(k)
+                if i < 0:
+                    i += n
+                if not 0 <= i < n:
+                    raise IndexError(f"下标 {k} 超出范围（长度为 {n}）")
+                offset += i * st
+        if not shape:
+            return self.data[offset]
+        return FlatTensorView(self.data, shape, offset, strides)
+
+    def transpose(self, axes):
+        return FlatTensorView(self.data, [self.shape[a] for a in axes], self.offset,
+                              [self.strides[a] for a in axes])
+
+    @property
+    def T(self):
+        return self.transpose(tuple(range(self.ndim))[::-1])
+
+    def __array__(self, dtype=None, copy=None):
+        index = np.full(self.shape, self.offset, dtype=np.int64)
+        for axis, (n, st) in enumerate(zip(self.shape, self.strides)):
+            index += (np.arange(n, dtype=np.int64) * st).reshape((-1,) + (1,) * (self.ndim - axis - 1))
+        data = np.asarray(self.data[index.reshape(-1)]).reshape(self.shape)
+        return data if dtype is None else data.astype(dtype)
+
+class DifferenceView:
+    """
+    两个同形状数据逐元素差异的惰性视图：取切片时才从两边读取同一区域并计算，
+    不会整体读出任何一方；支持按形状取切片（见slice_view）和转置。
+    任一方为NaN/Inf且两边不相同的位置差异记为+inf（两边是同一个Inf或都是NaN时记为0），
+    不会被当作0而隐藏
+    """
+    def __init__(self, a, b, mode='abs'):
+        if len(a) != len(b):
+            raise ValueError(f"两个数据的长度不一致: {len(a)} vs {len(b)}")
+        if mode not in DIFF_MODES:
+            raise ValueError(f"未知的差异方式: {mode}")
+        self.a, self.b, self.mode = a, b, mode
+        self.shape = a.shape
+        self.dtype = np.dtype(np.float32)
+
+    def __len__(self):
+        return len(self.a)
+
+    def transpose(self, axes):
+        return DifferenceView(self.a.transpose(axes), self.b.transpose(axes), self.mode)
+
+    @property
+    def T(self):
+        return DifferenceView(self.a.T, self.b.T, self.mode)
+
+    def __getitem__(self, key):
+        a = np.asarray(self.a[key], dtype=np.float32)
+        b = np.asarray(self.b[key], dtype=np.float32)
+        with np.errstate(invalid='ignore', over='ignore'):
+            diff = np.abs(a - b)
+            if self.mode == 'rel':
+                scale = np.maximum(np.abs(a), np.abs(b))
+                # 两边都为0时相对误差记为0
+                diff = np.divide(diff, scale, out=np.zeros_like(diff), where=scale > 0)
+        bad = ~(np.isfinite(a) & np.isfinite(b))
+        if bad.any():
+            same = (a[bad] == b[bad]) | (np.isnan(a[bad]) & np.isnan(b[bad]))
+            diff[bad] = np.where(same, 0.0, np.inf)
+        return diff
+
+def _pixel_coverage(n, k, first_pixel, count):
+    """沿一个方向：从first_pixel开始的count个像素各覆盖多少个源元素（每像素k个，末尾可能不足）"""
+    starts = (first_pixel + np.arange(count, dtype=np.int64)) * k
+    return np.clip(n - starts, 0, k).astype(np.float64)
+
+class TilePyramid:
+    """
+    二维数据的多级瓦片：第L级每个像素聚合源数据中 2^L × 2^L 的块，
+    每个瓦片 tile_size × tile_size 像素，内容为 (mean, min, max) 三个通道。
+    瓦片按需计算：小范围直接从源数据读取归约，大范围由下一级的4个子瓦片合并，
+    因此放大时复用已算好的结果，整个金字塔对每个源元素最多只读一次。
+    """
+    _ids = itertools.count()
+
+    def __init__(self, plane, tile_size=None):
+        self.plane = plane
+        self.rows, self.cols = plane.shape
+        self.tile_size = tile_size or Config.HEATMAP_TILE
+        span = max(self.rows, self.cols) / self.tile_size
+        self.max_level = max(0, int(np.ceil(np.log2(span)))) if span > 1 else 0
+        self._overview = None
+        # 瓦片与其他窗口的数据共用一个字节预算；金字塔被回收时释放它的瓦片
+        self._id = next(self._ids)
+        self._cache = cache_manager.get_cache()
+        weakref.finalize(self, self._cache.discard, lambda key, pid=self._id: key[:2] == ('tile', pid))
+
+    def grid(self, level):
+        """第level级的瓦片行列数"""
+        span = self.tile_size << level
+        return -(-self.rows // span), -(-self.cols // span)
+
+    def tile_bounds(self, level, ty, tx):
+        """瓦片覆盖的源数据区域 (r0, r1, c0, c1)"""
+        span = self.tile_size << level
+        r0, c0 = ty * span, tx * span
+        return r0, min(self.rows, r0 + span), c0, min(self.cols, c0 + span)
+
+    def cached(self, key):
+        """已缓存的瓦片，key = (level, ty, tx)，未缓存时返回None"""
+        return self._cache.get(('tile', self._id) + key)
+
+    def _store(self, key, tile):
+        self._cache.put(('tile', self._id) + key, tile)
+
+    def tile(self, level, ty, tx, cancel_check=None):
+        """取瓦片 (3, h, w) float32，未缓存时计算"""
+        key = (level, ty, tx)
+        tile = self.cached(key)
+        if tile is None:
+            if cancel_check and cancel_check():
+                raise TileCancelled()
+            tile = self._compute(level, ty, tx, cancel_check)
+            self._store(key, tile)
+        return tile
+
+    def _compute(self, level, ty, tx, cancel_check):
+        r0, r1, c0, c1 = self.tile_bounds(level, ty, tx)
+        if level == 0 or (r1 - r0) * (c1 - c0) <= Config.HEATMAP_DIRECT_ELEMENTS:
+            block = self._read(np.s_[r0:r1, c0:c1])
+            return self._reduce_source(block, 1 << level)
+
+        # 由下一级的子瓦片拼接后再做2×2归约
+        child_rows, child_cols = self.grid(level - 1)
+        rows = []
+        for cy in (2 * ty, 2 * ty + 1):
+            if cy >= child_rows:
+                continue
+            row = [self.tile(level - 1, cy, cx, cancel_check)
+                   for cx in (2 * tx, 2 * tx + 1) if cx < child_cols]
+            rows.append(np.concatenate(row, axis=2))
+        mosaic = np.concatenate(rows, axis=1)
+        k = 1 << (level - 1)
+        first_y, first_x = 2 * ty * self.tile_size, 2 * tx * self.tile_size
+        weights = np.outer(
+            _pixel_coverage(self.rows, k, first_y, mosaic.shape[1]),
+            _pixel_coverage(self.cols, k, first_x, mosaic.shape[2])
+        )
+        mean, vmin, vmax = mosaic
+        return np.stack([
+            self._block_reduce(mean * weights, 2, np.add) / self._block_reduce(weights, 2, np.add),
+            self._block_reduce(vmin, 2, np.minimum),
+            self._block_reduce(vmax, 2, np.maximum),
+        ]).astype(np.float32)
+
+    def _read(self, index):
+        """
+        读出源数据的一块为float32：普通数据的NaN/Inf替换为0；
+        差异视图保留+inf（不匹配的非有限值），经min/max/mean归约后仍为+inf，显示时单独着色
+        """
+        block = np.array(self.plane[index], dtype=np.float32)
+        if isinstance(self.plane, DifferenceView):
+            return block
+        return handle_invalid_values(block, copy=False)
+
+    @staticmethod
+    def _block_reduce(values, k, ufunc):
+        """
+        二维数组按 k × k 块归约（ufunc为np.add/np.minimum/np.maximum）。
+        先沿块内的行方向归约（整行连续访问，向量化效率高），再在缩小k倍的结果上归约块内的列；
+        末尾不足k的块补齐：求和补0，最小/最大值补边缘值（不影响结果）
+        """
+        h, w = values.shape
+        out_h, out_w = -(-h // k), -(-w // k)
+        if out_h * k != h or out_w * k != w:
+            mode = 'constant' if ufunc is np.add else 'edge'
+            values = np.pad(values, ((0, out_h * k - h), (0, out_w * k - w)), mode=mode)
+        dtype = np.float64 if ufunc is np.add else None
+        rows = ufunc.reduce(values.reshape(out_h, k, out_w * k), axis=1, dtype=dtype)
+        return ufunc.reduce(rows.reshape(out_h, out_w, k), axis=2)
+
+    @classmethod
+    def _reduce_source(cls, block, k):
+        """源数据按 k × k 块归约为 (mean, min, max)"""
+        if k == 1:
+            return np.stack([block, block, block])
+        count = np.outer(_pixel_coverage(block.shape[0], k, 0, -(-block.shape[0] // k)),
+                         _pixel_coverage(block.shape[1], k, 0, -(-block.shape[1] // k)))
+        return np.stack([
+            cls._block_reduce(block, k, np.add) / count,
+            cls._block_reduce(block, k, np.minimum),
+            cls._block_reduce(block, k, np.maximum),
+        ]).astype(np.float32)
+
+    def overview(self):
+        """整个平面的跨步采样缩略图（瓦片未算好时作为占位显示），返回(image, row_step, col_step)"""
+        if self._overview is None:
+            pixels = Config.HEATMAP_OVERVIEW_PIXELS
+            row_step = max(1, -(-self.rows // pixels))
+            col_step = max(1, -(-self.cols // pixels))
+            image = self._read(np.s_[::row_step, ::col_step])
+            self._overview = (image, row_step, col_step)
+        return self._overview
+
+    def level_for(self, source_per_pixel):
+        """屏幕上一个像素对应source_per_pixel个源元素时使用的级别"""
+        if source_per_pixel <= 1:
+            return 0
+        return int(min(self.max_level, np.floor(np.log2(source_per_pixel))))
+
+    def render(self, x0, x1, y0, y1, width_px, height_px, aggregate='mean'):
+        """
+        拼出覆盖可见区域 [x0, x1) × [y0, y1)（源数据列/行坐标）的图像：
+        已缓存的瓦片直接使用，缺失的瓦片用缩略图填充并返回其键以便后台计算
+        :return: (image, extent, level, missing_keys)，extent为imshow的(left, right, bottom, top)
+        """
+        level = self.level_for(max((x1 - x0) / max(1, width_px), (y1 - y0) / max(1, height_px)))
+        k = 1 << level
+        span = self.tile_size * k
+        grid_rows, grid_cols = self.grid(level)
+        ty0 = int(np.clip(np.floor(y0 / span), 0, grid_rows - 1))
+        ty1 = int(np.clip(np.floor((y1 - 1) / span), ty0, grid_rows - 1))
+        tx0 = int(np.clip(np.floor(x0 / span), 0, grid_cols - 1))
+        tx1 = int(np.clip(np.floor((x1 - 1) / span), tx0, grid_cols - 1))
+
+        # 图像像素范围（第level级的像素坐标）
+        py0, px0 = ty0 * self.tile_size, tx0 * self.tile_size
+        py1 = -(-min(self.rows, (ty1 + 1) * span) // k)
+        px1 = -(-min(self.cols, (tx1 + 1) * span) // k)
+        channel = AGGREGATES.index(aggregate)
+
+        # 先用缩略图按最近邻填满，再覆盖已缓存的瓦片
+        preview, row_step, col_step = self.overview()
+        src_rows = np.minimum((np.arange(py0, py1) * k + k // 2) // row_step, preview.shape[0] - 1)
+        src_cols = np.minimum((np.arange(px0, px1) * k + k // 2) // col_step, preview.shape[1] - 1)
+        image = preview[np.ix_(src_rows, src_cols)].copy()
+
+        missing = []
+        for ty in range(ty0, ty1 + 1):
+            for tx in range(tx0, tx1 + 1):
+                tile = self.cached((level, ty, tx))
+                if tile is None:
+                    missing.append((level, ty, tx))
+                    continue
+                oy = ty * self.tile_size - py0
+                ox = tx * self.tile_size - px0
+                image[oy:oy + tile.shape[1], ox:ox + tile.shape[2]] = tile[channel]
+
+        extent = (px0 * k - 0.5, px1 * k - 0.5, py1 * k - 0.5, py0 * k - 0.5)
+        return image, extent, level, missing
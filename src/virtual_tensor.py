@@ -0,0 +1,127 @@
+# 虚拟拼接张量（零拷贝：访问时才按索引映射到各输入memmap读取）
+import numpy as np
+from .concat_utils import concat_output_shape, slab_view
+from . import cache_manager, io_manager
+
+class VirtualConcatTensor:
+    """
+    多个bin文件沿任意轴拼接后的虚拟张量，不分配也不写出结果。
+    对外表现为按C顺序展平的一维序列（len/切片/迭代块），可直接用于
+    降采样预览和流式指标计算；shape/ndim描述拼接后的逻辑形状。
+    内部把每个输入看作二维 (outer, shape[axis] * inner)，输出的每一行
+    由各输入对应行按列依次拼接而成。
+    """
+    def __init__(self, file_paths, dtype="float32", shapes=None, axis=0):
+        self.file_paths = list(file_paths)
+        self.dtype = np.dtype(dtype)
+        # 各输入并行打开（网络存储上每个文件的元数据访问都有往返延迟）
+        sources = io_manager.map_files(cache_manager.open_memmap, self.file_paths, self.dtype)
+        if shapes is None:
+            shapes = [(len(src),) for src in sources]
+            axis = 0
+        self.shapes = [tuple(int(d) for d in shape) for shape in shapes]
+        self.axis = axis
+        for path, src, shape in zip(self.file_paths, sources, self.shapes):
+            if int(np.prod(shape, dtype=np.int64)) != len(src):
+                raise ValueError(f"文件大小与形状不匹配：{path}，形状 {shape}，实际 {len(src)} 个元素")
+
+        self.shape = concat_output_shape(self.shapes, axis)
+        self.outer, self.width = slab_view(self.shape, axis)
+        widths = [slab_view(shape, axis)[1] for shape in self.shapes]
+        self.sources = [src.reshape(self.outer, w) for src, w in zip(sources, widths)]
+        # 每个输入在输出行中的起始列
+        self.col_offsets = np.concatenate(([0], np.cumsum(widths))).astype(np.int64)
+
+    @property
+    def ndim(self):
+        return len(self.shape)
+
+    @property
+    def size(self):
+        return self.outer * self.width
+
+    @property
+    def nbytes(self):
+        return self.size * self.dtype.itemsize
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, key):
+        """支持整数和切片（展平索引），返回ndarray"""
+        if isinstance(key, slice):
+            start, stop, step = key.indices(self.size)
+            if step == 1:
+                return self._read_contiguous(start, max(start, stop))
+            return self.take(np.arange(start, stop, step, dtype=np.int64))
+        index = int(key)
+        if index < 0:
+            index += self.size
+        if not 0 <= index < self.size:
+            raise IndexError(f"索引 {key} 超出范围（长度 {self.size}）")
+        return self.take(np.array([index], dtype=np.int64))[0]
+
+    def take(self, indices):
+        """按展平索引取任意位置的元素（只读取被访问的元素）"""
+        indices = np.asarray(indices, dtype=np.int64)
+        out = np.empty(len(indices), dtype=self.dtype)
+        rows, cols = np.divmod(indices, self.width)
+        which = np.searchsorted(self.col_offsets, cols, side='right') - 1
+
+        def gather(k):
+            mask = which == k
+            if mask.any():
+                out[mask] = self.sources[k][rows[mask], cols[mask] - self.col_offsets[k]]
+
+        # 各输入写入out中互不重叠的位置，可由共享I/O线程池并行读取
+        self._for_each_source(gather)
+        return out
+
+    def _for_each_source(self, fn):
+        """对每个输入执行fn(k)：多个输入时并行，单个输入时直接执行"""
+        if len(self.sources) == 1:
+            fn(0)
+            return
+        for future in [io_manager.submit(path, fn, k) for k, path in enumerate(self.file_paths)]:
+            future.result()
+
+    def _read_row_segment(self, out, row, c0, c1):
+        """把输出第row行的[c0, c1)列写入out"""
+        pos = 0
+        for k, src in enumerate(self.sources):
+            lo = max(c0, self.col_offsets[k])
+            hi = min(c1, self.col_offsets[k + 1])
+            if lo < hi:
+                out[pos:pos + hi - lo] = src[row, lo - self.col_offsets[k]:hi - self.col_offsets[k]]
+                pos += hi - lo
+
+    def _read_contiguous(self, start, stop):
+        """读取展平区间[start, stop)：首尾不完整的行单独处理，中间整行按输入成块拷贝"""
+        out = np.empty(stop - start, dtype=self.dtype)
+        if stop <= start:
+            return out
+        r0, c0 = divmod(start, self.width)
+        r1, c1 = divmod(stop, self.width)
+        if r0 == r1:
+            self._read_row_segment(out, r0, c0, c1)
+            return out
+
+        pos = 0
+        if c0:
+            self._read_row_segment(out[:self.width - c0], r0, c0, self.width)
+            pos = self.width - c0
+            r0 += 1
+        if r1 > r0:
+            block = out[pos:pos + (r1 - r0) * self.width].reshape(r1 - r0, self.width)
+            def copy_rows(k, r0=r0):
+                block[:, self.col_offsets[k]:self.col_offsets[k + 1]] = self.sources[k][r0:r1]
+            self._for_each_source(copy_rows)
+            pos += (r1 - r0) * self.width
+        if c1:
+            self._read_row_segment(out[pos:], r1, 0, c1)
+        return out
+
+    def decimate(self, max_points):
+        """等间隔取约max_points个点用于预览，返回(step, values)"""
+        step = max(1, -(-self.size // max(1, int(max_points))))
+        return step, self[::step]
@@ -1,5 +1,20 @@
-# 窗口管理器
+# 窗口管理器（含内存预算：统计各窗口常驻数组和图像缓冲区，超出预算时降低后台窗口的内存占用）
+import numpy as np
 from PyQt5.QtWidgets import QApplication
+from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+from .config import Config
+from . import cache_manager
+
+# 后台窗口的降级级别：1 = 更粗的降采样，2 = 只保留memmap和最粗的预览（释放其余派生数据）
+MEMORY_LEVELS = (1, 2)
+
+def format_bytes(nbytes):
+    """字节数的可读表示，如 512.0 MB"""
+    size = float(nbytes)
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024 or unit == 'GB':
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
 
 class WindowManager:
     _instance = None
@@ -12,8 +27,9 @@ class WindowManager:
         return cls._instance
     
     def register_window(self, window):
-        """注册窗口"""
-        self.windows.append(window)
+        """注册窗口（重复注册时忽略）"""
+        if window not in self.windows:
+            self.windows.append(window)
         return self.next_index
     
     def unregister_window(self, window):
@@ -21,6 +37,12 @@ class WindowManager:
         if window in self.windows:
             self.windows.remove(window)
     
+    def touch_window(self, window):
+        """窗口被激活：移到列表末尾（列表按最近激活排序，降级时从最久未用的开始）"""
+        if window in self.windows:
+            self.windows.remove(window)
+            self.windows.append(window)
+    
     def get_next_index(self):
         """获取下一个窗口索引"""
         # 查找现有PlotWindow的最大索引
@@ -44,4 +66,53 @@ class WindowManager:
     
     def get_window_count(self):
         """获取窗口数量"""
-        return len(self.windows)
\ No newline at end of file
+        return len(self.windows)
+    
+    def memory_usage(self):
+        """
+        当前内存占用（字节）：共享缓存、各窗口自己持有的数组（与缓存共享的不重复计）、
+        各窗口matplotlib画布的像素缓冲区
+        """
+        cache = cache_manager.get_cache()
+        cache_bytes, _ = cache.usage()
+        seen = cache.value_ids()
+        array_bytes = figure_bytes = 0
+        for window in self.windows:
+            for array in getattr(window, 'memory_arrays', lambda: ())():
+                if isinstance(array, np.ndarray) and not isinstance(array, np.memmap) and id(array) not in seen:
+                    seen.add(id(array))
+                    array_bytes += array.nbytes
+            for canvas in window.findChildren(FigureCanvas):
+                width, height = canvas.figure.bbox.size
+                figure_bytes += int(width * height) * 4
+        return {
+            'cache': cache_bytes,
+            'arrays': array_bytes,
+            'figures': figure_bytes,
+            'total': cache_bytes + array_bytes + figure_bytes,
+            'budget': Config.MEMORY_BUDGET_BYTES,
+        }
+    
+    def enforce_budget(self):
+        """
+        总占用超出 Config.MEMORY_BUDGET_BYTES 时依次：淘汰共享缓存，
+        把后台窗口（从最久未激活的开始）降到更粗的降采样，再降到只保留memmap；
+        当前激活的窗口不降级。返回处理后的占用
+        """
+        usage = self.memory_usage()
+        excess = usage['total'] - usage['budget']
+        if excess <= 0:
+            return usage
+        cache_manager.get_cache().trim(max(0, usage['cache'] - excess))
+        usage = self.memory_usage()
+        active = QApplication.activeWindow()
+        for level in MEMORY_LEVELS:
+            for window in list(self.windows):
+                if usage['total'] <= usage['budget']:
+                    return usage
+                if window is active or not hasattr(window, 'reduce_memory'):
+                    continue
+                if window.memory_level < level:
+                    window.reduce_memory(level)
+                    usage = self.memory_usage()
+        return usage
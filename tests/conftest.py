@@ -0,0 +1,5 @@
+# 让测试可以按 src.xxx 导入项目模块（从任意目录运行pytest）
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,39 @@
+import numpy as np
+
+from src.alignment_utils import apply_shift
+from src.layout_utils import PermutedView
+
+
+def test_apply_shift_keeps_permuted_view_lazy():
+    raw = np.arange(4 * 5 * 6, dtype=np.float32)
+    view = PermutedView(raw, (4, 5, 6), (2, 0, 1))
+    expected = raw.reshape(4, 5, 6).transpose(2, 0, 1).reshape(-1)
+
+    for shift in (7, -7):
+        view1, view2 = apply_shift(raw, view, shift)
+        assert isinstance(view2, PermutedView)
+        assert len(view1) == len(view2) == len(raw) - 7
+        if shift > 0:
+            np.testing.assert_array_equal(np.asarray(view2), expected[7:])
+        else:
+            np.testing.assert_array_equal(np.asarray(view2), expected[:-7])
+
+
+def test_apply_shift_ndarray():
+    data1 = np.arange(10)
+    data2 = np.arange(100, 112)
+
+    view1, view2 = apply_shift(data1, data2, 0)
+    np.testing.assert_array_equal(view1, data1)
+    np.testing.assert_array_equal(view2, data2[:10])
+
+    # shift > 0：data2前面多出shift个元素
+    view1, view2 = apply_shift(data1, data2, 3)
+    np.testing.assert_array_equal(view1, data1[:9])
+    np.testing.assert_array_equal(view2, data2[3:])
+
+    # shift < 0：data1前面多出-shift个元素
+    view1, view2 = apply_shift(data1, data2, -4)
+    np.testing.assert_array_equal(view1, data1[4:])
+    np.testing.assert_array_equal(view2, data2[:6])
+    assert np.shares_memory(view1, data1) and np.shares_memory(view2, data2)
@@ -0,0 +1,49 @@
+import numpy as np
+
+from src.layout_utils import PermutedView
+from src.tile_pyramid import FlatTensorView, slice_view
+
+
+def make_view():
+    raw = np.arange(4 * 5 * 6, dtype=np.float32)
+    expected = raw.reshape(4, 5, 6).transpose(2, 0, 1).reshape(-1)
+    return PermutedView(raw, (4, 5, 6), (2, 0, 1)), expected
+
+
+def test_full_view_matches_transposed_data():
+    view, expected = make_view()
+    assert view.shape == (6, 4, 5)
+    assert len(view) == expected.size
+    np.testing.assert_array_equal(np.asarray(view), expected)
+
+
+def test_slice_stays_lazy():
+    view, expected = make_view()
+    part = view[13:]
+    assert isinstance(part, PermutedView)
+    assert len(part) == expected.size - 13
+    np.testing.assert_array_equal(np.asarray(part), expected[13:])
+
+    # 切片的切片仍是惰性视图，起止位置叠加
+    inner = part[5:40]
+    assert isinstance(inner, PermutedView)
+    np.testing.assert_array_equal(np.asarray(inner), expected[18:53])
+    assert len(view[50:10]) == 0
+
+
+def test_index_and_strided_reads():
+    view, expected = make_view()
+    part = view[13:]
+    assert part[0] == expected[13]
+    assert part[-1] == expected[-1]
+    np.testing.assert_array_equal(part[::7], expected[13::7])
+    np.testing.assert_array_equal(part[np.array([0, 3, -1])], expected[[13, 16, -1]])
+
+
+def test_partial_view_as_tensor_is_lazy():
+    view, expected = make_view()
+    part = view[20:]
+    plane = slice_view(part, (25, 4), (1, 0))
+    assert isinstance(plane, FlatTensorView)
+    np.testing.assert_array_equal(np.asarray(plane), expected[20:].reshape(25, 4).T)
+    np.testing.assert_array_equal(np.asarray(plane[1:3, ::4]), expected[20:].reshape(25, 4).T[1:3, ::4])